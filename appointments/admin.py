@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Appointment, AppointmentRequest
+from core.db.routers import ReplicaReadsAdminMixin
+from .models import Appointment, AppointmentRequest, PairHistory
 
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'bhooswami', 'krisshak', 'date', 'time', 'status', 'payment_status', 'get_state', 'get_district')
 
     ordering = (
@@ -37,5 +38,13 @@ class AppointmentRequestAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('sender__email', 'recipient__email')
 
+class PairHistoryAdmin(admin.ModelAdmin):
+    list_display = ('bhooswami', 'krisshak', 'confirmed_count', 'last_appointment_date', 'total_paid', 'updated_at')
+    ordering = ('-last_appointment_date',)
+    search_fields = ('bhooswami__email', 'krisshak__email')
+    list_select_related = ('bhooswami', 'krisshak')
+    readonly_fields = ('krisshak', 'bhooswami', 'confirmed_count', 'last_appointment_date', 'total_paid', 'updated_at')
+
 admin.site.register(Appointment, AppointmentAdmin)
 admin.site.register(AppointmentRequest, AppointmentRequestAdmin)
+admin.site.register(PairHistory, PairHistoryAdmin)
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class AppointmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'appointments'
+
+    def ready(self):
+        import appointments.signals
+        from core.cdc import register_projection, track_model
+        from appointments.history import apply_pair_changes
+        from appointments.models import Appointment, AppointmentRequest
+        track_model(Appointment, fields=("krisshak_id", "bhooswami_id", "status", "payment_status", "date"))
+        track_model(AppointmentRequest, fields=("sender_id", "recipient_id", "status"))
+        register_projection("pair_history", ["appointments.appointment", "payments.payment"], apply_pair_changes)
+
+        from core.sync import register_sync
+        from appointments.serializers import AppointmentRequestSerializer, AppointmentSerializer
+        register_sync("appointments", Appointment, owners=("krisshak", "bhooswami"), serializer=AppointmentSerializer)
+        register_sync("requests", AppointmentRequest, owners=("sender", "recipient"), serializer=AppointmentRequestSerializer)
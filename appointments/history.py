@@ -0,0 +1,137 @@
+"""Keeps PairHistory in step with confirmed appointments and completed payments."""
+from functools import reduce
+from operator import or_
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, Count, FilteredRelation, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from payments.models import Payment
+from .models import Appointment, PairHistory
+
+UPDATE_FIELDS = ['confirmed_count', 'last_appointment_date', 'total_paid', 'updated_at']
+
+
+def _collect(appointments, payments):
+    """Aggregate pair stats into {(krisshak_id, bhooswami_id): PairHistory}."""
+    rows = {}
+
+    confirmed = (
+        appointments.filter(status='confirmed')
+        .values('krisshak_id', 'bhooswami_id')
+        .annotate(confirmed_count=Count('id'), last_appointment_date=Max('date'))
+        .order_by()
+    )
+    for row in confirmed:
+        key = (row['krisshak_id'], row['bhooswami_id'])
+        rows[key] = PairHistory(
+            krisshak_id=key[0],
+            bhooswami_id=key[1],
+            confirmed_count=row['confirmed_count'],
+            last_appointment_date=row['last_appointment_date'],
+        )
+
+    # Bhooswamis pay krisshaks, so the payment sender is the bhooswami
+    paid = (
+        payments.filter(status='completed')
+        .values('recipient_id', 'sender_id')
+        .annotate(total_paid=Sum('amount'))
+        .order_by()
+    )
+    for row in paid:
+        key = (row['recipient_id'], row['sender_id'])
+        pair = rows.get(key)
+        if pair is None:
+            pair = rows[key] = PairHistory(krisshak_id=key[0], bhooswami_id=key[1])
+        pair.total_paid = row['total_paid'] or 0
+
+    return rows
+
+
+def _upsert(pairs, using):
+    if not pairs:
+        return
+
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    unique_fields = None
+    if connections[using].features.supports_update_conflicts_with_target:
+        unique_fields = ['krisshak', 'bhooswami']
+
+    PairHistory.objects.using(using).bulk_create(
+        pairs,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=UPDATE_FIELDS,
+    )
+
+
+def refresh_pairs(pairs, using=DEFAULT_DB_ALIAS):
+    """Recompute the history rows of the given (krisshak_id, bhooswami_id) pairs."""
+    pairs = {(k, b) for k, b in pairs if k and b}
+    if not pairs:
+        return
+
+    appointment_filter = reduce(or_, (Q(krisshak_id=k, bhooswami_id=b) for k, b in pairs))
+    payment_filter = reduce(or_, (Q(recipient_id=k, sender_id=b) for k, b in pairs))
+
+    rows = _collect(
+        Appointment.objects.using(using).filter(appointment_filter),
+        Payment.objects.using(using).filter(payment_filter),
+    )
+    _upsert(list(rows.values()), using)
+
+    # Pairs with nothing left to remember (cancelled / deleted) drop out
+    gone = pairs - rows.keys()
+    if gone:
+        PairHistory.objects.using(using).filter(
+            reduce(or_, (Q(krisshak_id=k, bhooswami_id=b) for k, b in gone))
+        ).delete()
+
+
+def rebuild_pair_history(using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """Recompute every pair from scratch. Returns (rows written, rows removed)."""
+    rows = _collect(Appointment.objects.using(using).all(), Payment.objects.using(using).all())
+
+    pairs = list(rows.values())
+    for start in range(0, len(pairs), batch_size):
+        _upsert(pairs[start:start + batch_size], using)
+
+    stale = [
+        pk for pk, k, b in PairHistory.objects.using(using).values_list('pk', 'krisshak_id', 'bhooswami_id')
+        if (k, b) not in rows
+    ]
+    for start in range(0, len(stale), batch_size):
+        PairHistory.objects.using(using).filter(pk__in=stale[start:start + batch_size]).delete()
+
+    return len(pairs), len(stale)
+
+
+def annotate_pair_history(queryset, role, other_user, name='has_confirmed'):
+    """LEFT JOIN each profile to its pair row with ``other_user``.
+
+    ``role`` is the profile's side of the pair ('krisshak' or 'bhooswami').
+    Adds ``pair_confirmed_count`` and a 0/1 ``name`` flag for ordering.
+    """
+    other_side = 'bhooswami' if role == 'krisshak' else 'krisshak'
+    relation = f'user__{role}_pairs'
+    return queryset.annotate(
+        pair=FilteredRelation(relation, condition=Q(**{f'{relation}__{other_side}': other_user})),
+    ).annotate(
+        pair_confirmed_count=Coalesce('pair__confirmed_count', 0),
+        **{name: Case(
+            When(pair__confirmed_count__gt=0, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )},
+    )
+
+
+def apply_pair_changes(records):
+    """core.cdc projection: refresh the pairs touched by appointment and payment writes."""
+    pairs = set()
+    for record in records:
+        if record.model == 'payments.payment':
+            pairs.add((record.data.get('recipient_id'), record.data.get('sender_id')))
+        else:
+            pairs.add((record.data.get('krisshak_id'), record.data.get('bhooswami_id')))
+    refresh_pairs(pairs)
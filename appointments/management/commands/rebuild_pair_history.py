@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from appointments.history import rebuild_pair_history
+
+class Command(BaseCommand):
+    help = 'Recompute the Krisshak–Bhooswami pair history table from appointments and payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per upsert / delete statement')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written, removed = rebuild_pair_history(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {written} pair history rows, removed {removed} stale rows"))
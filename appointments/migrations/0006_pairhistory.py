@@ -0,0 +1,72 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_pair_history(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Payment = apps.get_model('payments', 'Payment')
+    PairHistory = apps.get_model('appointments', 'PairHistory')
+
+    rows = {}
+    confirmed = (
+        Appointment.objects.filter(status='confirmed')
+        .values('krisshak_id', 'bhooswami_id')
+        .annotate(count=models.Count('id'), last=models.Max('date'))
+        .order_by()
+    )
+    for row in confirmed:
+        key = (row['krisshak_id'], row['bhooswami_id'])
+        rows[key] = PairHistory(
+            krisshak_id=key[0], bhooswami_id=key[1],
+            confirmed_count=row['count'], last_appointment_date=row['last'],
+        )
+
+    paid = (
+        Payment.objects.filter(status='completed')
+        .values('recipient_id', 'sender_id')
+        .annotate(total=models.Sum('amount'))
+        .order_by()
+    )
+    for row in paid:
+        key = (row['recipient_id'], row['sender_id'])
+        pair = rows.setdefault(key, PairHistory(krisshak_id=key[0], bhooswami_id=key[1]))
+        pair.total_paid = row['total'] or 0
+
+    PairHistory.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_alter_appointmentrequest_options_and_more'),
+        ('payments', '0002_payment_calculated_amount_payment_is_custom_amount_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PairHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('last_appointment_date', models.DateField(blank=True, null=True)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('bhooswami', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bhooswami_pairs', to=settings.AUTH_USER_MODEL)),
+                ('krisshak', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='krisshak_pairs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Pair History',
+                'verbose_name_plural': 'Pair History',
+                'indexes': [models.Index(fields=['bhooswami', 'krisshak'], name='pair_bhooswami_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pairhistory',
+            constraint=models.UniqueConstraint(fields=('krisshak', 'bhooswami'), name='unique_pair_history'),
+        ),
+        migrations.RunPython(backfill_pair_history, migrations.RunPython.noop),
+    ]
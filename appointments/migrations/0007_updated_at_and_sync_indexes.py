@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows have no change time yet; their creation time is the best we have
+    apps.get_model('appointments', 'Appointment').objects.update(updated_at=F('created_at'))
+    apps.get_model('appointments', 'AppointmentRequest').objects.update(updated_at=F('request_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_pairhistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='appointmentrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['krisshak', 'updated_at'], name='appt_krisshak_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['bhooswami', 'updated_at'], name='appt_bhooswami_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentrequest',
+            index=models.Index(fields=['sender', 'updated_at'], name='request_sender_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentrequest',
+            index=models.Index(fields=['recipient', 'updated_at'], name='request_recipient_sync_idx'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
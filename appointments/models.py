@@ -10,12 +10,18 @@ class AppointmentRequest(models.Model):
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_requests',null=True, blank=True )
     status = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('expired', 'Expired')], default='pending')
     request_time = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def is_expired(self):
         return now() > self.request_time + timedelta(days=2)
 
     class Meta:
         verbose_name = "Appointment Request"
+        indexes = [
+            # Delta sync (core.sync) scans each side's rows changed since a cursor
+            models.Index(fields=['sender', 'updated_at'], name='request_sender_sync_idx'),
+            models.Index(fields=['recipient', 'updated_at'], name='request_recipient_sync_idx'),
+        ]
 
 class Appointment(models.Model):
     """Stores confirmed appointments between Krisshaks & Bhooswamis."""
@@ -27,6 +33,37 @@ class Appointment(models.Model):
     status = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('confirmed', 'Confirmed')], default='pending')
     payment_status = models.CharField(max_length=20, choices=[('paid', 'Paid'), ('not_paid', 'Not Paid')], default='not_paid')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['krisshak', 'updated_at'], name='appt_krisshak_sync_idx'),
+            models.Index(fields=['bhooswami', 'updated_at'], name='appt_bhooswami_sync_idx'),
+        ]
 
     def __str__(self):
         return f"Appointment: {self.bhooswami.email} ↔ {self.krisshak.email}"
+
+
+class PairHistory(models.Model):
+    """Confirmed work between one Krisshak and one Bhooswami, kept by appointments.history."""
+    krisshak = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='krisshak_pairs')
+    bhooswami = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bhooswami_pairs')
+    confirmed_count = models.PositiveIntegerField(default=0)
+    last_appointment_date = models.DateField(null=True, blank=True)
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Pair History"
+        verbose_name_plural = "Pair History"
+        constraints = [
+            models.UniqueConstraint(fields=['krisshak', 'bhooswami'], name='unique_pair_history'),
+        ]
+        indexes = [
+            # "Who has this bhooswami worked with" reads from this side
+            models.Index(fields=['bhooswami', 'krisshak'], name='pair_bhooswami_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bhooswami_id} ↔ {self.krisshak_id} ({self.confirmed_count})"
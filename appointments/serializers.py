@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.serializers import SparseModelSerializer
 from .models import Appointment, AppointmentRequest
 
-class AppointmentRequestSerializer(serializers.ModelSerializer):
+class AppointmentRequestSerializer(SparseModelSerializer):
     sender_email = serializers.EmailField(source='sender.email', read_only=True)
     recipient_email = serializers.EmailField(source='recipient.email', read_only=True)
 
@@ -12,17 +13,18 @@ class AppointmentRequestSerializer(serializers.ModelSerializer):
     recipient_user_type = serializers.CharField(source='recipient.user_type')
     
     def get_sender_user_id(self, obj):
-        return obj.sender.id
+        return obj.sender_id
 
     def get_recipient_user_id(self, obj):
-        return obj.recipient.id
+        return obj.recipient_id
 
     class Meta:
         model = AppointmentRequest
         fields = '__all__'
         read_only_fields = ['id', 'request_time', 'status']
+        field_sources = {"sender_user_id": ["sender"], "recipient_user_id": ["recipient"]}
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseModelSerializer):
     krisshak_email = serializers.CharField(source='krisshak.email', read_only=True)
     bhooswami_email = serializers.CharField(source='bhooswami.email', read_only=True)
 
@@ -32,15 +34,16 @@ class AppointmentSerializer(serializers.ModelSerializer):
     status = serializers.CharField(read_only=True)
     
     def get_krisshak_user_id(self, obj):
-        return obj.krisshak.id if obj.krisshak else None
+        return obj.krisshak_id
 
     def get_bhooswami_user_id(self, obj):
-        return obj.bhooswami.id if obj.bhooswami else None
+        return obj.bhooswami_id
 
     class Meta:
         model = Appointment
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'status']
+        field_sources = {"krisshak_user_id": ["krisshak"], "bhooswami_user_id": ["bhooswami"]}
         extra_kwargs = {
                 'bhooswami': {'required': False},
                 'status': {'required': False},
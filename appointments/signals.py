@@ -0,0 +1,55 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .models import Appointment, AppointmentRequest
+from .history import refresh_pairs
+from core.cdc import deferred
+from core.conditional import bump_tags
+from users.etags import relations_tag
+
+# Appointment fields that feed PairHistory
+PAIR_FIELD_NAMES = {'date', 'status', 'krisshak', 'bhooswami'}
+
+def pair_snapshot(appointment):
+    return tuple(appointment.__dict__.get(field) for field in ('krisshak_id', 'bhooswami_id', 'status', 'date'))
+
+@receiver(post_init, sender=Appointment)
+def remember_pair_fields(sender, instance, **kwargs):
+    instance._pair_snapshot = pair_snapshot(instance)
+
+@receiver(post_save, sender=Appointment)
+def refresh_pair_history_on_save(sender, instance, created, update_fields=None, using=None, **kwargs):
+    previous = getattr(instance, "_pair_snapshot", None)
+    current = pair_snapshot(instance)
+    instance._pair_snapshot = current
+
+    # Mark-paid and similar saves don't change the pair's history
+    if update_fields is not None and not PAIR_FIELD_NAMES & set(update_fields):
+        return
+    if not created and previous == current:
+        return
+    if deferred():
+        return  # consume_changes applies it
+
+    pairs = {(instance.krisshak_id, instance.bhooswami_id)}
+    if previous and not created:
+        # Covers an appointment moved to another pair
+        pairs.add(previous[:2])
+    refresh_pairs(pairs, using=using)
+
+@receiver(post_delete, sender=Appointment)
+def refresh_pair_history_on_delete(sender, instance, using=None, **kwargs):
+    if deferred():
+        return
+    refresh_pairs({(instance.krisshak_id, instance.bhooswami_id)}, using=using)
+
+
+# Profiles show the viewer's latest appointment and request with that user (users/etags.py)
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def bump_appointment_relations(sender, instance, **kwargs):
+    bump_tags(relations_tag(instance.krisshak_id), relations_tag(instance.bhooswami_id))
+
+@receiver(post_save, sender=AppointmentRequest)
+@receiver(post_delete, sender=AppointmentRequest)
+def bump_request_relations(sender, instance, **kwargs):
+    bump_tags(relations_tag(instance.sender_id), relations_tag(instance.recipient_id))
@@ -1,3 +1,52 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.testing import LOCMEM_CACHES, QueryBudgetMixin
+from users.models import CustomUser
+from .models import Appointment, AppointmentRequest
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AppointmentQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets of the appointment views, with N and 10N Krisshak partners.
+
+    Each partner has a confirmed appointment with the viewer and a request
+    each way. The budgets are what each view costs today; raise one only
+    with a reason.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = CustomUser.objects.create_user(email="viewer@example.com", password=None, user_type="bhooswami")
+
+    def setUp(self):
+        self.partners = []
+        token = Token.objects.create(user=self.viewer)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+    def seed(self, count):
+        today = datetime.date.today()
+        for i in range(len(self.partners), count):
+            krisshak = CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak", name=f"K{i}")
+            Appointment.objects.create(krisshak=krisshak, bhooswami=self.viewer, date=today, time=datetime.time(9), status="confirmed")
+            AppointmentRequest.objects.create(sender=self.viewer, recipient=krisshak)
+            AppointmentRequest.objects.create(sender=krisshak, recipient=self.viewer)
+            self.partners.append(krisshak)
+
+    def assertViewBudget(self, path, budget):
+        def check(response):
+            self.assertEqual(response.status_code, 200, response.content[:500])
+
+        self.assertQueryBudget(lambda: self.client.get(path), self.seed, budget, check=check)
+
+    def test_appointment_list(self):
+        self.assertViewBudget(reverse("appointments"), 2)
+
+    def test_confirmed_appointments(self):
+        self.assertViewBudget("/api/appointments/confirmed/", 2)
+
+    def test_appointment_requests(self):
+        self.assertViewBudget(reverse("get-requests"), 3)
@@ -11,16 +11,24 @@ from django.conf import settings
 import json
 from django.db.models import Q
 from io import BytesIO
-from reportlab.pdfgen import canvas
+from core.lazy import lazy_import
 from django.http import JsonResponse
-from django.core.mail import send_mail
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from notifications.outbox import queue_email
+from core.serializers import project_queryset
+
+canvas = lazy_import("reportlab.pdfgen.canvas")
 
 class AppointmentListCreateView(generics.ListCreateAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def filter_queryset(self, queryset):
+        # Joins the users the email fields read instead of fetching them per row
+        return project_queryset(super().filter_queryset(queryset), self.get_serializer_class(), self.get_serializer_context())
+
     def get_queryset(self):
         user = self.request.user
 
@@ -123,14 +131,14 @@ def request_appointment(request, user_id):
         if existing_request and not existing_request.is_expired():
             return JsonResponse({"error": "Request already sent. Try again after 2 days."}, status=400)
 
-        AppointmentRequest.objects.create(sender=sender, recipient=recipient)
+        with transaction.atomic():
+            AppointmentRequest.objects.create(sender=sender, recipient=recipient)
 
-        send_mail(
-            subject="New Appointment Request",
-            message=f"{sender.email} has requested an appointment with you.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient.email],
-        )
+            queue_email(
+                subject="New Appointment Request",
+                message=f"{sender.email} has requested an appointment with you.",
+                recipient_list=[recipient.email],
+            )
 
         return JsonResponse({"message": "Appointment request sent."})
 
@@ -140,12 +148,17 @@ def request_appointment(request, user_id):
 @permission_classes([IsAuthenticated])
 def get_requests(request):
     user = request.user
+    context = {"request": request}
     sent = AppointmentRequest.objects.filter(sender=user, status='pending').order_by("-request_time")
     received = AppointmentRequest.objects.filter(recipient=user, status='pending').order_by("-request_time")
 
     return Response({
-        "sent_requests": AppointmentRequestSerializer(sent, many=True).data,
-        "received_requests": AppointmentRequestSerializer(received, many=True).data,
+        "sent_requests": AppointmentRequestSerializer(
+            project_queryset(sent, AppointmentRequestSerializer, context), many=True, context=context
+        ).data,
+        "received_requests": AppointmentRequestSerializer(
+            project_queryset(received, AppointmentRequestSerializer, context), many=True, context=context
+        ).data,
     })
 
 
@@ -164,30 +177,31 @@ def accept_request(request, request_id):
     if user != appt_request.recipient:
         return Response({"error": "You are not authorized to accept this request."}, status=403)
 
-    appt_request.status = 'accepted'
-    appt_request.save()
-
     # Determine who is the krisshak/bhooswami based on roles
     if appt_request.sender.user_type == 'krisshak':
         krisshak, bhooswami = appt_request.sender, appt_request.recipient
     else:
         krisshak, bhooswami = appt_request.recipient, appt_request.sender
 
-    appointment = Appointment.objects.create(
-        krisshak=krisshak,
-        bhooswami=bhooswami,
-        date=now().date(),
-        time=now().time(),
-        status='confirmed',
-        payment_status='not_paid'
-    )
-
-    send_mail(
-        subject="Appointment Confirmed",
-        message=f"Appointment between {krisshak.email} and {bhooswami.email} is confirmed for today.",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[krisshak.email, bhooswami.email]
-    )
+    # One transaction so the signal-driven notifications are bulk written on commit
+    with transaction.atomic():
+        appt_request.status = 'accepted'
+        appt_request.save()
+
+        appointment = Appointment.objects.create(
+            krisshak=krisshak,
+            bhooswami=bhooswami,
+            date=now().date(),
+            time=now().time(),
+            status='confirmed',
+            payment_status='not_paid'
+        )
+
+        queue_email(
+            subject="Appointment Confirmed",
+            message=f"Appointment between {krisshak.email} and {bhooswami.email} is confirmed for today.",
+            recipient_list=[krisshak.email, bhooswami.email]
+        )
 
     return Response({
         "message": "Request accepted and appointment confirmed.",
@@ -231,5 +245,6 @@ def confirmed_appointments(request):
         Q(bhooswami=request.user) | Q(krisshak=request.user)
     ).order_by("-created_at")
 
-    serializer = AppointmentSerializer(confirmed, many=True)
+    context = {"request": request}
+    serializer = AppointmentSerializer(project_queryset(confirmed, AppointmentSerializer, context), many=True, context=context)
     return Response(serializer.data)
@@ -11,5 +11,8 @@ python manage.py collectstatic --no-input
 python manage.py makemigrations --noinput
 python manage.py migrate --noinput
 
+# Shared cache table (used when REDIS_URL isn't set)
+python manage.py createcachetable
+
 
 
@@ -7,3 +7,7 @@ class CalenderConfig(AppConfig):
 
     def ready(self):
         import calender.signals
+        from core.sync import register_sync
+        from calender.models import CalendarEvent
+        from calender.serializers import CalendarEventSerializer
+        register_sync("calendar", CalendarEvent, owners=("user",), serializer=CalendarEventSerializer)
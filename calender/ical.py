@@ -0,0 +1,64 @@
+"""Minimal iCalendar (RFC 5545) rendering for calendar feeds."""
+from datetime import datetime, timezone as dt_timezone
+from django.utils import timezone
+
+
+def _escape(text):
+    return (
+        (text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _utc_stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _fold(line):
+    """Lines longer than 75 octets are continued with a leading space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+
+    parts, current = [], b""
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        if len(current) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += char_bytes
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def render_calendar(events, name="E-Krisshak 2.0"):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//E-Krisshak 2.0//Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:calendar-event-{event.id}@ekrisshak2",
+            f"DTSTAMP:{_utc_stamp(event.updated_at)}",
+        ]
+        if event.time:
+            start = timezone.make_aware(datetime.combine(event.date, event.time))
+            lines.append(f"DTSTART:{_utc_stamp(start)}")
+        else:
+            lines.append(f"DTSTART;VALUE=DATE:{event.date.strftime('%Y%m%d')}")
+        lines.append(f"SUMMARY:{_escape(event.title)}")
+        if event.description:
+            lines.append(f"DESCRIPTION:{_escape(event.description)}")
+        lines += [f"CATEGORIES:{event.event_type.upper()}", "END:VEVENT"]
+
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from appointments.models import Appointment
+from calender.sync import upsert_appointment_events
+
+class Command(BaseCommand):
+    help = 'Backfill calendar events for confirmed appointments in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Appointments per upsert statement')
+        parser.add_argument('--dry-run', action='store_true', help='Count work without writing')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+
+        base_qs = (
+            Appointment.objects.filter(status='confirmed')
+            .select_related('krisshak', 'bhooswami')
+            .order_by('pk')
+        )
+
+        last_pk = None
+        synced_appointments = 0
+        synced_events = 0
+
+        # Keyset over the primary key so each chunk is one indexed range scan
+        while True:
+            qs = base_qs if last_pk is None else base_qs.filter(pk__gt=last_pk)
+            chunk = list(qs[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            chunk = [a for a in chunk if a.krisshak_id and a.bhooswami_id]
+            if dry_run:
+                synced_events += 2 * len(chunk)
+            else:
+                with transaction.atomic():
+                    synced_events += upsert_appointment_events(chunk)
+            synced_appointments += len(chunk)
+
+            self.stdout.write(f"Synced {synced_appointments} appointments so far")
+
+        prefix = "Would sync" if dry_run else "✅ Synced"
+        self.stdout.write(
+            self.style.SUCCESS(f"{prefix} {synced_events} calendar events for {synced_appointments} appointments")
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_updated_at_and_sync_indexes'),
+        ('calender', '0003_calendarevent_updated_at_and_user_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendarevent',
+            index=models.Index(fields=['user', 'updated_at'], name='calendar_user_sync_idx'),
+        ),
+    ]
@@ -20,10 +20,15 @@ class CalendarEvent(models.Model):
     related_appointment = models.ForeignKey(Appointment, on_delete=models.SET_NULL, null=True, blank=True, db_index=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-date', '-time']
         unique_together = ('user', 'related_appointment')
+        indexes = [
+            models.Index(fields=['user', 'date'], name='calendar_user_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='calendar_user_sync_idx'),
+        ]
         verbose_name = "Calendar Event"
 
     def __str__(self):
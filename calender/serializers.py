@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.serializers import SparseModelSerializer
 from .models import CalendarEvent
 
-class CalendarEventSerializer(serializers.ModelSerializer):
+class CalendarEventSerializer(SparseModelSerializer):
     day_of_week = serializers.SerializerMethodField()
 
     class Meta:
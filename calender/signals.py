@@ -1,44 +1,43 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver
 from appointments.models import Appointment
-from .models import CalendarEvent
+from .sync import appointment_snapshot, upsert_appointment_events
 import logging
 
 logger = logging.getLogger(__name__)
 
+CALENDAR_FIELD_NAMES = {'date', 'time', 'status', 'krisshak', 'bhooswami'}
+
+@receiver(post_init, sender=Appointment)
+def remember_calendar_fields(sender, instance, **kwargs):
+    instance._calendar_snapshot = appointment_snapshot(instance)
+
 @receiver(post_save, sender=Appointment)
-def create_or_update_calendar_event_from_appointment(sender, instance, created, **kwargs):
+def create_or_update_calendar_event_from_appointment(sender, instance, created, update_fields=None, using=None, **kwargs):
+    previous = getattr(instance, "_calendar_snapshot", None)
+    current = appointment_snapshot(instance)
+    instance._calendar_snapshot = current
+
+    # Saves that don't touch date/time/status (e.g. mark-paid) need no calendar work.
+    # update_fields may name a FK by attname ('krisshak_id'), so compare field names
+    if update_fields is not None:
+        touched = {sender._meta.get_field(name).name for name in update_fields}
+        if not CALENDAR_FIELD_NAMES & touched:
+            return
+    if not created and previous == current:
+        return
+
     try:
         if instance.status != 'confirmed':
             # Only act if the appointment is confirmed
             return
 
         # Handle case where either participant might be missing (edge safety)
-        if not instance.krisshak or not instance.bhooswami:
+        if not instance.krisshak_id or not instance.bhooswami_id:
             logger.warning("Confirmed appointment missing participants.")
             return
 
-        title = f"Appointment with {instance.krisshak.email if instance.bhooswami else instance.bhooswami.email}"
-        participants = [instance.krisshak, instance.bhooswami]
-
-        for user in participants:
-            event, created = CalendarEvent.objects.get_or_create(
-                user=user,
-                related_appointment=instance,
-                defaults={
-                    'title': title,
-                    'description': "Auto-scheduled from appointment.",
-                    'date': instance.date,
-                    'time': instance.time,
-                    'event_type': 'appointment',
-                }
-            )
-
-            if not created:
-                # Update existing event if date/time has changed
-                if event.date != instance.date or event.time != instance.time:
-                    event.date = instance.date
-                    event.time = instance.time
-                    event.save()
+        # Both participants' events in one upsert
+        upsert_appointment_events([instance], using=using)
     except Exception as e:
         logger.error(f"Calendar event sync failed for Appointment ID {instance.id}: {str(e)}")
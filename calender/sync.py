@@ -0,0 +1,51 @@
+"""Keeps appointment-linked calendar events in step with their Appointment."""
+from django.db import DEFAULT_DB_ALIAS, connections
+from .models import CalendarEvent
+
+# Appointment fields that change what the calendar shows
+TRACKED_FIELDS = ("date", "time", "status", "krisshak_id", "bhooswami_id")
+
+
+def appointment_snapshot(appointment):
+    """Tracked field values, read from __dict__ so deferred fields are never loaded."""
+    return tuple(appointment.__dict__.get(field) for field in TRACKED_FIELDS)
+
+
+def build_appointment_events(appointment):
+    """Unsaved CalendarEvent rows for both participants of a confirmed appointment."""
+    title = f"Appointment with {appointment.krisshak.email if appointment.bhooswami else appointment.bhooswami.email}"
+    return [
+        CalendarEvent(
+            user=user,
+            related_appointment=appointment,
+            title=title,
+            description="Auto-scheduled from appointment.",
+            date=appointment.date,
+            time=appointment.time,
+            event_type='appointment',
+        )
+        for user in (appointment.krisshak, appointment.bhooswami)
+    ]
+
+
+def upsert_appointment_events(appointments, using=DEFAULT_DB_ALIAS):
+    """Insert or refresh the events of many appointments in a single statement."""
+    events = []
+    for appointment in appointments:
+        events.extend(build_appointment_events(appointment))
+
+    if not events:
+        return 0
+
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    unique_fields = None
+    if connections[using].features.supports_update_conflicts_with_target:
+        unique_fields = ['user', 'related_appointment']
+
+    CalendarEvent.objects.using(using).bulk_create(
+        events,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=['date', 'time', 'updated_at'],
+    )
+    return len(events)
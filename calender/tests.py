@@ -1,3 +1,97 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from appointments.models import Appointment
+from core.testing import LOCMEM_CACHES, QueryBudgetMixin
+from users.models import CustomUser
+from .models import CalendarEvent
+
+
+class CalendarViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="feed@example.com", password="old-secret-1", user_type="krisshak")
+        CalendarEvent.objects.create(user=cls.user, title="Sowing", date=datetime.date(2026, 6, 1), time=datetime.time(9))
+
+    def auth(self):
+        return {"HTTP_AUTHORIZATION": f"Token {Token.objects.get_or_create(user=self.user)[0].key}"}
+
+    def subscription_url(self):
+        return self.client.get(reverse("calendar-feed-link"), **self.auth()).json()["url"]
+
+    def test_subscription_url_serves_the_feed_without_a_login(self):
+        response = self.client.get(self.subscription_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Sowing", response.content)
+
+    def test_tampered_or_revoked_token_is_refused(self):
+        url = self.subscription_url()
+        self.assertEqual(self.client.get(url.replace(".ics", "0.ics")).status_code, 404)
+
+        self.user.set_password("new-secret-2")
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_if_none_match_compares_whole_tags(self):
+        etag = self.client.get(reverse("calendar-feed"), **self.auth())["ETag"]
+        hit = self.client.get(reverse("calendar-feed"), HTTP_IF_NONE_MATCH=f'"other", W/{etag}', **self.auth())
+        self.assertEqual(hit.status_code, 304)
+
+        # A header that merely contains the tag isn't a match
+        miss = self.client.get(reverse("calendar-feed"), HTTP_IF_NONE_MATCH=f'{etag}-stale', **self.auth())
+        self.assertEqual(miss.status_code, 200)
+
+    def test_month_view_rejects_years_outside_the_date_range(self):
+        for year in ("0", "10000", "99999999999999999999"):
+            response = self.client.get(reverse("calendar-month"), {"year": year, "month": "1"}, **self.auth())
+            self.assertEqual(response.status_code, 400, year)
+
+        response = self.client.get(reverse("calendar-month"), {"year": "2026", "month": "6"}, **self.auth())
+        self.assertEqual(response.json()["days"], {"2026-06-01": 1})
+
+
+class AppointmentCalendarSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.krisshak, cls.other_krisshak = (
+            CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak") for i in range(2)
+        )
+        cls.bhooswami = CustomUser.objects.create_user(email="b@example.com", password=None, user_type="bhooswami")
+
+    def test_reassigning_a_participant_by_attname_syncs_the_calendar(self):
+        appointment = Appointment.objects.create(
+            krisshak=self.krisshak, bhooswami=self.bhooswami, date=datetime.date(2026, 6, 1), time=datetime.time(9), status="confirmed"
+        )
+        appointment.krisshak_id = self.other_krisshak.pk
+        appointment.save(update_fields=["krisshak_id"])
+
+        self.assertTrue(CalendarEvent.objects.filter(user=self.other_krisshak, related_appointment=appointment).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CalendarQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = CustomUser.objects.create_user(email="viewer@example.com", password=None, user_type="bhooswami")
+
+    def setUp(self):
+        self.partners = []
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {Token.objects.create(user=self.viewer).key}"
+
+    def seed(self, count):
+        today = datetime.date.today()
+        for i in range(len(self.partners), count):
+            krisshak = CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak")
+            # Confirmed appointments get their calendar events from calender.signals
+            Appointment.objects.create(krisshak=krisshak, bhooswami=self.viewer, date=today, time=datetime.time(9), status="confirmed")
+            CalendarEvent.objects.create(user=self.viewer, title=f"Visit {i}", date=today, time=datetime.time(15))
+            self.partners.append(krisshak)
+
+    def test_event_list(self):
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("calendar-event-list-create")), self.seed, 2,
+            check=lambda response: self.assertEqual(response.status_code, 200),
+        )
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import CalendarEventListCreateView, CalendarEventDetailView
+from .views import (
+    CalendarEventListCreateView, CalendarEventDetailView, CalendarMonthView,
+    CalendarFeedView, CalendarFeedLinkView, CalendarSubscriptionFeedView,
+)
 
 urlpatterns = [
     path('', CalendarEventListCreateView.as_view(), name='calendar-event-list-create'),
     path('<int:pk>/', CalendarEventDetailView.as_view(), name='calendar-event-detail'),
+    path('month/', CalendarMonthView.as_view(), name='calendar-month'),
+    path('feed.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+    path('feed/link/', CalendarFeedLinkView.as_view(), name='calendar-feed-link'),
+    path('feed/<str:token>.ics', CalendarSubscriptionFeedView.as_view(), name='calendar-subscription-feed'),
 ]
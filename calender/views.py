@@ -1,36 +1,89 @@
+import calendar
+import datetime
+import hashlib
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import CalendarEvent
 from .serializers import CalendarEventSerializer
+from .ical import render_calendar
 from appointments.models import Appointment
 from users.models import KrisshakProfile, BhooswamiProfile
+from core.conditional import etag_matches
+from core.utils import get_cached_data, set_cached_data
+
+FEED_CACHE_TIMEOUT = 60 * 60
+FEED_TOKEN_SALT = 'calender.feed'
+
+User = get_user_model()
+
+
+def visible_events(user):
+    """Events a user may see: their own, or every farmer's in an admin's scope."""
+    if user.is_superuser:
+        return CalendarEvent.objects.all()
+
+    try:
+        if user.user_type == 'state_admin':
+            state = user.stateadminprofile.state
+            krisshaks = KrisshakProfile.objects.filter(state=state).values('user_id')
+            bhooswamis = BhooswamiProfile.objects.filter(state=state).values('user_id')
+            return CalendarEvent.objects.filter(Q(user_id__in=krisshaks) | Q(user_id__in=bhooswamis))
+
+        elif user.user_type == 'district_admin':
+            district = user.districtadminprofile.district
+            krisshaks = KrisshakProfile.objects.filter(district=district).values('user_id')
+            bhooswamis = BhooswamiProfile.objects.filter(district=district).values('user_id')
+            return CalendarEvent.objects.filter(Q(user_id__in=krisshaks) | Q(user_id__in=bhooswamis))
+
+    except Exception:
+        return CalendarEvent.objects.none()
+
+    return CalendarEvent.objects.filter(user=user)
+
+
+def _parse_date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
+    return parsed
+
+
+class CalendarEventPagination(LimitOffsetPagination):
+    """Only paginates when the client asks for it with ?limit=."""
+    default_limit = None
+    max_limit = 500
+
 
 class CalendarEventListCreateView(generics.ListCreateAPIView):
     serializer_class = CalendarEventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CalendarEventPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return CalendarEvent.objects.all()
-
-        try:
-            if user.user_type == 'state_admin':
-                state = user.stateadminprofile.state
-                krisshaks = list(KrisshakProfile.objects.filter(state=state).values_list('user_id', flat=True))
-                bhooswamis = list(BhooswamiProfile.objects.filter(state=state).values_list('user_id', flat=True))
-                return CalendarEvent.objects.filter(user_id__in=krisshaks + bhooswamis)
+        queryset = visible_events(self.request.user)
 
-            elif user.user_type == 'district_admin':
-                district = user.districtadminprofile.district
-                krisshaks = list(KrisshakProfile.objects.filter(district=district).values_list('user_id', flat=True))
-                bhooswamis = list(BhooswamiProfile.objects.filter(district=district).values_list('user_id', flat=True))
-                return CalendarEvent.objects.filter(user_id__in=krisshaks + bhooswamis)
+        # ?start=&end= keep the scan on the (user, date) index
+        start = _parse_date_param(self.request, 'start')
+        end = _parse_date_param(self.request, 'end')
+        if start:
+            queryset = queryset.filter(date__gte=start)
+        if end:
+            queryset = queryset.filter(date__lte=end)
 
-        except Exception:
-            return CalendarEvent.objects.none()
-
-        return CalendarEvent.objects.filter(user=user)
+        return queryset
 
     def perform_create(self, serializer):
         try:
@@ -40,6 +93,108 @@ class CalendarEventListCreateView(generics.ListCreateAPIView):
             logging.error(f"Calendar creation failed: {str(e)}")
             raise
 
+
+class CalendarMonthView(APIView):
+    """Event counts per day for one month (?year=&month=), for month-grid views."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            year = int(request.query_params.get('year', today.year))
+            month = int(request.query_params.get('month', today.month))
+            last_day = calendar.monthrange(year, month)[1]
+            first, last = datetime.date(year, month, 1), datetime.date(year, month, last_day)
+        except (TypeError, ValueError, OverflowError, calendar.IllegalMonthError):
+            return Response({"error": "Invalid year or month."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = (
+            visible_events(request.user)
+            .filter(date__gte=first, date__lte=last)
+            .order_by()
+            .values('date')
+            .annotate(count=Count('id'))
+        )
+
+        return Response({
+            "year": year,
+            "month": month,
+            "days": {row['date'].isoformat(): row['count'] for row in rows},
+        })
+
+
+def feed_token(user):
+    """Secret for the user's subscription URL; changing the password revokes it."""
+    digest = salted_hmac(FEED_TOKEN_SALT, f"{user.pk}:{user.password}", algorithm="sha256").hexdigest()
+    return f"{user.pk}-{digest[:32]}"
+
+
+def user_for_feed_token(token):
+    user_id, _, _ = token.partition('-')
+    try:
+        user = User.objects.get(pk=int(user_id), is_active=True)
+    except (ValueError, User.DoesNotExist):
+        return None
+    return user if constant_time_compare(token, feed_token(user)) else None
+
+
+def feed_response(request, user):
+    """The user's own events as an iCalendar feed, cached and ETagged."""
+    events = CalendarEvent.objects.filter(user=user)
+
+    # One aggregate query: any insert, edit or delete changes the tag
+    stats = events.aggregate(count=Count('id'), last_change=Max('updated_at'))
+    last_change = stats['last_change'].isoformat() if stats['last_change'] else ""
+    version = hashlib.md5(f"{user.id}:{stats['count']}:{last_change}".encode()).hexdigest()
+    etag = f'"{version}"'
+
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    cache_key = f"calendar_feed:{user.id}:{version}"
+    body = get_cached_data(cache_key)
+    if body is None:
+        body = render_calendar(events.order_by('date', 'time'))
+        set_cached_data(cache_key, body, timeout=FEED_CACHE_TIMEOUT)
+
+    response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    response['Content-Disposition'] = 'inline; filename="ekrisshak-calendar.ics"'
+    return response
+
+
+class CalendarFeedView(APIView):
+    """The signed-in user's events as an iCalendar feed."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return feed_response(request, request.user)
+
+
+class CalendarFeedLinkView(APIView):
+    """The secret URL calendar apps subscribe to (they can't send a login token)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        path = reverse('calendar-subscription-feed', args=[feed_token(request.user)])
+        return Response({"url": request.build_absolute_uri(path)})
+
+
+class CalendarSubscriptionFeedView(APIView):
+    """The feed behind a subscription URL; the token in the path is the only credential."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token):
+        user = user_for_feed_token(token)
+        if user is None:
+            return Response({"error": "Unknown calendar link."}, status=status.HTTP_404_NOT_FOUND)
+        return feed_response(request, user)
+
+
 class CalendarEventDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = CalendarEvent.objects.all()
     serializer_class = CalendarEventSerializer
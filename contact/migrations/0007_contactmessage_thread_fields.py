@@ -0,0 +1,74 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:02
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max
+
+
+def backfill_threads(apps, schema_editor):
+    ContactMessage = apps.get_model('contact', 'ContactMessage')
+
+    # Existing history counts as read; every row starts at its own timestamp
+    ContactMessage.objects.update(last_activity_at=F('created_at'), is_read=True)
+
+    # MySQL can't UPDATE a table from a subquery on itself, so aggregate first
+    stats = (
+        ContactMessage.objects.filter(parent__isnull=False)
+        .order_by()
+        .values('parent_id')
+        .annotate(replies=Count('id'), latest=Max('created_at'))
+    )
+    for row in stats.iterator():
+        ContactMessage.objects.filter(pk=row['parent_id']).update(
+            reply_count=row['replies'],
+            last_activity_at=row['latest'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0006_notice'),
+        ('users', '0006_customuser_push_subscription_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='is_read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_threads, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['sender', 'parent', '-last_activity_at'], name='contact_sender_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['parent', 'is_read'], name='contact_parent_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['district', 'is_resolved', '-last_activity_at'], name='contact_district_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['state', 'is_resolved', '-last_activity_at'], name='contact_state_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_resolved', '-last_activity_at'], name='contact_resolved_inbox_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import F
 from django.conf import settings
+from django.utils import timezone
 from users.models import State, District, StateAdminProfile, DistrictAdminProfile,CustomUser
 
 class ContactMessage(models.Model):
@@ -29,13 +31,44 @@ class ContactMessage(models.Model):
     forwarded_to = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Thread state, denormalized onto the root message so inbox queries never
+    # have to aggregate replies. Replies keep last_activity_at = their own time.
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    reply_count = models.PositiveIntegerField(default=0)
+    is_read = models.BooleanField(default=False)
+
     class Meta:
         verbose_name = "Contact Message"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['sender', 'parent', '-last_activity_at'], name='contact_sender_thread_idx'),
+            models.Index(fields=['parent', 'is_read'], name='contact_parent_unread_idx'),
+            models.Index(fields=['district', 'is_resolved', '-last_activity_at'], name='contact_district_inbox_idx'),
+            models.Index(fields=['state', 'is_resolved', '-last_activity_at'], name='contact_state_inbox_idx'),
+            models.Index(fields=['is_resolved', '-last_activity_at'], name='contact_resolved_inbox_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name or 'System'} - {self.subject}"
 
+    def save(self, *args, **kwargs):
+        is_new_reply = self._state.adding and self.parent_id is not None
+        super().save(*args, **kwargs)
+
+        if is_new_reply:
+            # Bump the thread root without loading it
+            ContactMessage.objects.filter(pk=self.parent_id).update(
+                reply_count=F('reply_count') + 1,
+                last_activity_at=self.last_activity_at,
+            )
+
+    def delete(self, *args, **kwargs):
+        parent_id = self.parent_id
+        result = super().delete(*args, **kwargs)
+        if parent_id:
+            ContactMessage.objects.filter(pk=parent_id, reply_count__gt=0).update(reply_count=F('reply_count') - 1)
+        return result
+
 
 class Notice(models.Model):
     author_type = models.CharField(max_length=20, choices=[("state_admin", "State Admin"), ("district_admin", "District Admin")])
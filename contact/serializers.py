@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.serializers import SparseModelSerializer
 from .models import ContactMessage, Notice
 
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(SparseModelSerializer):
     replies = serializers.SerializerMethodField()
 
     class Meta:
@@ -9,11 +10,18 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = [
             'sender', 'state', 'district', 'forwarded_to',
-            'is_admin_reply', 'is_resolved', 'parent'
+            'is_admin_reply', 'is_resolved', 'parent',
+            'last_activity_at', 'reply_count', 'is_read'
         ]
 
     def get_replies(self, obj):
-        children = obj.replies.order_by("created_at")
+        # reply_count is denormalized, so leaf messages skip the lookup entirely
+        if not obj.reply_count:
+            return []
+        if 'replies' in getattr(obj, '_prefetched_objects_cache', {}):
+            children = obj.replies.all()
+        else:
+            children = obj.replies.order_by("created_at")
         return ContactMessageSerializer(children, many=True).data
 
     def validate_email(self, value):
@@ -27,7 +35,7 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         return value
 
 
-class NoticeSerializer(serializers.ModelSerializer):
+class NoticeSerializer(SparseModelSerializer):
     class Meta:
         model = Notice
         fields = ["author_name", "content", "timestamp"]
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.conditional import bump_tags
+from .models import Notice
+
+NOTICES_TAG = "notices"
+
+@receiver(post_save, sender=Notice)
+@receiver(post_delete, sender=Notice)
+def bump_notice_version(sender, instance, **kwargs):
+    bump_tags(NOTICES_TAG)
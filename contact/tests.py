@@ -1,3 +1,87 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+from users.constants.state_district_data import states_and_districts
+from users.models import CustomUser, State, StateAdminProfile
+from .models import ContactMessage
+
+
+class ContactThreadReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Admin profiles derive their codes from the known state names
+        home, other = (State.objects.create(name=name) for name in list(states_and_districts)[:2])
+        cls.sender = CustomUser.objects.create_user(email="farmer@example.com", password=None, user_type="krisshak")
+        cls.home_admin = CustomUser.objects.create_user(email="home@example.com", password=None, user_type="state_admin")
+        StateAdminProfile.objects.create(user=cls.home_admin, state=home)
+        cls.other_admin = CustomUser.objects.create_user(email="other@example.com", password=None, user_type="state_admin")
+        StateAdminProfile.objects.create(user=cls.other_admin, state=other)
+        cls.thread = ContactMessage.objects.create(
+            sender=cls.sender, sender_type="krisshak", name="Farmer", email="farmer@example.com",
+            subject="Help", message="Hello", state=home,
+        )
+
+    def read(self, user):
+        token = Token.objects.get_or_create(user=user)[0]
+        return self.client.post(
+            reverse("read-contact-thread", args=[self.thread.pk]), HTTP_AUTHORIZATION=f"Token {token.key}"
+        )
+
+    def test_admin_outside_the_threads_state_gets_404(self):
+        self.assertEqual(self.read(self.other_admin).status_code, 404)
+        self.thread.refresh_from_db()
+        self.assertFalse(self.thread.is_read)
+
+    def test_admin_over_the_threads_state_marks_it_read(self):
+        response = self.read(self.home_admin)
+        self.assertEqual((response.status_code, response.json()), (200, {"updated": 1}))
+
+    def test_unrelated_farmer_gets_404(self):
+        stranger = CustomUser.objects.create_user(email="stranger@example.com", password=None, user_type="bhooswami")
+        self.assertEqual(self.read(stranger).status_code, 404)
+
+
+class ContactInboxUnreadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        state = State.objects.create(name=list(states_and_districts)[0])
+        cls.farmer = CustomUser.objects.create_user(email="farmer@example.com", password=None, user_type="krisshak")
+        cls.admin = CustomUser.objects.create_user(email="admin@example.com", password=None, user_type="state_admin")
+        StateAdminProfile.objects.create(user=cls.admin, state=state)
+        cls.thread = ContactMessage.objects.create(
+            sender=cls.farmer, sender_type="krisshak", name="Farmer", email="farmer@example.com",
+            subject="Help", message="Hello", state=state,
+        )
+
+    def auth(self, user):
+        return {"HTTP_AUTHORIZATION": f"Token {Token.objects.get_or_create(user=user)[0].key}"}
+
+    def unread_ids(self, user):
+        response = self.client.get(reverse("view-contact-messages"), {"unread": "true"}, **self.auth(user))
+        self.assertEqual(response.status_code, 200)
+        return {message["id"] for message in response.json()}
+
+    def reply(self, user, text):
+        return ContactMessage.objects.create(
+            sender=user, sender_type=user.user_type, name="Reply", email=user.email,
+            subject="Re: Help", message=text, parent=self.thread, state=self.thread.state,
+        )
+
+    def mark_read(self, user):
+        self.client.post(reverse("read-contact-thread", args=[self.thread.pk]), **self.auth(user))
+
+    def test_farmer_sees_their_thread_unread_after_an_admin_reply(self):
+        self.assertEqual(self.unread_ids(self.farmer), set())
+        self.reply(self.admin, "We are on it")
+        self.assertIn(self.thread.pk, self.unread_ids(self.farmer))
+
+        self.mark_read(self.farmer)
+        self.assertEqual(self.unread_ids(self.farmer), set())
+
+    def test_read_thread_turns_unread_again_on_a_new_reply(self):
+        self.mark_read(self.admin)
+        self.assertEqual(self.unread_ids(self.admin), set())
+
+        self.reply(self.farmer, "Any news?")
+        self.assertEqual(self.unread_ids(self.admin), {self.thread.pk})
@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import ContactMessageView, ContactMessageListView, ContactReplyView, get_notices, create_notice, PublicContactMessageView
+from .views import ContactMessageView, ContactMessageListView, ContactThreadReadView, ContactReplyView, get_notices, create_notice, PublicContactMessageView
 
 urlpatterns = [
     path('send/', ContactMessageView.as_view(), name='send-contact-message'),
     path('inbox/', ContactMessageListView.as_view(), name='view-contact-messages'),
+    path('inbox/<int:pk>/read/', ContactThreadReadView.as_view(), name='read-contact-thread'),
     path('reply/<int:pk>/', ContactReplyView.as_view(), name='reply-contact-message'),
     path("notices/", get_notices, name="get_notices"),
     path("notices/create/", create_notice, name="create_notice"),
@@ -6,45 +6,114 @@ from django.conf import settings
 from .serializers import ContactMessageSerializer, NoticeSerializer
 from .models import ContactMessage, Notice
 from users.models import DistrictAdminProfile, StateAdminProfile, KrisshakProfile, BhooswamiProfile, CustomUser
-from django.http import JsonResponse
+from core.json import FastJsonResponse
 from rest_framework.decorators import api_view
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from core.async_views import async_api_view
+from core.conditional import conditional_view
+from core.throttling import throttle
+from django.utils.decorators import method_decorator
+from users.etags import profile_tag
+from .signals import NOTICES_TAG
+from core.pagination import KeysetPagination
+
+
+class ContactInboxPagination(KeysetPagination):
+    ordering_field = 'last_activity_at'
+
+
+def inbox_scope(user):
+    """Messages ``user`` may see: every thread for superusers, their state's / district's for admins, their own otherwise."""
+    base_qs = ContactMessage.objects.filter(parent__isnull=True)
+
+    if user.is_superuser:
+        return base_qs
+
+    if user.user_type == 'state_admin':
+        state = user.stateadminprofile.state
+        return base_qs.filter(state=state)
+
+    if user.user_type == 'district_admin':
+        district = user.districtadminprofile.district
+        return base_qs.filter(district=district)
+
+    if user.user_type in ['krisshak', 'bhooswami']:
+        # Own threads plus other people's replies to them, merged in one query
+        # (an OR rather than .union() so filters and paging still apply)
+        return ContactMessage.objects.filter(
+            Q(sender=user, parent__isnull=True) |
+            (Q(parent__sender=user) & ~Q(sender=user))
+        )
+
+    return base_qs.filter(sender=user)
 
 
 class ContactMessageListView(generics.ListAPIView):
+    """Inbox ordered by thread activity. Supports ?resolved=, ?unread= and cursor paging."""
     serializer_class = ContactMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ContactInboxPagination
+
+    def get_scope_queryset(self, user):
+        return inbox_scope(user)
 
     def get_queryset(self):
         user = self.request.user
-
-        base_qs = ContactMessage.objects.filter(parent__isnull=True)
+        params = self.request.query_params
 
         try:
-            if user.is_superuser:
-                return base_qs
+            queryset = self.get_scope_queryset(user)
+        except Exception as e:
+            print("🔥 ContactMessageListView Error:", str(e))
+            return ContactMessage.objects.none()
 
-            if user.user_type == 'state_admin':
-                state = user.stateadminprofile.state
-                return base_qs.filter(state=state)
+        resolved = params.get('resolved')
+        if resolved in ('true', 'false'):
+            queryset = queryset.filter(is_resolved=(resolved == 'true'))
+        if params.get('unread') == 'true':
+            # Unread is per thread: the row itself or any reply in it, from the other
+            # side, not seen yet (your own messages are never unread for you).
+            # The subquery walks contact_parent_unread_idx.
+            unread_replies = ContactMessage.objects.filter(parent=OuterRef('pk'), is_read=False).exclude(sender=user)
+            queryset = queryset.filter(
+                (Q(is_read=False) & ~Q(sender=user)) | Exists(unread_replies)
+            )
 
-            if user.user_type == 'district_admin':
-                district = user.districtadminprofile.district
-                return base_qs.filter(district=district)
+        return queryset.prefetch_related(
+            Prefetch('replies', queryset=ContactMessage.objects.order_by('created_at'))
+        ).order_by('-last_activity_at', '-id')
 
-            if user.user_type in ['krisshak', 'bhooswami']:
-                sent = ContactMessage.objects.filter(sender=user, parent__isnull=True)
-                replies = ContactMessage.objects.filter(parent__sender=user).exclude(sender=user)
 
-                # Merge with Python, not .union()
-                combined = list(sent) + list(replies)
-                combined.sort(key=lambda x: x.created_at, reverse=True)  # newest first
-                return combined
+class ContactThreadReadView(APIView):
+    """Mark a thread (root + replies from others) as read.
 
-            return base_qs.filter(sender=user)
+    ``is_read`` is one flag per message, not per reader: it means the other
+    side has seen it. A sender's reply is read once any admin over their
+    district / state opens the thread, for all of those admins alike; admin
+    replies are read once the sender opens it.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-        except Exception as e:
-            print("🔥 ContactMessageListView Error:", str(e))
-            return ContactMessage.objects.none()
+    def post(self, request, pk):
+        user = request.user
+        try:
+            scope = inbox_scope(user)
+        except ObjectDoesNotExist:
+            # An admin account without its admin profile has no inbox
+            scope = ContactMessage.objects.none()
+
+        # Threads outside the user's inbox don't exist as far as they're concerned
+        root = scope.filter(id=pk, parent__isnull=True).first()
+        if not root:
+            return Response({"error": "Thread not found."}, status=404)
+
+        updated = (
+            ContactMessage.objects.filter(Q(pk=root.pk) | Q(parent=root), is_read=False)
+            .exclude(sender=user)
+            .update(is_read=True)
+        )
+        return Response({"updated": updated}, status=200)
 
 
 class ContactMessageView(APIView):
@@ -152,36 +221,33 @@ class ContactReplyView(APIView):
         return Response({"message": "Reply saved successfully."}, status=201)
 
 
-@api_view(["GET"])
-def get_notices(request):
+@async_api_view()
+@conditional_view(lambda request: [NOTICES_TAG, profile_tag(request.user.pk)])
+async def get_notices(request):
     """Fetch notices visible to the logged-in user."""
     user = request.user
     if not user.is_authenticated:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
     try:
         # Try to match user’s role safely
-        if hasattr(user, "stateadminprofile"):
-            state = user.stateadminprofile.state
-            notices = Notice.objects.filter(state=user.stateadminprofile)
-        elif hasattr(user, "districtadminprofile"):
-            district = user.districtadminprofile
-            notices = Notice.objects.filter(district=district)
+        if await StateAdminProfile.objects.filter(user=user).aexists():
+            notices = Notice.objects.filter(state__user=user)
+        elif await DistrictAdminProfile.objects.filter(user=user).aexists():
+            notices = Notice.objects.filter(district__user=user)
         else:
             # fallback for Krisshak or others — filter by state via profile
-            state = None
-            if hasattr(user, "krisshakprofile"):
-                state = user.krisshakprofile.state
-            elif hasattr(user, "bhooswamiprofile"):
-                state = user.bhooswamiprofile.state
+            state_id = await KrisshakProfile.objects.filter(user=user).values_list("state_id", flat=True).afirst()
+            if state_id is None:
+                state_id = await BhooswamiProfile.objects.filter(user=user).values_list("state_id", flat=True).afirst()
 
-            notices = Notice.objects.filter(state__state=state) if state else Notice.objects.none()
+            notices = Notice.objects.filter(state__state_id=state_id) if state_id else Notice.objects.none()
 
-        serialized = NoticeSerializer(notices, many=True)
-        return JsonResponse({"notices": serialized.data}, safe=False)
+        serialized = NoticeSerializer([notice async for notice in notices], many=True)
+        return FastJsonResponse({"notices": serialized.data}, safe=False)
 
     except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+        return FastJsonResponse({"error": str(e)}, status=500)
 
 
 @api_view(["POST"])
@@ -189,11 +255,11 @@ def create_notice(request):
     """Allows state or district admins to create a notice."""
     user = request.user
     if user.user_type not in ["state_admin", "district_admin"]:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
     content = request.data.get("content")
     if not content:
-        return JsonResponse({"error": "Notice content is required"}, status=400)
+        return FastJsonResponse({"error": "Notice content is required"}, status=400)
 
     notice = Notice.objects.create(
         author_type=user.user_type,
@@ -219,8 +285,9 @@ def create_notice(request):
         },
     )
 
-    return JsonResponse({"message": "Notice created successfully"}, status=201)
+    return FastJsonResponse({"message": "Notice created successfully"}, status=201)
 
+@method_decorator(throttle("contact"), name='post')
 class PublicContactMessageView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -1,3 +1,35 @@
 from django.contrib import admin
+from .models import ChangeCheckpoint, ChangeRecord, Tombstone
 
-# Register your models here.
+
+@admin.register(ChangeRecord)
+class ChangeRecordAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model', 'object_id', 'operation', 'created_at')
+    list_filter = ('model', 'operation')
+    search_fields = ('object_id',)
+    readonly_fields = [f.name for f in ChangeRecord._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChangeCheckpoint)
+class ChangeCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('projection', 'position', 'updated_at')
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model', 'object_id', 'user_id', 'deleted_at')
+    list_filter = ('model',)
+    search_fields = ('object_id', 'user_id')
+    readonly_fields = [f.name for f in Tombstone._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import checks  # registers the system checks
+        from core.warmup import register_warmup, warm_cache, warm_database, warm_translations
+        register_warmup("core.database", warm_database)
+        register_warmup("core.cache", warm_cache)
+        register_warmup("core.translations", warm_translations)
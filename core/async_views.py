@@ -0,0 +1,147 @@
+"""Async read endpoints without DRF's sync request cycle.
+
+DRF views always run synchronously, so under ASGI each one holds a worker
+thread for the whole request. The hottest read endpoints are plain Django
+async views instead, built on these helpers:
+
+    @async_api_view(authentication=("token",))
+    async def search_krisshaks(request): ...
+
+    class StateListView(AsyncAPIView):
+        permission = None
+        async def get(self, request): ...
+
+Authentication mirrors the DRF classes in settings (JWT bearer, Token, and
+optionally the session) using the async ORM, and failures answer with the
+same status codes and ``detail`` bodies DRF would.
+"""
+import functools
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.views import View
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.json import FastJsonResponse
+
+DEFAULT_AUTHENTICATION = ("jwt", "token")
+
+# WWW-Authenticate challenge per scheme, as DRF sends it
+CHALLENGES = {
+    "jwt": 'Bearer realm="api"',
+    "token": "Token",
+}
+
+
+class AuthenticationFailed(Exception):
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+async def _user_from_token(key):
+    try:
+        token = await Token.objects.select_related("user").aget(key=key)
+    except Token.DoesNotExist:
+        raise AuthenticationFailed("Invalid token.")
+    return token.user
+
+
+async def _user_from_jwt(raw):
+    try:
+        validated = JWTAuthentication().get_validated_token(raw.encode())
+        user_id = validated[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        raise AuthenticationFailed("Given token not valid for any token type")
+    try:
+        return await get_user_model().objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+    except get_user_model().DoesNotExist:
+        raise AuthenticationFailed("User not found")
+
+
+async def aauthenticate(request, authentication=DEFAULT_AUTHENTICATION):
+    """Resolve ``request.user`` from the Authorization header (or session). Raises AuthenticationFailed."""
+    forced = getattr(request, "_force_auth_user", None)
+    if forced is not None:
+        # Already authenticated by the caller (core.batch, DRF's test client)
+        request.user = forced
+        return forced
+
+    keyword, _, credential = request.headers.get("Authorization", "").partition(" ")
+    credential = credential.strip()
+
+    user = None
+    if keyword == "Bearer" and "jwt" in authentication and credential:
+        user = await _user_from_jwt(credential)
+    elif keyword == "Token" and "token" in authentication and credential:
+        user = await _user_from_token(credential)
+    elif "session" in authentication:
+        user = await request.auser()
+
+    if user is None:
+        user = AnonymousUser()
+    elif user.is_authenticated and not user.is_active:
+        raise AuthenticationFailed("User inactive or deleted.")
+
+    request.user = user
+    return user
+
+
+def _not_authenticated(authentication, detail):
+    response = FastJsonResponse({"detail": detail}, status=401)
+    challenge = next((CHALLENGES[scheme] for scheme in authentication if scheme in CHALLENGES), None)
+    if challenge:
+        response["WWW-Authenticate"] = challenge
+    return response
+
+
+async def check_request(request, authentication, permission):
+    """Authenticate and apply the permission; returns an error response or None."""
+    try:
+        user = await aauthenticate(request, authentication)
+    except AuthenticationFailed as e:
+        return _not_authenticated(authentication, e.detail)
+    if permission == "authenticated" and not user.is_authenticated:
+        return _not_authenticated(authentication, "Authentication credentials were not provided.")
+    return None
+
+
+async def _run(handler, request, *args, **kwargs):
+    try:
+        return await handler(request, *args, **kwargs)
+    except ValidationError as e:
+        return FastJsonResponse(e.detail, status=400, safe=False)
+
+
+def async_api_view(methods=("GET",), authentication=DEFAULT_AUTHENTICATION, permission="authenticated"):
+    """Decorator for async function views: method check, auth and permission, DRF-style errors."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return FastJsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            error = await check_request(request, authentication, permission)
+            if error is not None:
+                return error
+            return await _run(view, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class AsyncAPIView(View):
+    """Async class-based view with the same auth handling as async_api_view."""
+    authentication = DEFAULT_AUTHENTICATION
+    permission = "authenticated"
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return FastJsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+        error = await check_request(request, self.authentication, self.permission)
+        if error is not None:
+            return error
+        return await _run(handler, request, *args, **kwargs)
@@ -0,0 +1,240 @@
+"""Request batching: several API calls in one round trip (``POST /api/core/batch/``).
+
+    {"requests": [
+        {"id": "unread", "method": "GET", "path": "/api/notifications/unread-count/"},
+        {"id": "notices", "path": "/api/contact/notices/", "headers": {"If-None-Match": "\\"...\\""}},
+        {"id": "read", "method": "POST", "path": "/api/notifications/read/bulk/", "body": {"ids": [3]}}
+    ]}
+    -> {"responses": [{"id": "unread", "status": 200, "headers": {...}, "body": {...}}, ...]}
+
+Sub-requests call the resolved views directly, in this process. They share
+the batch's authentication, so the user is looked up once and every view
+(DRF, plain or async) sees it. Runs of consecutive GETs execute
+concurrently on a small thread pool; other methods run one at a time, in
+order, so a write is seen by the reads after it. Identical GETs in one
+batch are answered once.
+
+Each sub-response carries its status, a few headers (ETag, Location, ...)
+and its body as data. The batch itself goes through the usual renderers
+and middleware, so it can come back compressed or as msgpack.
+"""
+import contextvars
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core import json as fast_json
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD")
+ALLOWED_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE")
+# Sub-requests may set these; the principal and transport stay the batch's
+ALLOWED_HEADERS = {"if-none-match"}
+RETURNED_HEADERS = ("ETag", "Cache-Control", "Location", "Retry-After", "X-DB-Pin")
+# Request META that describes the batch request itself, not a sub-request
+_BATCH_META = (
+    "CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_IF_NONE_MATCH", "HTTP_ACCEPT", "HTTP_ACCEPT_ENCODING",
+    "HTTP_CONTENT_ENCODING",
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.API_BATCH_MAX_WORKERS, thread_name_prefix="api-batch")
+        return _executor
+
+
+def parse_batch(data):
+    """Validated sub-request specs from the batch body. Raises ValidationError."""
+    items = data.get("requests") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValidationError({"requests": "Send a non-empty list of sub-requests."})
+    if len(items) > settings.API_BATCH_MAX_REQUESTS:
+        raise ValidationError({"requests": f"At most {settings.API_BATCH_MAX_REQUESTS} sub-requests per batch."})
+
+    specs = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            raise ValidationError({"requests": f"Sub-request {index} needs a path."})
+        method = str(item.get("method", "GET")).upper()
+        if method not in ALLOWED_METHODS:
+            raise ValidationError({"requests": f"Sub-request {index}: method {method} is not allowed."})
+        if not item["path"].startswith("/api/"):
+            raise ValidationError({"requests": f"Sub-request {index}: only /api/ paths can be batched."})
+        headers = item.get("headers") or {}
+        if not isinstance(headers, dict):
+            raise ValidationError({"requests": f"Sub-request {index}: headers must be an object."})
+        specs.append({
+            "id": item.get("id", index),
+            "method": method,
+            "path": item["path"],
+            "headers": {name: str(value) for name, value in headers.items() if name.lower() in ALLOWED_HEADERS},
+            "body": item.get("body"),
+        })
+    return specs
+
+
+def _build_request(batch_request, spec):
+    """A WSGIRequest for ``spec`` carrying the batch request's META and user."""
+    url = urlsplit(spec["path"])
+    body = b"" if spec["body"] is None else fast_json.dumps(spec["body"])
+    meta = {key: value for key, value in batch_request.META.items() if key not in _BATCH_META}
+    meta.update({
+        "REQUEST_METHOD": spec["method"],
+        "PATH_INFO": url.path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": url.query,
+        "HTTP_ACCEPT": "application/json",
+        "wsgi.input": io.BytesIO(body),
+    })
+    if body:
+        meta["CONTENT_TYPE"] = "application/json"
+        meta["CONTENT_LENGTH"] = str(len(body))
+    for name, value in spec["headers"].items():
+        meta["HTTP_" + name.upper().replace("-", "_")] = value
+
+    request = WSGIRequest(meta)
+    user = batch_request.user
+    request.user = user
+    # DRF views (and core.async_views) use the batch's user instead of authenticating again
+    request._force_auth_user = user
+    request._force_auth_token = getattr(batch_request, "auth", None)
+    if hasattr(batch_request, "session"):
+        request.session = batch_request.session
+    return request
+
+
+def _error(status, detail):
+    return {"status": status, "headers": {}, "body": {"detail": detail}}
+
+
+def _body(response):
+    if isinstance(response, Response):
+        return response.data  # no need to render it just to parse it back
+    if hasattr(response, "json_data"):
+        return response.json_data
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    if not content:
+        return None
+    if "json" in response.get("Content-Type", ""):
+        return fast_json.loads(content)
+    return content.decode(response.charset or "utf-8", errors="replace")
+
+
+def run_one(batch_request, spec):
+    """Execute one sub-request; returns ``{"status", "headers", "body"}``."""
+    path = urlsplit(spec["path"]).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return _error(404, "Not found.")
+    if match.url_name == "api-batch":
+        return _error(400, "Batches can't be nested.")
+
+    request = _build_request(batch_request, spec)
+    request.resolver_match = match
+    try:
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(request, *match.args, **match.kwargs)
+        else:
+            response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return _error(404, "Not found.")
+    except PermissionDenied:
+        return _error(403, "You do not have permission to perform this action.")
+    except Exception:
+        logger.exception("Batched %s %s failed", spec["method"], spec["path"])
+        return _error(500, "Internal server error.")
+
+    headers = {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)}
+    return {"status": response.status_code, "headers": headers, "body": _body(response)}
+
+
+def _task_context():
+    """A copy of the current context for one worker task.
+
+    asgiref's Local (translations, async_to_sync's executor) keeps a dict in a
+    ContextVar and changes it in place, so plain copies share it: an async
+    sub-view could hand its sync ORM calls to another task's thread and wait
+    forever. Each task gets its own dicts.
+    """
+    context = contextvars.copy_context()
+
+    def isolate():
+        for var, value in context.items():
+            if var.name == "asgiref.local" and isinstance(value, dict):
+                var.set(dict(value))
+
+    context.run(isolate)
+    return context
+
+
+def _run_in_worker(context, batch_request, spec):
+    try:
+        return context.run(run_one, batch_request, spec)
+    finally:
+        # Worker threads never see request_finished; release their connections here
+        close_old_connections()
+
+
+def _read_key(spec):
+    return (spec["method"], spec["path"], tuple(sorted((k.lower(), v) for k, v in spec["headers"].items())))
+
+
+def run_batch(batch_request, specs):
+    """Results for ``specs`` in order: reads in parallel, writes one by one."""
+    results = [None] * len(specs)
+    memo = {}  # identical reads are executed once per batch
+
+    def flush(pending):
+        futures = {}
+        for index, spec in pending:
+            key = _read_key(spec)
+            if key in memo:
+                continue
+            if len(pending) == 1:
+                memo[key] = run_one(batch_request, spec)
+            else:
+                # Each task gets its own copy: language, DB routing state and the like
+                context = _task_context()
+                futures[key] = executor().submit(_run_in_worker, context, batch_request, spec)
+                memo[key] = None
+        for key, future in futures.items():
+            memo[key] = future.result()
+        for index, spec in pending:
+            results[index] = memo[_read_key(spec)]
+
+    pending = []
+    for index, spec in enumerate(specs):
+        if spec["method"] in READ_METHODS:
+            pending.append((index, spec))
+            continue
+        flush(pending)
+        pending = []
+        # A write invalidates whatever the earlier reads saw
+        memo.clear()
+        results[index] = run_one(batch_request, spec)
+    flush(pending)
+
+    return [{"id": spec["id"], **result} for spec, result in zip(specs, results)]
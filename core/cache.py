@@ -0,0 +1,399 @@
+"""Two-tier cache: a small per-process LRU in front of the shared Django cache.
+
+    from core.cache import tiered_cache, cached
+
+    data = tiered_cache.get_or_set("states", build_states, timeout=3600, tags=["reference"])
+    tiered_cache.invalidate_tags("reference")
+
+Tags ("district:42", "user:7") are version counters in the shared cache.
+Every entry remembers the versions it was written under, and bumping a tag
+makes all of them stale at once. The local tier trusts its copies (and the
+tag versions it has seen) for ``CACHE_LOCAL_TTL`` seconds, so another
+worker's invalidation reaches this process within that window; in the
+process that bumps, the entries carrying the tag go at once.
+
+The shared cache must really be shared by the workers (see CACHES in
+settings); a per-process one means a bump is never seen by the others.
+
+Misses are single-flight: one thread per process computes the value and the
+others wait for it, and a short lock in the shared cache stops other
+workers from computing the same key at the same time.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.query import QuerySet
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe LRU with a per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value, _ = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value, frozenset(tags))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_tagged(self, tags):
+        """Drop the entries stored with any of ``tags``."""
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, (_, _, entry_tags) in self._data.items() if entry_tags & tags]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheMetrics:
+    """Per-process hit / miss counters, overall and per key namespace."""
+
+    FIELDS = ("local_hits", "shared_hits", "misses", "sets", "invalidations", "coalesced")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, key, field):
+        namespace = key.split(":", 1)[0]
+        with self._lock:
+            self._counts[namespace][field] += 1
+            self._counts["*"][field] += 1
+
+    @staticmethod
+    def _with_ratio(counts):
+        counts = dict(counts)
+        lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+        counts["hit_ratio"] = round((counts["local_hits"] + counts["shared_hits"]) / lookups, 4) if lookups else None
+        return counts
+
+    def snapshot(self):
+        with self._lock:
+            counts = {name: dict(values) for name, values in self._counts.items()}
+        total = counts.pop("*", dict.fromkeys(self.FIELDS, 0))
+        return {
+            "total": self._with_ratio(total),
+            "namespaces": {name: self._with_ratio(values) for name, values in sorted(counts.items())},
+        }
+
+
+class TieredCache:
+    def __init__(self, alias="default", local_max_entries=None, local_ttl=None, lock_timeout=None):
+        self.alias = alias
+        self.local_ttl = local_ttl if local_ttl is not None else settings.CACHE_LOCAL_TTL
+        self.lock_timeout = lock_timeout if lock_timeout is not None else settings.CACHE_LOCK_TIMEOUT
+        self.tag_timeout = settings.CACHE_TAG_TIMEOUT
+        self.local = LocalLRU(local_max_entries or settings.CACHE_LOCAL_MAX_ENTRIES)
+        self.metrics = CacheMetrics()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # Tags
+
+    @staticmethod
+    def _tag_key(tag):
+        return f"tag:{tag}"
+
+    def tag_versions(self, tags):
+        """Current version of each tag, read through the local tier."""
+        versions, missing = {}, []
+        for tag in tags:
+            version = self.local.get(self._tag_key(tag))
+            if version is _MISSING:
+                missing.append(tag)
+            else:
+                versions[tag] = version
+
+        if missing:
+            stored = self.shared.get_many([self._tag_key(tag) for tag in missing])
+            for tag in missing:
+                version = stored.get(self._tag_key(tag))
+                if version is None:
+                    # Unknown tags start at a fresh version so old entries can't match
+                    version = time.time_ns()
+                    if not self.shared.add(self._tag_key(tag), version, timeout=self.tag_timeout):
+                        version = self.shared.get(self._tag_key(tag), version)
+                versions[tag] = version
+                self.local.set(self._tag_key(tag), version, self.local_ttl)
+        return versions
+
+    async def atag_versions(self, tags):
+        """Async tag_versions: served on the event loop when every tag is in the local tier."""
+        versions = {}
+        for tag in tags:
+            version = self.local.get(self._tag_key(tag))
+            if version is _MISSING:
+                return await sync_to_async(self.tag_versions)(tags)
+            versions[tag] = version
+        return versions
+
+    def invalidate_tags(self, *tags):
+        """Make every entry written under any of ``tags`` stale, in every process."""
+        for tag in tags:
+            key = self._tag_key(tag)
+            self.shared.set(key, time.time_ns(), timeout=self.tag_timeout)
+            self.local.delete(key)
+            self.metrics.incr(key, "invalidations")
+        # Local copies written under these tags; the rest of the tier stays warm
+        if tags:
+            self.local.delete_tagged(tags)
+
+    # Entries
+
+    def _is_fresh(self, entry):
+        value, versions = entry
+        if versions and self.tag_versions(versions) != versions:
+            return _MISSING
+        return value
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.metrics.incr(key, "local_hits")
+            return value
+
+        entry = self.shared.get(key)
+        if entry is not None:
+            value = self._is_fresh(entry)
+            if value is not _MISSING:
+                self.metrics.incr(key, "shared_hits")
+                self.local.set(key, value, self.local_ttl, entry[1])
+                return value
+
+        self.metrics.incr(key, "misses")
+        return default
+
+    def set(self, key, value, timeout=300, tags=()):
+        if isinstance(value, QuerySet):
+            value = list(value)
+        versions = self.tag_versions(tags) if tags else {}
+        self.shared.set(key, (value, versions), timeout)
+        self.local.set(key, value, min(self.local_ttl, timeout) if timeout else self.local_ttl, tags)
+        self.metrics.incr(key, "sets")
+        return value
+
+    def get_many(self, keys):
+        """``{key: value}`` for the keys cached and fresh: one shared round trip and one tag check for all of them."""
+        found, remote = {}, []
+        for key in keys:
+            value = self.local.get(key)
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                self.metrics.incr(key, "local_hits")
+                found[key] = value
+        if not remote:
+            return found
+
+        entries = self.shared.get_many(remote)
+        tags = set()
+        for _, versions in entries.values():
+            tags.update(versions)
+        current = self.tag_versions(tags) if tags else {}
+        for key in remote:
+            entry = entries.get(key)
+            if entry is not None and all(current[tag] == version for tag, version in entry[1].items()):
+                self.metrics.incr(key, "shared_hits")
+                self.local.set(key, entry[0], self.local_ttl, entry[1])
+                found[key] = entry[0]
+            else:
+                self.metrics.incr(key, "misses")
+        return found
+
+    def set_many(self, values, timeout=300, tags=None):
+        """Store ``{key: value}`` in one shared round trip; ``tags`` maps keys to their tags."""
+        tags = tags or {}
+        all_tags = set()
+        for entry_tags in tags.values():
+            all_tags.update(entry_tags)
+        versions = self.tag_versions(all_tags) if all_tags else {}
+        self.shared.set_many(
+            {key: (value, {tag: versions[tag] for tag in tags.get(key, ())}) for key, value in values.items()},
+            timeout,
+        )
+        local_ttl = min(self.local_ttl, timeout) if timeout else self.local_ttl
+        for key, value in values.items():
+            self.local.set(key, value, local_ttl, tags.get(key, ()))
+            self.metrics.incr(key, "sets")
+
+    def delete(self, key):
+        self.shared.delete(key)
+        self.local.delete(key)
+
+    def get_or_set(self, key, compute, timeout=300, tags=()):
+        """Return the cached value or compute it once, however many callers miss together."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = threading.Event()
+
+        if not leader:
+            # Another thread in this process is computing it
+            flight.wait(self.lock_timeout)
+            self.metrics.incr(key, "coalesced")
+            value = self.get(key, _MISSING)
+            return value if value is not _MISSING else compute()
+
+        try:
+            return self._compute_shared(key, compute, timeout, tags)
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.set()
+
+    async def aget_or_set(self, key, compute, timeout=300, tags=()):
+        """Async get_or_set: local hits are served on the event loop, anything else in a thread."""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.metrics.incr(key, "local_hits")
+            return value
+        return await sync_to_async(self.get_or_set)(key, compute, timeout, tags)
+
+    def _compute_shared(self, key, compute, timeout, tags):
+        lock_key = f"lock:{key}"
+        if not self.shared.add(lock_key, 1, timeout=self.lock_timeout):
+            # Another worker holds the lock: wait briefly for its result
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                entry = self.shared.get(key)
+                if entry is not None and self._is_fresh(entry) is not _MISSING:
+                    self.metrics.incr(key, "coalesced")
+                    value = entry[0]
+                    self.local.set(key, value, self.local_ttl, entry[1])
+                    return value
+            lock_key = None
+
+        try:
+            return self.set(key, compute(), timeout, tags)
+        finally:
+            if lock_key:
+                self.shared.delete(lock_key)
+
+
+tiered_cache = TieredCache()
+
+
+def _call_key(prefix, args, kwargs):
+    parts = [prefix] + [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
+    return ":".join(parts)
+
+
+def cached(timeout=300, key=None, tags=()):
+    """Cache a function's return value (querysets are stored as lists).
+
+    ``key`` and ``tags`` may be callables taking the function's arguments.
+    """
+    def decorator(func):
+        prefix = f"fn:{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if callable(key) else key or _call_key(prefix, args, kwargs)
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return tiered_cache.get_or_set(cache_key, lambda: func(*args, **kwargs), timeout, entry_tags)
+
+        wrapper.invalidate = lambda *args, **kwargs: tiered_cache.delete(
+            key(*args, **kwargs) if callable(key) else key or _call_key(prefix, args, kwargs)
+        )
+        return wrapper
+    return decorator
+
+
+def cached_view(timeout=60, tags=(), vary_on_user=True):
+    """Cache successful GET responses of a function view or APIView method.
+
+    DRF responses are cached as their ``data``; plain responses as bytes.
+    ``tags`` may be a callable taking ``(request, *args, **kwargs)``.
+    """
+    def decorator(view):
+        prefix = f"view:{view.__module__}.{view.__qualname__}"
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Function views get (request, ...); APIView methods get (self, request, ...)
+            request = args[1] if len(args) > 1 and hasattr(args[1], "method") else args[0]
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            user = getattr(request, "user", None)
+            user_part = user.pk if vary_on_user and user is not None and user.is_authenticated else "anon"
+            cache_key = f"{prefix}:{user_part}:{request.get_full_path()}:{sorted(kwargs.items())}"
+            view_args = args[args.index(request):]
+            entry_tags = tags(*view_args, **kwargs) if callable(tags) else tags
+
+            hit = tiered_cache.get(cache_key)
+            if hit is not None:
+                return _rebuild_response(hit)
+
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                tiered_cache.set(cache_key, _freeze_response(response), timeout, entry_tags)
+            return response
+        return wrapper
+    return decorator
+
+
+def _freeze_response(response):
+    if hasattr(response, "data"):
+        return ("data", response.data, response.status_code)
+    return ("raw", response.content, response.get("Content-Type"))
+
+
+def _rebuild_response(frozen):
+    from django.http import HttpResponse
+    from rest_framework.response import Response
+
+    kind, payload, extra = frozen
+    if kind == "data":
+        return Response(payload, status=extra)
+    return HttpResponse(payload, content_type=extra)
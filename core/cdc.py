@@ -0,0 +1,237 @@
+"""Change-data-capture outbox.
+
+Apps register the models whose writes should be captured:
+
+    track_model(Appointment, fields=("krisshak_id", "bhooswami_id", "status", "date"))
+
+With CDC_DEFER_PROJECTIONS on, every save / delete of a tracked model then
+appends a ChangeRecord in the same transaction as the write; writes that
+send no signals go through ``record_changes`` (bulk_create) or
+``update_tracked`` (queryset .update()). (Off, the projections run inside
+the request and nothing reads the log, so nothing is written to it.) Derived data is maintained by projections:
+
+    register_projection("pair_history", ["appointments.appointment"], handle_batch)
+
+``manage.py consume_changes`` reads the log in id order and hands each
+projection the records for its models in batches. Each batch and its
+checkpoint commit together; ids that commit after the checkpoint passed
+them are picked up later (see ``consume_batch``). Resetting a checkpoint replays the retained log
+to rebuild a projection.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ChangeCheckpoint, ChangeRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Projection:
+    name: str
+    models: tuple
+    handler: object
+
+
+MAX_GAPS = 10000  # per batch; more missing ids than this is not a few open transactions
+
+_tracked = {}      # model label -> tracked field attnames
+_projections = {}  # name -> Projection
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def deferred():
+    """True when projections run in the consumer instead of inside the request."""
+    return getattr(settings, "CDC_DEFER_PROJECTIONS", False)
+
+
+def _snapshot(instance, fields):
+    return {field: getattr(instance, field, None) for field in fields}
+
+
+def _build_record(instance, operation, fields, changed_fields=None):
+    return ChangeRecord(
+        model=model_label(type(instance)),
+        object_id="" if instance.pk is None else str(instance.pk),
+        operation=operation,
+        changed_fields=sorted(changed_fields) if changed_fields else None,
+        data=_snapshot(instance, fields),
+    )
+
+
+def record_changes(model, instances, operation, using=DEFAULT_DB_ALIAS, changed_fields=None):
+    """Append change records for writes that bypass signals (e.g. bulk_create)."""
+    fields = _tracked.get(model_label(model))
+    if fields is None or not deferred():
+        return
+    records = [_build_record(instance, operation, fields, changed_fields) for instance in instances]
+    if records:
+        ChangeRecord.objects.using(using).bulk_create(records)
+
+
+def update_tracked(queryset, **values):
+    """``queryset.update(**values)`` that also records the change of every row it touches.
+
+    ``.update()`` sends no signals, so writes to tracked models go through
+    here. ``values`` must be plain values (no F() expressions): they are
+    copied onto the rows for the records' snapshots.
+    """
+    model, using = queryset.model, queryset.db
+    if model_label(model) not in _tracked or not deferred():
+        return queryset.update(**values)
+
+    with transaction.atomic(using=using):
+        rows = list(queryset.select_for_update())
+        if not rows:
+            return 0
+        updated = model._base_manager.using(using).filter(pk__in=[row.pk for row in rows]).update(**values)
+        for row in rows:
+            for name, value in values.items():
+                setattr(row, name, value)
+        record_changes(model, rows, "update", using=using, changed_fields=values)
+    return updated
+
+
+def _on_save(sender, instance, created, update_fields=None, using=DEFAULT_DB_ALIAS, raw=False, **kwargs):
+    if raw or not deferred():
+        return
+    fields = _tracked[model_label(sender)]
+    record = _build_record(instance, "create" if created else "update", fields, update_fields)
+    record.save(using=using)
+
+
+def _on_delete(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    if not deferred():
+        return
+    fields = _tracked[model_label(sender)]
+    _build_record(instance, "delete", fields).save(using=using)
+
+
+def track_model(model, fields=()):
+    """Capture every save / delete of ``model``, storing ``fields`` with each record."""
+    label = model_label(model)
+    if label in _tracked:
+        return
+    _tracked[label] = tuple(fields)
+    post_save.connect(_on_save, sender=model, dispatch_uid=f"cdc_save_{label}")
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f"cdc_delete_{label}")
+
+
+def register_projection(name, models, handler):
+    """Register ``handler(records)`` to receive change records of ``models`` (labels)."""
+    _projections[name] = Projection(name, tuple(models), handler)
+
+
+def projections():
+    return dict(_projections)
+
+
+def _find_gaps(position, last, horizon):
+    """Ids in (position, last) with no record yet, where a still-open transaction may be holding them.
+
+    A hole is only kept when the record after it is newer than ``horizon``: a
+    transaction open from before an older record would be longer than
+    CDC_GAP_TIMEOUT_SECONDS (and a pruned log isn't mistaken for holes).
+    """
+    gaps = []
+    previous = position or None  # a fresh checkpoint has nothing before the first record
+    rows = ChangeRecord.objects.filter(id__gt=position, id__lte=last).order_by("id").values_list("id", "created_at")
+    for record_id, created_at in rows.iterator():
+        if previous is not None and record_id > previous + 1 and created_at >= horizon:
+            if len(gaps) + record_id - previous - 1 > MAX_GAPS:
+                logger.warning("CDC: %s ids missing before #%s, not tracking them", record_id - previous - 1, record_id)
+            else:
+                gaps.extend(range(previous + 1, record_id))
+        previous = record_id
+    return gaps
+
+
+def consume_batch(projection, batch_size=500, settle_seconds=None):
+    """Hand the next batch of records to one projection. Returns how many it got.
+
+    Ids are allocated when a record is inserted, but it becomes visible when its
+    transaction commits, so a lower id can show up after the checkpoint has
+    passed it. Missing ids below the checkpoint are kept on it as gaps and
+    looked up again on every batch; records that fill one are handed over then.
+    A gap is given up after CDC_GAP_TIMEOUT_SECONDS (rolled-back inserts leave
+    holes for good), which bounds how long a transaction writing tracked models
+    may stay open. Only records older than ``settle_seconds`` are read, which
+    keeps most late commits from turning into gaps in the first place.
+    """
+    if settle_seconds is None:
+        settle_seconds = settings.CDC_SETTLE_SECONDS
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settle_seconds)
+    horizon = now - timedelta(seconds=settings.CDC_GAP_TIMEOUT_SECONDS)
+
+    with transaction.atomic():
+        checkpoint, _ = ChangeCheckpoint.objects.get_or_create(projection=projection.name)
+        checkpoint = ChangeCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+        gaps = {
+            record_id: seen for record_id, seen in (checkpoint.gaps or {}).items()
+            if parse_datetime(seen) >= horizon
+        }
+
+        late = []
+        if gaps:
+            filled = list(ChangeRecord.objects.filter(id__in=[int(record_id) for record_id in gaps]).order_by("id"))
+            for record in filled:
+                del gaps[str(record.id)]
+            late = [record for record in filled if record.model in projection.models]
+
+        records = list(
+            ChangeRecord.objects.filter(
+                id__gt=checkpoint.position,
+                model__in=projection.models,
+                created_at__lte=cutoff,
+            ).order_by("id")[:batch_size]
+        )
+        if records:
+            seen = now.isoformat()
+            for record_id in _find_gaps(checkpoint.position, records[-1].id, horizon):
+                gaps.setdefault(str(record_id), seen)
+
+        batch = late + records
+        if not batch and gaps == checkpoint.gaps:
+            return 0
+
+        if batch:
+            projection.handler(batch)
+        if records:
+            checkpoint.position = records[-1].id
+        checkpoint.gaps = gaps
+        checkpoint.save(update_fields=["position", "gaps", "updated_at"])
+    return len(batch)
+
+
+def reset_checkpoint(name, position=0):
+    """Rewind a projection so the next consume replays the log from ``position``."""
+    ChangeCheckpoint.objects.update_or_create(projection=name, defaults={"position": position})
+
+
+def prune_changes(older_than_days):
+    """Delete records older than the cutoff that every projection has consumed.
+
+    Projections that have never checkpointed hold nothing back (the age
+    cutoff alone applies to them), so start a new consumer before its
+    records age out.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    positions = list(
+        ChangeCheckpoint.objects.filter(projection__in=list(_projections)).values_list("position", flat=True)
+    )
+    queryset = ChangeRecord.objects.filter(created_at__lt=cutoff)
+    if positions:
+        queryset = queryset.filter(id__lte=min(positions))
+    deleted, _ = queryset.delete()
+    return deleted
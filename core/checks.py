@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """core.cache tags and the rate-limit buckets need a cache every worker shares."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        "The default cache is local to each process.",
+        hint="Tag invalidation (ETags, cached profiles) won't reach other workers and each worker keeps "
+             "its own rate-limit buckets. Set REDIS_URL, or leave CACHE_BACKEND unset to use the database cache.",
+        id="core.W001",
+    )]
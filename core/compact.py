@@ -0,0 +1,153 @@
+"""Compact msgpack encoding for low-bandwidth clients (``Accept: application/msgpack``).
+
+The body is a msgpack map ``{"v": 1, "refs": [...], "data": ...}`` where
+``data`` is the response with two space savers, both as msgpack ext types:
+
+* Tables. A list of two or more objects with the same keys (in the same
+  order) is sent as an array whose first item is ``ext 2`` (empty payload),
+  followed by the key array and then one value array per object:
+
+      [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+      -> [ext2, ["id", "name"], [1, "A"], [2, "B"]]
+
+* References. An object that occurs more than once in the response (the
+  same profile in several search sections) is sent once, in ``refs``, and
+  every occurrence becomes ``ext 1`` whose payload is its index in
+  ``refs`` as a big-endian unsigned integer (2 or 4 bytes). ``refs`` is
+  itself encoded like any other list, so shared profiles form one table.
+
+Everything else is plain msgpack. ``unpack`` is the reference decoder.
+"""
+import struct
+
+import msgpack
+from rest_framework.utils.encoders import JSONEncoder
+
+VERSION = 1
+REF = 1
+TABLE = 2
+
+MEDIA_TYPE = "application/msgpack"
+
+_TABLE_MARKER = msgpack.ExtType(TABLE, b"")
+_CONTAINERS = (dict, list, tuple)
+# Dates, Decimals, UUIDs and lazy strings as DRF's JSON encoder renders them
+_default = JSONEncoder().default
+
+
+def _ref(index):
+    return msgpack.ExtType(REF, struct.pack(">H" if index < 0x10000 else ">I", index))
+
+
+class _Encoder:
+    def __init__(self):
+        self.seen = {}     # id(dict) -> times seen
+        self.keep = []     # keeps counted dicts alive so ids stay unique
+        self.refs = {}     # id(dict) -> ref index
+        self.ref_bodies = []
+
+    def count(self, obj):
+        if isinstance(obj, dict):
+            key = id(obj)
+            if key in self.seen:
+                self.seen[key] += 1
+                return  # its children were counted the first time
+            self.seen[key] = 1
+            self.keep.append(obj)
+            children = obj.values()
+        elif isinstance(obj, (list, tuple)):
+            children = obj
+        else:
+            return
+        for child in children:
+            if isinstance(child, _CONTAINERS):
+                self.count(child)
+
+    def shared(self, obj):
+        return isinstance(obj, dict) and self.seen.get(id(obj), 0) > 1
+
+    def ref(self, obj):
+        key = id(obj)
+        index = self.refs.get(key)
+        if index is None:
+            index = self.refs[key] = len(self.ref_bodies)
+            self.ref_bodies.append(None)
+            self.ref_bodies[index] = self.body(obj)
+        return _ref(index)
+
+    def body(self, obj):
+        return {key: self.value(value) if isinstance(value, _CONTAINERS) else value for key, value in obj.items()}
+
+    def value(self, obj):
+        if isinstance(obj, dict):
+            return self.ref(obj) if self.shared(obj) else self.body(obj)
+        if isinstance(obj, (list, tuple)):
+            return self.sequence(obj)
+        return obj
+
+    def sequence(self, items):
+        if len(items) > 1 and all(isinstance(item, dict) and not self.shared(item) for item in items):
+            keys = tuple(items[0])
+            if all(tuple(item) == keys for item in items):
+                value = self.value
+                return [_TABLE_MARKER, list(keys)] + [
+                    [value(v) if isinstance(v, _CONTAINERS) else v for v in item.values()] for item in items
+                ]
+        return [self.value(item) if isinstance(item, _CONTAINERS) else item for item in items]
+
+    def encode(self, data):
+        self.count(data)
+        data = self.value(data)
+        # Ref bodies are plain dicts by now; a list of them may still form a table
+        refs = self.ref_bodies
+        if len(refs) > 1:
+            keys = tuple(refs[0])
+            if all(tuple(body) == keys for body in refs):
+                refs = [_TABLE_MARKER, list(keys)] + [list(body.values()) for body in refs]
+        return {"v": VERSION, "refs": refs, "data": data}
+
+
+def pack(data):
+    """Encode ``data`` in the compact msgpack format."""
+    return msgpack.packb(_Encoder().encode(data), default=_default, use_bin_type=True)
+
+
+class _Ref:
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+
+def _ext_hook(code, payload):
+    if code == REF:
+        return _Ref(struct.unpack(">H" if len(payload) == 2 else ">I", payload)[0])
+    if code == TABLE:
+        return _TABLE_MARKER
+    return msgpack.ExtType(code, payload)
+
+
+def unpack(body):
+    """Decode a compact msgpack body back to plain dicts and lists."""
+    envelope = msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+    raw_refs = envelope["refs"]
+    resolved = {}
+
+    def expand(obj):
+        if isinstance(obj, _Ref):
+            if obj.index not in resolved:
+                resolved[obj.index] = expand(ref_list[obj.index])
+            return resolved[obj.index]
+        if isinstance(obj, dict):
+            return {key: expand(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            if obj and obj[0] == _TABLE_MARKER:
+                keys = obj[1]
+                return [{key: expand(value) for key, value in zip(keys, row)} for row in obj[2:]]
+            return [expand(item) for item in obj]
+        return obj
+
+    ref_list = raw_refs
+    if raw_refs and raw_refs[0] == _TABLE_MARKER:
+        ref_list = [dict(zip(raw_refs[1], row)) for row in raw_refs[2:]]
+    return expand(envelope["data"])
@@ -0,0 +1,224 @@
+"""Response compression for API payloads (used by core.middleware.CompressionMiddleware).
+
+Brotli is used when ``Brotli`` (or ``brotlicffi``) is installed and the client
+accepts ``br``; otherwise gzip. Bodies below ``COMPRESSION_MIN_SIZE`` are
+sent as they are: the framing overhead outweighs the saving and the CPU is
+better spent elsewhere. Streaming bodies are compressed chunk by chunk and
+flushed after each chunk, so clients can start rendering early.
+
+Against BREACH, gzip headers get random-length padding and paths in
+``COMPRESSION_EXCLUDED_PATHS`` (the auth endpoints, whose bodies hold
+credentials) are never compressed.
+
+Per-route counters (bytes in / out and CPU time spent compressing) are kept
+per process, like core.cache's metrics.
+"""
+import secrets
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli  # same API, for PyPy
+    except ImportError:  # optional; gzip only without either
+        brotli = None
+
+
+def _quality(accept_encoding, coding):
+    """q-value the Accept-Encoding header gives ``coding`` (or ``*``); None if absent."""
+    found = None
+    for item in accept_encoding.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        name = name.lower()
+        if name not in (coding, "*"):
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # An explicit entry for the coding beats the wildcard
+        if name == coding or found is None:
+            found = quality
+            if name == coding:
+                break
+    return found
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or None for a request's Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = _quality(accept_encoding, coding) or 0.0
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _gzip_header():
+    # Random-length FNAME field: the compressed length no longer tracks the
+    # content alone (BREACH), the same padding as Django's GZipMiddleware
+    padding = b"a" * secrets.randbelow(settings.COMPRESSION_GZIP_MAX_RANDOM_BYTES + 1)
+    flags = 0x08 if padding else 0
+    return b"\x1f\x8b\x08" + bytes([flags]) + b"\x00\x00\x00\x00\x00\xff" + (padding + b"\x00" if padding else b"")
+
+
+class _Gzip:
+    def __init__(self):
+        # Raw deflate (32 KB window) in a gzip container written here, so the header can be padded
+        self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, -15)
+        self._header = _gzip_header()
+        self._crc = 0
+        self._size = 0
+
+    def _emit(self, data):
+        header, self._header = self._header, b""
+        return header + data
+
+    def process(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        return self._emit(self._obj.compress(data))
+
+    def flush(self):
+        return self._emit(self._obj.flush(zlib.Z_SYNC_FLUSH))
+
+    def finish(self):
+        trailer = struct.pack("<II", self._crc, self._size & 0xFFFFFFFF)
+        return self._emit(self._obj.flush(zlib.Z_FINISH) + trailer)
+
+
+class _Brotli:
+    def __init__(self):
+        # Text mode suits JSON; low qualities keep dynamic compression cheap
+        self._obj = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def process(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+def compressor(encoding):
+    return _Brotli() if encoding == "br" else _Gzip()
+
+
+def compress(data, encoding):
+    """Compress a whole body with ``encoding``."""
+    obj = compressor(encoding)
+    return obj.process(data) + obj.finish()
+
+
+class CompressionMetrics:
+    """Per-process compression counters, overall and per route."""
+
+    FIELDS = ("responses", "compressed", "skipped_small", "incompressible", "bytes_in", "bytes_out", "cpu_ms")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, route, **values):
+        with self._lock:
+            for key in (route, "*"):
+                counts = self._counts[key]
+                for field, value in values.items():
+                    counts[field] += value
+
+    @staticmethod
+    def _with_ratio(counts):
+        counts = dict(counts)
+        counts["cpu_ms"] = round(counts["cpu_ms"], 3)
+        # Compressed size as a fraction of the original, over compressed responses only
+        counts["ratio"] = round(counts["bytes_out"] / counts["bytes_in"], 4) if counts["bytes_in"] else None
+        counts["cpu_ms_per_response"] = round(counts["cpu_ms"] / counts["compressed"], 3) if counts["compressed"] else None
+        return counts
+
+    def snapshot(self):
+        with self._lock:
+            counts = {name: dict(values) for name, values in self._counts.items()}
+        total = counts.pop("*", dict.fromkeys(self.FIELDS, 0))
+        return {
+            "total": self._with_ratio(total),
+            "routes": {name: self._with_ratio(values) for name, values in sorted(counts.items())},
+        }
+
+
+metrics = CompressionMetrics()
+
+
+class _Meter:
+    """Accumulates bytes and CPU time for one streamed response."""
+
+    def __init__(self, route):
+        self.route = route
+        self.bytes_in = self.bytes_out = 0
+        self.cpu = 0.0
+
+    def run(self, func, data=None):
+        start = time.thread_time()
+        out = func() if data is None else func(data)
+        self.cpu += time.thread_time() - start
+        if data is not None:
+            self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    def done(self):
+        metrics.record(
+            self.route, compressed=1, bytes_in=self.bytes_in,
+            bytes_out=self.bytes_out, cpu_ms=self.cpu * 1000,
+        )
+
+
+def compress_stream(chunks, encoding, route):
+    obj, meter = compressor(encoding), _Meter(route)
+    for chunk in chunks:
+        out = meter.run(obj.process, chunk) + meter.run(obj.flush)
+        if out:
+            yield out
+    yield meter.run(obj.finish)
+    meter.done()
+
+
+async def acompress_stream(chunks, encoding, route):
+    obj, meter = compressor(encoding), _Meter(route)
+    async for chunk in chunks:
+        out = meter.run(obj.process, chunk) + meter.run(obj.flush)
+        if out:
+            yield out
+    yield meter.run(obj.finish)
+    meter.done()
+
+
+def compress_body(content, encoding, route):
+    """Compressed ``content``, or None when compressing wouldn't make it smaller."""
+    start = time.thread_time()
+    body = compress(content, encoding)
+    cpu_ms = (time.thread_time() - start) * 1000
+    if len(body) >= len(content):
+        metrics.record(route, incompressible=1, cpu_ms=cpu_ms)
+        return None
+    metrics.record(route, compressed=1, bytes_in=len(content), bytes_out=len(body), cpu_ms=cpu_ms)
+    return body
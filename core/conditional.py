@@ -0,0 +1,111 @@
+"""Conditional GET (ETag / If-None-Match) from core.cache tag versions.
+
+A view declares the tags its body depends on; the ETag is a hash of their
+current versions plus everything else the body varies on (path and query,
+viewer, language, Accept). Computing it is a tag lookup in the local /
+shared cache plus at most a fixed query or two to find the viewer's scope,
+so a matching If-None-Match is answered with 304 before the view (and its
+serializers) run:
+
+    @method_decorator(conditional_view(lambda request, pk: [profile_tag(pk)]), name="get")
+    class KrisshakPublicDetailView(generics.RetrieveAPIView): ...
+
+Writers bump the tags with ``bump_tags`` once their transaction commits.
+"""
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.translation import get_language
+
+from core.cache import tiered_cache
+
+
+def bump_tags(*tags):
+    """Invalidate ``tags`` after the current transaction commits (immediately outside one)."""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        transaction.on_commit(lambda: tiered_cache.invalidate_tags(*tags))
+
+
+def compute_etag(request, view_name, versions):
+    user = getattr(request, "user", None)
+    parts = [
+        view_name,
+        request.get_full_path(),
+        str(user.pk) if user is not None and user.is_authenticated else "anon",
+        get_language() or "",
+        request.headers.get("Accept", ""),
+    ]
+    parts += [f"{tag}={version}" for tag, version in sorted(versions.items())]
+    return '"%s"' % hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match lists ``etag`` (weak comparison) or is ``*``."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: the compression middleware turns our ETags into W/"..."
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates
+
+
+def _finish(response, etag):
+    if response.status_code == 200 and not response.has_header("ETag"):
+        response["ETag"] = etag
+    # Clients may keep the body but must revalidate it every time
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Accept", "Authorization"))
+    return response
+
+
+def _not_modified(etag):
+    return _finish(HttpResponseNotModified(), etag)
+
+
+def conditional_view(tags):
+    """Answer GETs whose If-None-Match matches the current tag versions with 304.
+
+    ``tags`` is a list or a callable taking the view's ``(request, *args, **kwargs)``.
+    Keep it to a fixed number of queries (ideally none); async views need a
+    callable that doesn't query at all.
+    """
+    def decorator(view):
+        view_name = f"{view.__module__}.{view.__qualname__}"
+
+        def split(args):
+            # Function views get (request, ...); APIView methods get (self, request, ...)
+            request = args[1] if len(args) > 1 and hasattr(args[1], "method") else args[0]
+            return request, args[args.index(request):]
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                request, view_args = split(args)
+                if request.method not in ("GET", "HEAD"):
+                    return await view(*args, **kwargs)
+                entry_tags = tags(*view_args, **kwargs) if callable(tags) else tags
+                etag = compute_etag(request, view_name, await tiered_cache.atag_versions(entry_tags))
+                if etag_matches(request, etag):
+                    return _not_modified(etag)
+                return _finish(await view(*args, **kwargs), etag)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request, view_args = split(args)
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+            entry_tags = tags(*view_args, **kwargs) if callable(tags) else tags
+            etag = compute_etag(request, view_name, tiered_cache.tag_versions(entry_tags))
+            if etag_matches(request, etag):
+                return _not_modified(etag)
+            return _finish(view(*args, **kwargs), etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,81 @@
+"""MySQL engine that draws its connections from ``core.db.pool``.
+
+    DATABASES["default"]["ENGINE"] = "core.db.backends.mysql"
+    DATABASES["default"]["POOL"] = {"SIZE": 10, "MAX_OVERFLOW": 10, "TIMEOUT": 10}
+
+Django still opens and closes connections per request (or per CONN_MAX_AGE);
+closing hands the raw connection back to the pool, rolled back, instead of
+dropping it. ``"POOL": {"SIZE": 0}`` turns pooling off.
+"""
+import copy
+
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from core.db.pool import ConnectionPool, get_pool
+
+
+def connection_creator(settings_dict, alias):
+    """Opens raw connections from a copy of the settings, not from the wrapper that first used the pool.
+
+    The pool outlives that wrapper (and its thread), so it must not keep it alive.
+    """
+    settings_dict = copy.deepcopy(settings_dict)
+
+    def create():
+        wrapper = MySQLDatabaseWrapper(settings_dict, alias)
+        return wrapper.get_new_connection(wrapper.get_connection_params())
+
+    return create
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    _pool = None
+    _pool_record = None
+
+    @property
+    def pool_options(self):
+        return self.settings_dict.get("POOL") or {}
+
+    @property
+    def pooled(self):
+        return int(self.pool_options.get("SIZE", 1)) > 0
+
+    def _get_pool(self):
+        settings_dict = self.settings_dict
+        key = (self.alias, settings_dict["HOST"], settings_dict["PORT"], settings_dict["NAME"], settings_dict["USER"])
+        return get_pool(key, lambda: ConnectionPool.from_options(
+            connection_creator(settings_dict, self.alias),
+            self.pool_options,
+            name=self.alias,
+        ))
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+        self._pool = self._get_pool()
+        self._pool_record = self._pool.checkout(owner=self)
+        return self._pool_record.raw
+
+    def init_connection_state(self):
+        # Session settings survive checkin, so only a fresh connection needs them
+        record = self._pool_record
+        if record is not None and record.initialized:
+            return
+        super().init_connection_state()
+        if record is not None:
+            record.initialized = True
+
+    def _close(self):
+        record = self._pool_record
+        if record is None or record.raw is not self.connection:
+            return super()._close()
+
+        self._pool_record = None
+        reusable = not self.errors_occurred or self.is_usable()
+        if reusable:
+            try:
+                # Don't hand an open transaction to the next borrower
+                self.connection.rollback()
+            except Exception:
+                reusable = False
+        self._pool.checkin(record, reusable=reusable)
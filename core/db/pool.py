@@ -0,0 +1,256 @@
+"""Thread-safe pool of raw DB-API connections.
+
+Used by the ``core.db.backends.mysql`` engine: each Django connection checks
+a raw connection out when it connects and hands it back when it closes, so
+a request served from a worker thread reuses a warm connection instead of
+doing the TCP / TLS / auth handshake again.
+
+Options (``DATABASES[alias]["POOL"]``):
+
+    SIZE            connections kept open per process
+    MAX_OVERFLOW    extra connections allowed under load, closed on return
+    TIMEOUT         seconds to wait for a free connection before failing
+    RECYCLE         seconds after which a connection is replaced (keep it
+                    below the server's wait_timeout)
+    PRE_PING_AFTER  ping connections idle for longer than this on checkout
+                    (0 pings every checkout, None never)
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "SIZE": 10,
+    "MAX_OVERFLOW": 10,
+    "TIMEOUT": 10,
+    "RECYCLE": 1800,
+    "PRE_PING_AFTER": 30,
+}
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's TIMEOUT."""
+
+
+class PooledConnection:
+    """A raw connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+        self.initialized = False  # session state (isolation level etc.) already set
+        self.owner = None         # weakref to whoever checked it out
+
+
+class ConnectionPool:
+    def __init__(self, creator, size=10, max_overflow=10, timeout=10, recycle=1800,
+                 pre_ping_after=30, ping=None, name="default"):
+        self.creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping_after = pre_ping_after
+        self.ping = ping or (lambda raw: raw.ping())
+        self.name = name
+
+        self._idle = deque()
+        self._checked_out = set()
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._waits = deque(maxlen=1000)  # recent checkout waits, ms
+        self._counts = dict.fromkeys(
+            ("checkouts", "created", "reused", "recycled", "ping_failures", "timeouts", "reclaimed", "discarded"), 0
+        )
+
+    @classmethod
+    def from_options(cls, creator, options, **kwargs):
+        options = {**DEFAULTS, **(options or {})}
+        return cls(
+            creator,
+            size=int(options["SIZE"]),
+            max_overflow=int(options["MAX_OVERFLOW"]),
+            timeout=float(options["TIMEOUT"]),
+            recycle=options["RECYCLE"],
+            pre_ping_after=options["PRE_PING_AFTER"],
+            **kwargs,
+        )
+
+    @property
+    def capacity(self):
+        return self.size + self.max_overflow
+
+    def _total(self):
+        return len(self._idle) + len(self._checked_out) + self._opening
+
+    def _check_fork(self):
+        # Connections inherited from a parent process (e.g. gunicorn --preload) can't be shared
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._checked_out.clear()
+            self._opening = 0
+
+    def _reclaim_orphans(self):
+        """Free the slots of connections whose owner was garbage collected without closing."""
+        for record in list(self._checked_out):
+            if record.owner is not None and record.owner() is None:
+                self._checked_out.discard(record)
+                self._close_raw(record)
+                self._counts["reclaimed"] += 1
+
+    @staticmethod
+    def _close_raw(record):
+        try:
+            record.raw.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, record, now):
+        return self.recycle is not None and now - record.created_at > self.recycle
+
+    def _needs_ping(self, record, now):
+        return self.pre_ping_after is not None and now - record.returned_at >= self.pre_ping_after
+
+    def _ping(self, record):
+        try:
+            self.ping(record.raw)
+            return True
+        except Exception:
+            return False
+
+    def checkout(self, owner=None):
+        """Return a PooledConnection, reusing an idle one when possible."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        record = None
+        while record is None:
+            candidate = None
+            with self._cond:
+                self._check_fork()
+                while candidate is None:
+                    if self._idle:
+                        candidate = self._idle.pop()  # most recently used: least likely to have timed out
+                        if self._is_stale(candidate, time.monotonic()):
+                            self._counts["recycled"] += 1
+                            self._close_raw(candidate)
+                            candidate = None
+                            continue
+                        # Held as checked out while it's pinged, so the slot stays counted
+                        self._checked_out.add(candidate)
+                        break
+
+                    if self._total() >= self.capacity:
+                        self._reclaim_orphans()
+                    if self._total() < self.capacity:
+                        # Reserve the slot, then connect outside the lock
+                        self._opening += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counts["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"DB pool '{self.name}' exhausted: {self.capacity} connections in use for {self.timeout}s"
+                        )
+                    self._cond.wait(remaining)
+
+            if candidate is None:
+                break  # a slot is reserved for a new connection
+
+            # Ping outside the lock: a dead server can take a while to answer
+            if not self._needs_ping(candidate, time.monotonic()) or self._ping(candidate):
+                record = candidate
+                with self._cond:
+                    self._counts["reused"] += 1
+                continue
+
+            self._close_raw(candidate)
+            with self._cond:
+                self._checked_out.discard(candidate)
+                self._counts["ping_failures"] += 1
+                self._cond.notify()
+
+        if record is None:
+            try:
+                record = PooledConnection(self.creator())
+            finally:
+                with self._cond:
+                    self._opening -= 1
+                    if record is not None:
+                        self._checked_out.add(record)
+                        self._counts["created"] += 1
+                    self._cond.notify()
+
+        record.owner = weakref.ref(owner) if owner is not None else None
+        with self._cond:
+            self._counts["checkouts"] += 1
+            self._waits.append((time.monotonic() - start) * 1000)
+        return record
+
+    def checkin(self, record, reusable=True):
+        """Give a connection back; overflow and broken connections are closed."""
+        with self._cond:
+            if record not in self._checked_out:
+                # Checked out before a fork, or already returned
+                self._close_raw(record)
+                return
+            self._checked_out.discard(record)
+            record.owner = None
+            record.returned_at = time.monotonic()
+            if reusable and len(self._idle) < self.size and not self._is_stale(record, record.returned_at):
+                self._idle.append(record)
+            else:
+                self._counts["discarded"] += 1
+                self._close_raw(record)
+            self._cond.notify()
+
+    def close_idle(self):
+        with self._cond:
+            while self._idle:
+                self._close_raw(self._idle.pop())
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            stats = {
+                "name": self.name,
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "idle": len(self._idle),
+                "checked_out": len(self._checked_out),
+                "overflow": max(0, self._total() - self.size),
+                **self._counts,
+            }
+        stats["wait_ms"] = {
+            "avg": round(sum(waits) / len(waits), 3) if waits else None,
+            "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else None,
+            "max": round(waits[-1], 3) if waits else None,
+        }
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """Process-wide pool for ``key``, created with ``factory()`` on first use."""
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def pool_stats():
+    return [pool.stats() for pool in list(_pools.values())]
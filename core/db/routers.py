@@ -0,0 +1,186 @@
+"""Send read-only work to replicas of the default database.
+
+Reads stay on ``default`` unless code opts in:
+
+    @replica_reads                    # a view
+    with use_replica(): ...           # reporting code, DataFrame builds
+
+Inside those, reads go to a replica whose lag is under
+REPLICA_MAX_LAG_SECONDS, unless
+
+* the request is pinned to the primary: a client that wrote recently sends
+  back the ``db_pin`` cookie or ``X-DB-Pin`` header set by
+  ReplicaPinMiddleware (read-your-writes for REPLICA_PIN_SECONDS),
+* this request has already written, or is inside a transaction, or
+* ``use_primary()`` is active.
+
+Writes always go to ``default``.
+"""
+import functools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_route = ContextVar("db_route", default=None)          # None / "replica" / "primary"
+_request_state = ContextVar("db_request_state", default=None)
+
+_lag_lock = threading.Lock()
+_lag_checks = {}  # alias -> (checked_at, lag seconds or None when unknown)
+
+
+def replica_aliases():
+    return list(getattr(settings, "REPLICA_DATABASES", []))
+
+
+# Lag
+
+def measure_lag(alias):
+    """Seconds the replica is behind; None if replication isn't running."""
+    connection = connections[alias]
+    if connection.vendor != "mysql":
+        return 0
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Exception:
+            cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22, MariaDB
+        row = cursor.fetchone()
+        if row is None:
+            return 0  # not configured as a replica (e.g. pointing at the primary)
+        status = dict(zip([column[0] for column in cursor.description], row))
+    lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+    return None if lag is None else int(lag)
+
+
+def replica_lag(alias):
+    """Lag of ``alias``, re-measured at most every REPLICA_LAG_CHECK_INTERVAL seconds."""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        lag = measure_lag(alias)
+    except Exception as e:
+        logger.warning(f"Replica {alias} lag check failed: {str(e)}")
+        lag = None
+    with _lag_lock:
+        _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    limit = settings.REPLICA_MAX_LAG_SECONDS
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= limit:
+            healthy.append(alias)
+    return healthy
+
+
+def reset_lag_checks():
+    with _lag_lock:
+        _lag_checks.clear()
+
+
+# Routing context
+
+class RequestState:
+    """Per-request routing facts, shared with the threads a request hops through."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def _routing(value):
+    token = _route.set(value)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def use_replica():
+    """Let reads in this block go to a replica."""
+    return _routing("replica")
+
+
+def use_primary():
+    """Force reads in this block to the primary, even inside use_replica()."""
+    return _routing("primary")
+
+
+@contextmanager
+def request_routing(pinned=False):
+    state = RequestState(pinned=pinned)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+def replica_reads(view):
+    """Decorator: run a (sync or async) view with replica reads allowed."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with use_replica():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadsAdminMixin:
+    """ModelAdmin mixin: serve changelist GETs from a replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != "GET":
+            return super().changelist_view(request, extra_context)
+        with use_replica():
+            return super().changelist_view(request, extra_context)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _route.get() != "replica":
+            return None
+
+        state = _request_state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
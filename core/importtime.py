@@ -0,0 +1,83 @@
+"""Measure what a cold worker imports while Django starts up."""
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# What a worker does before serving its first request
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed_ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    elapsed_ms: float
+    modules: set
+    imports: list = field(default_factory=list)
+
+    def top(self, count=25, key="cumulative_us"):
+        return sorted(self.imports, key=lambda record: getattr(record, key), reverse=True)[:count]
+
+    def loaded(self, names):
+        """Which of ``names`` (top-level packages) were imported during startup."""
+        return [name for name in names if name in self.modules]
+
+
+def _parse_importtime(stderr):
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+            records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return records
+
+
+def profile_startup(importtime=True, timeout=120):
+    """Start Django in a fresh interpreter and report elapsed time and imports.
+
+    ``importtime`` adds per-module timings (``python -X importtime``), which
+    itself slows the run down a little; leave it off when checking a budget.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", STARTUP_SCRIPT]
+
+    env = os.environ.copy()
+    env.setdefault("DJANGO_SETTINGS_MODULE", "ekrisshak2.settings")
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Django startup failed:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        elapsed_ms=report["elapsed_ms"],
+        modules=set(report["modules"]),
+        imports=_parse_importtime(result.stderr) if importtime else [],
+    )
@@ -0,0 +1,79 @@
+"""Fast JSON encoding, with orjson when it's installed and the stdlib otherwise.
+
+orjson encodes datetimes, dates, times, UUIDs, dataclasses and numpy values
+natively (several times faster than ``json.dumps``). Anything else it
+doesn't know, such as Decimal, lazy translation strings and timedelta, goes
+through the ``default`` hook, which takes the matching stdlib encoder's
+``default`` so the output doesn't change.
+
+    return FastJsonResponse({"notices": data})
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+if HAS_ORJSON:
+    # Int dict keys (e.g. profiles keyed by user id) become strings like the stdlib does
+    DEFAULT_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    DEFAULT_OPTIONS = 0
+    JSONDecodeError = json.JSONDecodeError
+
+_django_default = DjangoJSONEncoder().default
+
+
+def dumps(data, default=_django_default, indent=False):
+    """Encode ``data`` to UTF-8 JSON bytes."""
+    if HAS_ORJSON:
+        options = DEFAULT_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=default, option=options)
+
+    class Encoder(json.JSONEncoder):
+        def default(self, obj):
+            return default(obj)
+
+    return json.dumps(
+        data, cls=Encoder, ensure_ascii=False, allow_nan=False,
+        indent=2 if indent else None, separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data):
+    """Decode JSON from bytes or str. Raises JSONDecodeError."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in for django.http.JsonResponse that encodes with ``dumps``.
+
+    Passing ``encoder`` or ``json_dumps_params`` falls back to the stdlib
+    encoder, exactly like JsonResponse.
+    """
+
+    def __init__(self, data, encoder=None, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        if encoder is None and not json_dumps_params:
+            content = dumps(data)
+            # Lets MsgPackMiddleware re-encode without parsing the JSON back
+            self.json_data = data
+        else:
+            content = json.dumps(data, cls=encoder or DjangoJSONEncoder, **(json_dumps_params or {}))
+        super().__init__(content=content, **kwargs)
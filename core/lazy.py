@@ -0,0 +1,65 @@
+"""Import heavy optional dependencies on first use instead of at module import.
+
+    pd = lazy_import("pandas")
+
+``pd`` stands in for the module; the real import happens the first time an
+attribute is read, so workers that never serve that code path never pay for it.
+"""
+import importlib
+import threading
+
+# Modules that should stay out of a fresh worker until something needs them
+HEAVY_MODULES = ("pandas", "sklearn", "numpy", "reportlab", "razorpay", "pywebpush")
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return a shared LazyModule for ``name``."""
+    with _registry_lock:
+        module = _registry.get(name)
+        if module is None:
+            module = _registry[name] = LazyModule(name)
+        return module
+
+
+def loaded_lazy_modules():
+    """Names of lazily imported modules that have been loaded so far."""
+    return sorted(name for name, module in _registry.items() if module.is_loaded)
@@ -0,0 +1,122 @@
+import asyncio
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from users.models import CustomUser
+
+# The read endpoints served by async views
+DEFAULT_PATHS = [
+    '/api/notifications/?limit=20',
+    '/api/notifications/unread-count/',
+    '/api/contact/notices/',
+    '/api/users/states/',
+    '/api/search/search-krisshaks/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent GETs at endpoints through the ASGI app in this process and report throughput, latency and threads used'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f'Paths to hit (default: {", ".join(DEFAULT_PATHS)})')
+        parser.add_argument('--user', help='Email of the user to authenticate as (Token auth)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per path')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        headers = [(b'host', options['host'].encode())]
+        if options['user']:
+            try:
+                user = CustomUser.objects.get(email=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+            token, _ = Token.objects.get_or_create(user=user)
+            headers.append((b'authorization', f"Token {token.key}".encode()))
+
+        app = get_asgi_application()
+        self.stdout.write(f"{options['requests']} requests per path, {options['concurrency']} in flight\n")
+        self.stdout.write(f"{'path':45} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'threads':>8}  statuses")
+        for path in options['paths'] or DEFAULT_PATHS:
+            result = asyncio.run(self.run_path(app, path, headers, options['requests'], options['concurrency']))
+            self.stdout.write(
+                f"{path[:45]:45} {result['rps']:8.1f} {result['p50']:8.1f} {result['p95']:8.1f} "
+                f"{result['max']:8.1f} {result['threads']:8d}  {result['statuses']}"
+            )
+
+    async def run_path(self, app, path, headers, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, statuses = [], {}
+        baseline_threads = threading.active_count()
+        peak = {'threads': baseline_threads}
+        done = asyncio.Event()
+
+        async def sample_threads():
+            while not done.is_set():
+                peak['threads'] = max(peak['threads'], threading.active_count())
+                await asyncio.sleep(0.005)
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                status = await self.request(app, path, headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await sampler
+
+        latencies.sort()
+        return {
+            'rps': total / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'max': latencies[-1],
+            # Threads started while the path was under load (executor threads for sync code)
+            'threads': peak['threads'] - baseline_threads,
+            'statuses': statuses,
+        }
+
+    @staticmethod
+    async def request(app, path, headers):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        body_sent = False
+        status = {}
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Never disconnect; Django stops listening once the response is sent
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+
+        await app(scope, receive, send)
+        return status.get('code')
@@ -0,0 +1,103 @@
+import io
+import json
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import json as fast_json
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+def profile_card(i):
+    return {
+        'id': i, 'user_id': 1000 + i, 'name': f'Krisshak {i}', 'email': f'k{i}@example.com',
+        'age': 20 + i % 40, 'gender': 'male' if i % 2 else 'female',
+        'profile_picture': f'https://res.cloudinary.com/demo/image/upload/profile_{i}.jpg',
+        'state': 'West Bengal', 'district': 'Hooghly',
+        'specialization': 'wheat, rice, mustard', 'experience': f'{i % 15} years',
+        'price': Decimal(f'{300 + i % 200}.50'), 'availability': bool(i % 3),
+        'ratings': Decimal('4.25'), 'is_favorite': False,
+        'appointment_status': None, 'previously_appointed': bool(i % 5 == 0),
+    }
+
+
+def notification(i, now):
+    return {
+        'id': i, 'title': 'Appointment update', 'message': f'Your appointment #{i} was accepted.',
+        'notification_type': 'appointment', 'is_read': bool(i % 2),
+        'created_at': now - timedelta(minutes=i), 'amount': Decimal('1250.00'),
+    }
+
+
+def payloads():
+    now = timezone.now()
+    cards = [profile_card(i) for i in range(100)]
+    return {
+        'profile list (100)': {'count': 100, 'results': cards},
+        'notifications (50)': {'results': [notification(i, now) for i in range(50)], 'next_cursor': None},
+        'search by user id (100)': {'profiles': {card['user_id']: card for card in cards}},
+    }
+
+
+def stdlib_dumps(data):
+    # What JsonResponse does
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON encode / decode speed of the stdlib, DRF and the orjson-backed renderer and parser'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        n = options['iterations']
+        if not fast_json.HAS_ORJSON:
+            self.stdout.write(self.style.WARNING('orjson is not installed; core.json is using the stdlib'))
+
+        drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        encoders = {
+            'JsonResponse (stdlib)': stdlib_dumps,
+            'DRF JSONRenderer': drf_renderer.render,
+            'ORJSONRenderer': fast_renderer.render,
+            'core.json.dumps': fast_json.dumps,
+        }
+        decoders = {
+            'DRF JSONParser': lambda body: JSONParser().parse(io.BytesIO(body)),
+            'ORJSONParser': lambda body: ORJSONParser().parse(io.BytesIO(body)),
+        }
+
+        self.stdout.write(f"{n} iterations, median per call\n")
+        self.stdout.write(f"{'payload':26} {'operation':24} {'µs':>9} {'speedup':>8} {'bytes':>8}")
+        for name, data in payloads().items():
+            baseline = None
+            for label, encode in encoders.items():
+                body = encode(data)
+                elapsed = self.time(lambda: encode(data), n)
+                baseline = baseline or elapsed
+                self.stdout.write(f"{name:26} {label:24} {elapsed:9.1f} {baseline / elapsed:7.1f}x {len(body):8d}")
+
+            body = drf_renderer.render(data)
+            baseline = None
+            for label, decode in decoders.items():
+                elapsed = self.time(lambda: decode(body), n)
+                baseline = baseline or elapsed
+                self.stdout.write(f"{name:26} {label:24} {elapsed:9.1f} {baseline / elapsed:7.1f}x {len(body):8d}")
+
+    @staticmethod
+    def time(func, n):
+        samples = []
+        for _ in range(n):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1e6)
+        return statistics.median(samples)
+
@@ -0,0 +1,93 @@
+import gzip
+import statistics
+import time
+
+import msgpack
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import compact
+from core import json as fast_json
+from core.management.commands.benchmark_json import payloads, profile_card
+from users.models import CustomUser
+
+_drf_default = JSONEncoder().default
+
+
+def search_payload():
+    # search_krisshaks: five sections listing overlapping profiles (the same objects)
+    cards = [dict(profile_card(i), user={'id': 1000 + i, 'name': f'Krisshak {i}', 'email': f'k{i}@example.com'}) for i in range(60)]
+    sections = {
+        'previous_krisshaks': cards[:10],
+        'matching_krisshaks': cards[5:45],
+        'ml_suggestions': cards[30:60],
+    }
+    sections['final_suggestions'] = cards
+    return sections
+
+
+def encoders():
+    return {
+        'json': fast_json.dumps,
+        'msgpack': lambda data: msgpack.packb(data, default=_drf_default, use_bin_type=True),
+        'compact': compact.pack,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare response size (raw and gzipped) and encode time of JSON, plain msgpack and compact msgpack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='API paths to fetch in both formats (needs --user for authenticated ones)')
+        parser.add_argument('--user', help='Email of the user to authenticate as (Token auth)')
+        parser.add_argument('--iterations', type=int, default=300)
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'payload':26} {'format':8} {'bytes':>8} {'gzip':>8} {'vs json':>8} {'encode µs':>10}")
+        samples = dict(payloads(), **{'search sections (60)': search_payload()})
+        for name, data in samples.items():
+            json_size = None
+            for label, encode in encoders().items():
+                body = encode(data)
+                json_size = json_size or len(body)
+                elapsed = self.time(lambda: encode(data), options['iterations'])
+                self.stdout.write(
+                    f"{name:26} {label:8} {len(body):8d} {len(gzip.compress(body)):8d} "
+                    f"{len(body) / json_size:7.0%} {elapsed:10.1f}"
+                )
+
+        if options['paths']:
+            self.fetch(options)
+
+    def fetch(self, options):
+        headers = {}
+        if options['user']:
+            try:
+                user = CustomUser.objects.get(email=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+            token, _ = Token.objects.get_or_create(user=user)
+            headers['Authorization'] = f"Token {token.key}"
+
+        self.stdout.write(f"\n{'path':45} {'json':>8} {'gzip':>8} {'msgpack':>8} {'gzip':>8} {'vs json':>8}")
+        for path in options['paths']:
+            sizes = []
+            for accept in ('application/json', compact.MEDIA_TYPE):
+                client = Client(headers=dict(headers, Accept=accept))
+                body = client.get(path, HTTP_HOST=options['host']).content
+                sizes += [len(body), len(gzip.compress(body))]
+            self.stdout.write(
+                f"{path[:45]:45} {sizes[0]:8d} {sizes[1]:8d} {sizes[2]:8d} {sizes[3]:8d} {sizes[2] / max(sizes[0], 1):7.0%}"
+            )
+
+    @staticmethod
+    def time(func, n):
+        samples = []
+        for _ in range(n):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1e6)
+        return statistics.median(samples)
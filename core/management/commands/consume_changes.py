@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.cdc import consume_batch, projections, prune_changes, reset_checkpoint
+
+class Command(BaseCommand):
+    help = 'Tail the change log and apply it to the registered projections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projection', action='append', help='Only run these projections (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Records per projection transaction')
+        parser.add_argument('--once', action='store_true', help='Drain the log once and exit instead of polling')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the log is drained')
+        parser.add_argument('--settle-seconds', type=int, help='Override CDC_SETTLE_SECONDS')
+        parser.add_argument('--replay', action='store_true', help='Rewind the selected projections to the start of the log first')
+        parser.add_argument('--prune-days', type=int, help='Delete consumed records older than this many days, then exit')
+
+    def handle(self, *args, **options):
+        if options['prune_days'] is not None:
+            deleted = prune_changes(options['prune_days'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Pruned {deleted} change records"))
+            return
+
+        registered = projections()
+        names = options['projection'] or list(registered)
+        unknown = set(names) - set(registered)
+        if unknown:
+            raise CommandError(f"Unknown projections: {', '.join(sorted(unknown))}")
+        selected = [registered[name] for name in names]
+
+        if options['replay']:
+            for projection in selected:
+                reset_checkpoint(projection.name)
+                self.stdout.write(f"Rewound {projection.name}")
+
+        while True:
+            handled = 0
+            for projection in selected:
+                count = consume_batch(projection, batch_size=options['batch_size'], settle_seconds=options['settle_seconds'])
+                if count:
+                    self.stdout.write(f"{projection.name}: applied {count} changes")
+                handled += count
+
+            if handled:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS("✅ Change log drained"))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.importtime import profile_startup
+from core.lazy import HEAVY_MODULES
+
+class Command(BaseCommand):
+    help = 'Start Django in a fresh interpreter and report the slowest module imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Number of modules to list')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative', help='Rank by cumulative or self time')
+        parser.add_argument('--min-ms', type=float, default=0, help='Hide modules faster than this')
+
+    def handle(self, *args, **options):
+        try:
+            profile = profile_startup(importtime=True)
+        except Exception as e:
+            raise CommandError(str(e))
+
+        key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+        records = [r for r in profile.top(len(profile.imports), key=key) if getattr(r, key) / 1000 >= options['min_ms']]
+
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for record in records[:options['top']]:
+            self.stdout.write(
+                f"{record.cumulative_us / 1000:>14.1f} {record.self_us / 1000:>9.1f}  {'  ' * record.depth}{record.module}"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(f"Modules imported: {len(profile.imports)}")
+        self.stdout.write(f"Startup (with -X importtime overhead): {profile.elapsed_ms:.0f} ms, budget {settings.STARTUP_TIME_BUDGET_MS} ms")
+
+        heavy = profile.loaded(HEAVY_MODULES)
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"⚠️ Heavy modules loaded at startup: {', '.join(heavy)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ No heavy optional modules loaded at startup"))
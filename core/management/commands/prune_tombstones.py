@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.sync import prune_tombstones
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than the sync token lifetime'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+                            help='Delete tombstones older than this many days')
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Pruned {deleted} tombstones"))
@@ -1,21 +1,271 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
 from django.utils.translation import activate
 from django.contrib.auth.middleware import get_user
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from core import compact
+from core import compression
+from core import json as fast_json
+from core.db.routers import request_routing
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 class LanguageMiddleware:
     """Middleware to apply preferred language based on cookies or user profile"""
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
-        user = get_user(request)  # Ensure user is fetched safely
-
+    def activate_for(self, request, user):
         if user.is_authenticated and hasattr(user, 'preferred_language'):
             preferred_language = user.preferred_language
         else:
             preferred_language = request.COOKIES.get('preferred_language', 'en')
 
         activate(preferred_language)  # Apply language dynamically
-        
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user = get_user(request)  # Ensure user is fetched safely
+        self.activate_for(request, user)
+
         response = self.get_response(request)
         return response
+
+    async def __acall__(self, request):
+        user = await request.auser()  # session lookup through the async ORM
+        self.activate_for(request, user)
+        return await self.get_response(request)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise that can sit in an async middleware chain.
+
+    Upstream WhiteNoise is sync-only, which makes Django run every async
+    view's request through a thread. Static file lookups are an in-memory
+    dict hit (unless autorefresh is on), so they are safe on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaPinMiddleware:
+    """Read-your-writes for core.db.routers: after a client writes, keep its reads on the primary.
+
+    The pin travels as the ``db_pin`` cookie (browsers) and the ``X-DB-Pin``
+    response header, which token-auth clients echo back as a request header.
+    Its value is the unix time until which the client is pinned.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _is_pinned(self, request):
+        value = request.headers.get(settings.REPLICA_PIN_HEADER) or request.COOKIES.get(settings.REPLICA_PIN_COOKIE)
+        try:
+            pinned_until = float(value)
+        except (TypeError, ValueError):
+            return False
+        now = time.time()
+        # Never honour a pin longer than we would have issued (plus a second for rounding)
+        return now < pinned_until <= now + settings.REPLICA_PIN_SECONDS + 1
+
+    def _pin(self, request, response, state):
+        if not settings.REPLICA_DATABASES or not (state.wrote or request.method not in SAFE_METHODS):
+            return response
+        pinned_until = f"{time.time() + settings.REPLICA_PIN_SECONDS:.3f}"
+        response[settings.REPLICA_PIN_HEADER] = pinned_until
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE, pinned_until,
+            max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax",
+        )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_routing(pinned=self._is_pinned(request)) as state:
+            response = self.get_response(request)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        with request_routing(pinned=self._is_pinned(request)) as state:
+            response = await self.get_response(request)
+        return self._pin(request, response, state)
+
+
+def _accept_quality(accept, media_type):
+    """q-value the Accept header gives ``media_type`` (exact or wildcard), 0 if none."""
+    best = 0.0
+    for item in accept.split(","):
+        kind, *params = (part.strip() for part in item.split(";"))
+        if kind not in (media_type, media_type.split("/")[0] + "/*", "*/*"):
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # An exact match outranks wildcards
+        best = max(best, quality + (0.001 if kind == media_type else 0))
+    return best
+
+
+def wants_msgpack(request):
+    if request.GET.get("format") == "msgpack":
+        return True
+    accept = request.headers.get("Accept", "")
+    if compact.MEDIA_TYPE not in accept:
+        return False
+    quality = _accept_quality(accept, compact.MEDIA_TYPE)
+    return quality > 0 and quality >= _accept_quality(accept, "application/json")
+
+
+class MsgPackMiddleware:
+    """Serve JSON responses of non-DRF views as compact msgpack when the client asks for it.
+
+    DRF views negotiate ``application/msgpack`` themselves (MsgPackRenderer);
+    this covers the plain and async views that return FastJsonResponse.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def process(self, request, response):
+        content_type = response.get("Content-Type", "")
+        if content_type.startswith(("application/json", compact.MEDIA_TYPE)):
+            patch_vary_headers(response, ("Accept",))
+        if (
+            not content_type.startswith("application/json")
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not wants_msgpack(request)
+        ):
+            return response
+
+        data = getattr(response, "json_data", None)
+        if data is None:
+            try:
+                data = fast_json.loads(response.content)
+            except fast_json.JSONDecodeError:
+                return response
+        response.content = compact.pack(data)
+        response["Content-Type"] = compact.MEDIA_TYPE
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process(request, await self.get_response(request))
+
+
+class CompressionMiddleware:
+    """Brotli / gzip for API responses (see core/compression.py).
+
+    Only ``COMPRESSION_CONTENT_TYPES`` are compressed; static files are
+    WhiteNoise's job. Bodies under ``COMPRESSION_MIN_SIZE`` and responses on
+    ``COMPRESSION_EXCLUDED_PATHS`` are left alone.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def route(request):
+        match = getattr(request, "resolver_match", None)
+        return match.route if match is not None else "unresolved"
+
+    def process(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+        if request.path.startswith(settings.COMPRESSION_EXCLUDED_PATHS):
+            return response  # credentials in the body: no compression oracle (BREACH)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding") or response.status_code in (206, 304):
+            return response
+        encoding = compression.choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        route = self.route(request)
+        if response.streaming:
+            compression.metrics.record(route, responses=1)
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(response.streaming_content, encoding, route)
+            else:
+                response.streaming_content = compression.compress_stream(response.streaming_content, encoding, route)
+            del response.headers["Content-Length"]
+        else:
+            content = response.content
+            if len(content) < settings.COMPRESSION_MIN_SIZE:
+                compression.metrics.record(route, responses=1, skipped_small=1)
+                return response
+            compression.metrics.record(route, responses=1)
+            body = compression.compress_body(content, encoding, route)
+            if body is None:
+                return response
+            response.content = body
+            response["Content-Length"] = str(len(body))
+
+        # The body differs byte-for-byte now, so a strong validator would be wrong
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process(request, await self.get_response(request))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changecheckpoint',
+            name='gaps',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,3 +1,61 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 # Create your models here.
+
+class ChangeRecord(models.Model):
+    """A write to a tracked model, appended in the writer's transaction (see core.cdc)."""
+    OPERATION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+
+    model = models.CharField(max_length=100)  # "appointments.appointment"
+    object_id = models.CharField(max_length=64, blank=True)
+    operation = models.CharField(max_length=6, choices=OPERATION_CHOICES)
+    changed_fields = models.JSONField(null=True, blank=True)  # update_fields, when the save named them
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)  # the model's tracked fields
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Change Record"
+        indexes = [
+            models.Index(fields=['model', 'id'], name='change_model_idx'),
+            models.Index(fields=['created_at'], name='change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.operation} {self.model}:{self.object_id}"
+
+
+class ChangeCheckpoint(models.Model):
+    """How far a projection has consumed the change log."""
+    projection = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)  # last ChangeRecord.id handled
+    gaps = models.JSONField(default=dict, blank=True)  # {"id": first seen} below position, not committed yet
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Change Checkpoint"
+
+    def __str__(self):
+        return f"{self.projection} @ {self.position}"
+
+
+class Tombstone(models.Model):
+    """A deleted row of a synced model, kept so delta sync can tell each owner about it (see core.sync)."""
+    model = models.CharField(max_length=100)  # "appointments.appointment"
+    object_id = models.CharField(max_length=64)
+    user_id = models.BigIntegerField()  # an owner of the row; not a foreign key, the user may be going too
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tombstone"
+        indexes = [
+            models.Index(fields=['user_id', 'model', 'deleted_at'], name='tombstone_sync_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.object_id} for user {self.user_id}"
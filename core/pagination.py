@@ -0,0 +1,107 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset ("seek") pagination over (ordering_field, id), newest first.
+
+    Each page continues strictly after the last row of the previous one, so the
+    cost of a page doesn't grow with how deep the client has scrolled. Only
+    kicks in when the client sends ?limit= or ?cursor=, so older clients keep
+    receiving a plain list.
+    """
+    ordering_field = 'created_at'
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 50
+    max_limit = 200
+
+    @staticmethod
+    def get_params(request):
+        # DRF requests have query_params; the async views pass plain Django requests
+        return getattr(request, 'query_params', request.GET)
+
+    def _page_queryset(self, queryset, request):
+        """The queryset for the requested page plus one row, or None when not paginating."""
+        params = self.get_params(request)
+        if self.limit_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        self.limit = self.get_limit(request)
+
+        queryset = queryset.order_by(f'-{self.ordering_field}', '-id')
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+        if cursor:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{self.ordering_field}__lt': value}) |
+                Q(**{self.ordering_field: value, 'id__lt': pk})
+            )
+        return queryset[:self.limit + 1]
+
+    def _finish_page(self, rows):
+        self.has_next = len(rows) > self.limit
+        rows = rows[:self.limit]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self._page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self._finish_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset for async views (async ORM)."""
+        page = self._page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self._finish_page([row async for row in page])
+
+    def get_limit(self, request):
+        try:
+            limit = int(self.get_params(request).get(self.limit_query_param, self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.ordering_field)
+        raw = f"{value.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            value, pk = raw.rsplit('|', 1)
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError
+            return parsed, int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "cursor": self.next_cursor,
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
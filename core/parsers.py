@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from core import json as fast_json
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser backed by core.json (orjson when installed)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return fast_json.loads(data)
+        except (fast_json.JSONDecodeError, UnicodeDecodeError, ValueError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
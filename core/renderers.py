@@ -0,0 +1,35 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import compact
+from core import json as fast_json
+
+_drf_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by core.json (orjson when installed).
+
+    Types orjson can't encode natively fall back to DRF's own encoder, so
+    the output matches JSONRenderer's.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return fast_json.dumps(data, default=_drf_default, indent=bool(indent))
+
+
+class MsgPackRenderer(BaseRenderer):
+    """Compact msgpack (core.compact) for clients that send ``Accept: application/msgpack``."""
+    media_type = compact.MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return compact.pack(data)
@@ -0,0 +1,150 @@
+"""Sparse fieldsets for ModelSerializers.
+
+Read requests can trim (or enrich) any SparseModelSerializer:
+
+    ?view=card                 a named projection (Meta.projections), applied at every level
+    ?fields=id,price,user.name only these fields; dotted names reach into nested serializers
+    ?expand=state,district     swap a primary key for its nested object (Meta.expandable)
+
+``view=detail`` is the default: every field except ``Meta.admin_fields``,
+which only staff get, with ``view=admin``. Code can pass the same keys in
+the serializer context instead of the query string.
+
+``project_queryset`` turns the resolved field set into ``.only()`` /
+``select_related()``, so columns nobody renders are never fetched. Method
+fields name the columns they read in ``Meta.field_sources``.
+"""
+from rest_framework import serializers
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+VIEWS = ("card", "detail", "admin")
+
+
+def _split(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip() for item in value if item and item.strip()]
+
+
+def sparse_spec(context):
+    """Parsed view / fields / expand for a serializer context (cached in the context)."""
+    spec = context.get("_sparse_spec")
+    if spec is not None:
+        return spec
+
+    request = context.get("request")
+    params = {}
+    if request is not None and request.method in SAFE_METHODS:
+        params = getattr(request, "query_params", None) or request.GET
+
+    view = context.get("view") or params.get("view") or "detail"
+    if view not in VIEWS:
+        view = "detail"
+    user = getattr(request, "user", None)
+    if view == "admin" and not (user is not None and user.is_staff):
+        view = "detail"
+
+    spec = {
+        "view": view,
+        "fields": _split(context.get("fields") or params.get("fields")),
+        "expand": set(_split(context.get("expand") or params.get("expand"))),
+    }
+    # Shared by nested serializers through the root's context
+    context["_sparse_spec"] = spec
+    return spec
+
+
+def _names_at(names, path):
+    """Entries of a dotted name list that apply at ``path`` ('' for the root), first segment only."""
+    prefix = f"{path}." if path else ""
+    return {name[len(prefix):].split(".")[0] for name in names if name.startswith(prefix)}
+
+
+class SparseFieldsetMixin:
+    """See module docstring. Meta may define ``projections``, ``admin_fields``,
+    ``expandable`` ({name: serializer class}) and ``field_sources``."""
+
+    @property
+    def sparse_path(self):
+        parts, node = [], self
+        while node.parent is not None:
+            if node.field_name:
+                parts.append(node.field_name)
+            node = node.parent
+        return ".".join(reversed(parts))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        meta = self.Meta
+        spec = sparse_spec(self.context)
+        view = spec["view"]
+
+        if view != "admin":
+            for name in getattr(meta, "admin_fields", ()):
+                fields.pop(name, None)
+
+        projection = getattr(meta, "projections", {}).get(view)
+        if projection is not None:
+            fields = {name: field for name, field in fields.items() if name in projection}
+
+        path = self.sparse_path
+        for name in _names_at(spec["expand"], path) & set(getattr(meta, "expandable", {})):
+            if name in fields:
+                fields[name] = meta.expandable[name](read_only=True)
+
+        requested = _names_at(spec["fields"], path)
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        return fields
+
+
+class SparseModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    pass
+
+
+def _columns(serializer, prefix=""):
+    """(columns, relations) a serializer's current field set reads."""
+    model = serializer.Meta.model
+    sources = getattr(serializer.Meta, "field_sources", {})
+    columns, relations = {f"{prefix}{model._meta.pk.name}"}, set()
+
+    for name, field in serializer.fields.items():
+        if name in sources:
+            for source in sources[name]:
+                columns.add(prefix + source)
+                if "__" in source:
+                    relations.add(prefix + source.rsplit("__", 1)[0])
+            continue
+        if isinstance(field, serializers.ListSerializer) or field.source == "*":
+            continue  # reverse / many relations and computed fields don't map to columns
+        attrs = field.source.split(".")
+        if isinstance(field, serializers.BaseSerializer):
+            relation = prefix + "__".join(attrs)
+            nested_columns, nested_relations = _columns(field, relation + "__")
+            columns |= nested_columns | {relation}
+            relations |= nested_relations | {relation}
+            continue
+        if len(attrs) > 1:
+            # e.g. source="sender.email"
+            relation = prefix + "__".join(attrs[:-1])
+            relations.add(relation)
+            columns.add(relation)
+        columns.add(prefix + "__".join(attrs))
+
+    concrete = {f.name for f in model._meta.concrete_fields}
+    # Drop properties and the like that aren't columns of this model
+    columns = {c for c in columns if "__" in c[len(prefix):] or c[len(prefix):] in concrete}
+    return columns, relations
+
+
+def project_queryset(queryset, serializer_class, context, extra=()):
+    """``queryset`` limited to the columns ``serializer_class`` will render in ``context`` (plus ``extra``)."""
+    columns, relations = _columns(serializer_class(context=context))
+    columns.update(extra)
+    # Replace any select_related(): joining a relation whose columns are all deferred would fail
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*sorted(relations))
+    return queryset.only(*sorted(columns))
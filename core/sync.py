@@ -0,0 +1,130 @@
+"""Delta sync for offline-first clients (``GET /api/core/sync/?token=...``).
+
+Apps register the per-user lists clients keep offline:
+
+    register_sync("appointments", Appointment, owners=("krisshak", "bhooswami"), serializer=AppointmentSerializer)
+
+A sync answers, per list, with the rows the user owns that changed since
+the token's cursor (``updated_at``, indexed with each owner column) and the
+ids deleted since then, from the Tombstone rows a post_delete receiver
+writes for every owner. The response carries the next token; clients keep
+it and never look inside.
+
+Rows are matched from SYNC_OVERLAP_SECONDS before the cursor, so a write
+whose transaction committed just after the last sync read past its
+timestamp still arrives. Clients apply rows as upserts, so the repeats are
+harmless. Without a token, or with one older than the tombstones are kept
+(SYNC_TOMBSTONE_RETENTION_DAYS), the response says ``"reset": true`` and
+holds every row: the client replaces its copy.
+
+Code that writes with ``.update()`` must set ``updated_at`` itself.
+"""
+import datetime
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .cdc import model_label
+from .models import Tombstone
+from .serializers import project_queryset
+
+TOKEN_SALT = "core.sync"
+
+
+@dataclass
+class SyncSource:
+    name: str
+    model: type
+    owners: tuple      # foreign keys to the user; a row belongs to each of them
+    serializer: type
+
+
+_sources = {}   # name -> SyncSource
+_by_model = {}  # model label -> SyncSource
+
+
+def register_sync(name, model, owners, serializer):
+    """Offer ``model`` rows owned through ``owners`` as the ``name`` list of the sync endpoint."""
+    source = SyncSource(name, model, tuple(owners), serializer)
+    _sources[name] = source
+    label = model_label(model)
+    _by_model[label] = source
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f"sync_delete_{label}")
+
+
+def sources():
+    return dict(_sources)
+
+
+def _on_delete(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    source = _by_model[model_label(sender)]
+    owner_ids = {getattr(instance, f"{owner}_id") for owner in source.owners} - {None}
+    Tombstone.objects.using(using).bulk_create([
+        Tombstone(model=model_label(sender), object_id=str(instance.pk), user_id=user_id) for user_id in owner_ids
+    ])
+
+
+def make_token(user, cursor):
+    return signing.dumps({"u": user.pk, "c": cursor.timestamp()}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token, user):
+    """The cursor in ``token``; None if it is too old to diff from. Raises ValidationError."""
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        owner, cursor = payload["u"], datetime.datetime.fromtimestamp(payload["c"], tz=datetime.timezone.utc)
+    except (signing.BadSignature, KeyError, TypeError, ValueError, OverflowError):
+        raise ValidationError({"token": "Invalid sync token."})
+    if owner != user.pk:
+        raise ValidationError({"token": "Invalid sync token."})
+    if cursor < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        return None
+    return cursor
+
+
+def _changes(source, user, since, context):
+    owned = Q()
+    for owner in source.owners:
+        owned |= Q(**{owner: user})
+    queryset = source.model.objects.filter(owned)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    # No ordering: clients upsert by id, and sorting would defeat the index range scan
+    queryset = project_queryset(queryset.order_by(), source.serializer, context)
+    changes = {"updated": source.serializer(queryset, many=True, context=context).data, "deleted": []}
+
+    if since is not None:
+        object_ids = Tombstone.objects.filter(
+            user_id=user.pk, model=model_label(source.model), deleted_at__gte=since
+        ).values_list("object_id", flat=True)
+        to_python = source.model._meta.pk.to_python
+        changes["deleted"] = list(dict.fromkeys(to_python(object_id) for object_id in object_ids))
+    return changes
+
+
+def sync(user, token, context):
+    """The sync response for ``user``: changes since ``token`` (everything if it's None) and the next token."""
+    cursor = read_token(token, user) if token else None
+    # Read the clock first: anything written during the scans is sent again next time
+    now = timezone.now()
+    since = cursor - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS) if cursor is not None else None
+    return {
+        "token": make_token(user, now),
+        "reset": cursor is None,
+        "changes": {name: _changes(source, user, since, context) for name, source in _sources.items()},
+    }
+
+
+def prune_tombstones(older_than_days=None):
+    """Delete tombstones no valid token can ask about any more."""
+    if older_than_days is None:
+        older_than_days = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=older_than_days)).delete()
+    return deleted
@@ -0,0 +1,130 @@
+"""Query budgets for tests.
+
+    class AppointmentQueryTests(QueryBudgetMixin, TestCase):
+        def test_requests(self):
+            self.assertQueryBudget(lambda: self.client.get(url), seed=seed_requests, budget=8)
+
+``seed(count)`` grows the data to ``count`` rows. The call is measured
+against N rows and again against 10N (QUERY_BUDGET_N, QUERY_BUDGET_SCALE)
+with the caches cleared each time: it must stay within ``budget`` both
+times and issue the same number of queries, or the failure lists the SQL,
+repeated statements grouped with their count, and what grew with N.
+
+``assertMaxQueries`` is the budget half on its own, as a context manager.
+Budget tests run under ``override_settings(CACHES=LOCMEM_CACHES)``.
+Queries are counted on every configured database, replicas included.
+"""
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .cache import tiered_cache
+
+# Tests that count queries or avoid the database keep the shared cache tier in memory
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"}}
+
+QUERY_BUDGET_N = 3
+QUERY_BUDGET_SCALE = 10
+MAX_REPORTED_STATEMENTS = 25
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\bIN \((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE), "IN (...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_sql(sql):
+    """``sql`` with literals and IN lists replaced, so the same statement for different rows compares equal."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class CapturedQueries:
+    def __init__(self):
+        self.queries = []  # (alias, sql)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def statements(self):
+        """Counter of normalized statements."""
+        return Counter(normalize_sql(sql) for _, sql in self.queries)
+
+    def report(self, baseline=None):
+        """The captured SQL, most repeated first; with ``baseline``, the statements that ran more often than there."""
+        statements = self.statements()
+        if baseline is not None:
+            statements = statements - baseline.statements()
+        lines = [f"{count} x {sql}" for sql, count in statements.most_common(MAX_REPORTED_STATEMENTS)]
+        if len(statements) > MAX_REPORTED_STATEMENTS:
+            lines.append(f"... and {len(statements) - MAX_REPORTED_STATEMENTS} more")
+        return "\n".join(lines)
+
+
+@contextmanager
+def capture_queries():
+    """Yields a CapturedQueries filled with every query the block runs, on any database."""
+    captured = CapturedQueries()
+    with ExitStack() as stack:
+        contexts = {alias: stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections}
+        yield captured
+    for alias, context in contexts.items():
+        captured.queries.extend((alias, query["sql"]) for query in context.captured_queries)
+
+
+def clear_caches():
+    """Empty every cache a view could answer from, so each measurement starts cold."""
+    for cache in caches.all():
+        cache.clear()
+    tiered_cache.local.clear()
+
+
+class QueryBudgetMixin:
+    """TestCase helpers; see module docstring."""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, label=""):
+        with capture_queries() as captured:
+            yield captured
+        if len(captured) > budget:
+            self.fail(f"{label or 'Block'} ran {len(captured)} queries, over its budget of {budget}:\n{captured.report()}")
+
+    def measure_queries(self, call):
+        clear_caches()
+        with capture_queries() as captured:
+            result = call()
+        return captured, result
+
+    def assertQueryBudget(self, call, seed, budget, n=QUERY_BUDGET_N, scale=QUERY_BUDGET_SCALE, check=None):
+        """``call()`` stays within ``budget`` queries with ``n`` and ``n * scale`` seeded rows, and doesn't grow.
+
+        ``check(result)``, when given, runs on each measured result (e.g. asserting the status).
+        """
+        seed(n)
+        call()  # one-off work (content types, permissions) isn't the view's
+        small, result = self.measure_queries(call)
+        if check is not None:
+            check(result)
+
+        seed(n * scale)
+        large, result = self.measure_queries(call)
+        if check is not None:
+            check(result)
+
+        for count, captured in ((n, small), (n * scale, large)):
+            if len(captured) > budget:
+                self.fail(
+                    f"{len(captured)} queries with {count} rows, over the budget of {budget}:\n{captured.report()}"
+                )
+        if len(large) != len(small):
+            self.fail(
+                f"Query count grows with the data: {len(small)} with {n} rows, {len(large)} with {n * scale}.\n"
+                f"Statements that ran more often:\n{large.report(baseline=small)}"
+            )
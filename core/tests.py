@@ -1,3 +1,619 @@
-from django.test import TestCase
+import datetime
+import gzip
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+import msgpack
+from rest_framework.authtoken.models import Token
+
+from appointments.models import Appointment, AppointmentRequest
+from calender.models import CalendarEvent
+
+from core import compact, compression
+from core import json as fast_json
+from core.batch import executor as batch_executor
+from core.importtime import profile_startup
+from core.lazy import HEAVY_MODULES, LazyModule, lazy_import
+from core.db import routers
+from core.db.pool import ConnectionPool
+from core.db.routers import ReplicaRouter, request_routing, use_primary, use_replica
+from core.json import FastJsonResponse
+from core.middleware import CompressionMiddleware, MsgPackMiddleware, ReplicaPinMiddleware
+from core.cache import _MISSING, tiered_cache
+from core.cdc import Projection, consume_batch, prune_changes
+from core.models import ChangeCheckpoint, ChangeRecord
+from core.testing import LOCMEM_CACHES, QueryBudgetMixin, clear_caches, normalize_sql
+from core.sync import make_token
+from core.throttling import check_rate
+from core.warmup import warm_translations
+from notifications.models import Notification
+from users.models import CustomUser, District, Favorite, KrisshakProfile, State
 
 # Create your tests here.
+
+class LazyImportTests(SimpleTestCase):
+    def test_module_loads_on_first_attribute_access(self):
+        module = LazyModule("json.decoder")
+        self.assertFalse(module.is_loaded)
+        self.assertTrue(callable(module.JSONDecoder))
+        self.assertTrue(module.is_loaded)
+
+    def test_lazy_import_is_shared(self):
+        self.assertIs(lazy_import("json.decoder"), lazy_import("json.decoder"))
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Cold start of a worker: django.setup() plus the URLconf, in a fresh interpreter."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profile = profile_startup(importtime=False)
+
+    def test_startup_within_budget(self):
+        self.assertLessEqual(
+            self.profile.elapsed_ms, settings.STARTUP_TIME_BUDGET_MS,
+            f"Startup took {self.profile.elapsed_ms:.0f} ms; run `manage.py profile_imports` to see why",
+        )
+
+    def test_heavy_modules_not_loaded_at_startup(self):
+        self.assertEqual(self.profile.loaded(HEAVY_MODULES), [])
+
+
+@override_settings(REPLICA_DATABASES=["replica_1", "replica_2"], REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    """Routing decisions only; lag is faked so no replica needs to exist."""
+
+    def setUp(self):
+        routers.reset_lag_checks()
+        self.lags = {"replica_1": 0, "replica_2": 0}
+        patcher = mock.patch.object(routers, "measure_lag", side_effect=lambda alias: self.lags[alias])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(routers.reset_lag_checks)
+        self.router = ReplicaRouter()
+
+    def test_reads_stay_on_primary_without_opt_in(self):
+        self.assertIsNone(self.router.db_for_read(State))
+
+    def test_opted_in_reads_use_a_replica(self):
+        with use_replica():
+            self.assertIn(self.router.db_for_read(State), ["replica_1", "replica_2"])
+
+    def test_lagging_replica_is_skipped(self):
+        self.lags["replica_1"] = 60
+        with use_replica():
+            self.assertEqual({self.router.db_for_read(State) for _ in range(20)}, {"replica_2"})
+
+    def test_broken_replication_falls_back_to_primary(self):
+        self.lags.update(replica_1=None, replica_2=30)
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(State), "default")
+
+    def test_own_writes_pin_reads_to_primary(self):
+        with request_routing(), use_replica():
+            self.assertNotEqual(self.router.db_for_read(State), "default")
+            self.router.db_for_write(State)
+            self.assertEqual(self.router.db_for_read(State), "default")
+
+    def test_use_primary_overrides_use_replica(self):
+        with use_replica(), use_primary():
+            self.assertIsNone(self.router.db_for_read(State))
+
+
+@skipUnless(settings.REPLICA_DATABASES, "set DATABASE_REPLICA_URLS (e.g. a second sqlite:// file) to run")
+class ReplicaRoutingDatabaseTests(TransactionTestCase):
+    """Against two real databases. Locally:
+
+        DATABASE_URL=sqlite:///primary.sqlite3 DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 \
+            python manage.py test core
+    """
+    databases = "__all__"
+
+    def setUp(self):
+        self.replica = settings.REPLICA_DATABASES[0]
+        routers.reset_lag_checks()
+        self.addCleanup(routers.reset_lag_checks)
+        # The databases aren't replicating, so each holds its own row
+        State.objects.using("default").create(name="Primary State")
+        State.objects.using(self.replica).create(name="Replica State")
+
+    def names(self):
+        return set(State.objects.values_list("name", flat=True))
+
+    def test_opted_in_reads_come_from_the_replica(self):
+        self.assertEqual(self.names(), {"Primary State"})
+        with use_replica():
+            self.assertEqual(self.names(), {"Replica State"})
+
+    def test_writes_go_to_the_primary(self):
+        with use_replica():
+            State.objects.create(name="New State")
+        self.assertTrue(State.objects.using("default").filter(name="New State").exists())
+        self.assertFalse(State.objects.using(self.replica).filter(name="New State").exists())
+
+    def test_lagging_replica_is_not_read(self):
+        with mock.patch.object(routers, "measure_lag", return_value=3600), use_replica():
+            self.assertEqual(self.names(), {"Primary State"})
+
+    def test_pin_gives_read_your_writes(self):
+        factory = RequestFactory()
+
+        def view(request):
+            if request.method == "POST":
+                State.objects.create(name="Posted State")
+            with use_replica():
+                return HttpResponse(",".join(sorted(self.names())))
+
+        middleware = ReplicaPinMiddleware(view)
+
+        response = middleware(factory.post("/"))
+        pin = response[settings.REPLICA_PIN_HEADER]
+        self.assertGreater(float(pin), time.time())
+        self.assertIn("Posted State", response.content.decode())
+
+        # The next read from the same client stays on the primary
+        pinned = middleware(factory.get("/", HTTP_X_DB_PIN=pin))
+        self.assertIn("Posted State", pinned.content.decode())
+        self.assertNotIn(settings.REPLICA_PIN_HEADER, pinned)
+
+        # Without the pin it may read the (stale) replica
+        unpinned = middleware(factory.get("/"))
+        self.assertEqual(unpinned.content.decode(), "Replica State")
+
+    def test_far_future_pin_is_ignored(self):
+        request = RequestFactory().get("/", HTTP_X_DB_PIN=str(time.time() + 10 ** 6))
+        self.assertFalse(ReplicaPinMiddleware(lambda r: HttpResponse())._is_pinned(request))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, THROTTLE_ENABLED=True, THROTTLE_RATES={
+    "test": {"rate": "2/min", "by": ("ip",)},
+    "test_two": {"rate": "2/min", "by": ("ip", "field:email")},
+})
+class ThrottleTests(SimpleTestCase):
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+        self.factory = RequestFactory()
+
+    def post(self, forwarded_for=None, remote="10.0.0.1", email=None):
+        headers = {"HTTP_X_FORWARDED_FOR": forwarded_for} if forwarded_for else {}
+        request = self.factory.post("/", REMOTE_ADDR=remote, **headers)
+        if email:
+            request.data = {"email": email}
+        return request
+
+    def test_spoofed_forwarded_for_shares_the_proxy_hop_bucket(self):
+        # Render's proxy appends the real client; whatever the client put before it is ignored
+        waits = [check_rate("test", self.post(f"{n}.{n}.{n}.{n}, 203.0.113.7")) for n in range(1, 4)]
+        self.assertEqual(waits[:2], [None, None])
+        self.assertIsNotNone(waits[2])
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 0})
+    def test_without_proxies_the_header_is_ignored(self):
+        waits = [check_rate("test", self.post(f"198.51.100.{n}")) for n in range(3)]
+        self.assertIsNotNone(waits[2])
+
+    def test_refusal_stops_before_the_other_buckets(self):
+        for _ in range(2):
+            self.assertIsNone(check_rate("test_two", self.post(email="a@example.com")))
+        # The IP is spent: its requests mustn't keep using up another account's bucket
+        for _ in range(3):
+            self.assertIsNotNone(check_rate("test_two", self.post(email="b@example.com")))
+        self.assertIsNone(check_rate("test_two", self.post(remote="10.0.0.2", email="b@example.com")))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+    def test_invalidation_drops_only_the_tagged_local_entries(self):
+        tiered_cache.set("a", 1, tags=["profile:1"])
+        tiered_cache.set("b", 2, tags=["profile:2"])
+        tiered_cache.set("c", 3)
+        tiered_cache.invalidate_tags("profile:1")
+
+        self.assertIs(tiered_cache.local.get("a"), _MISSING)
+        self.assertEqual((tiered_cache.local.get("b"), tiered_cache.local.get("c")), (2, 3))
+        self.assertIsNone(tiered_cache.get("a"))
+
+    def test_entries_read_from_the_shared_tier_keep_their_tags(self):
+        tiered_cache.set("a", 1, tags=["profile:1"])
+        tiered_cache.local.clear()
+        self.assertEqual(tiered_cache.get("a"), 1)
+        tiered_cache.invalidate_tags("profile:1")
+        self.assertIs(tiered_cache.local.get("a"), _MISSING)
+
+
+class NormalizeSqlTests(SimpleTestCase):
+    def test_rows_of_one_statement_compare_equal(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 3 AND name = 'a''b'"),
+            normalize_sql("SELECT * FROM t WHERE id = 41 AND name = 'c'"),
+        )
+
+    def test_in_lists_of_any_length_compare_equal(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3)"),
+            normalize_sql("SELECT * FROM t WHERE id IN (7)"),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FavoritesETagTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+        state = State.objects.create(name="ETag State")
+        district = District.objects.create(name="ETag District", state=state)
+        self.viewer = CustomUser.objects.create_user(email="fan@example.com", password=None, user_type="bhooswami")
+        krisshak = CustomUser.objects.create_user(email="star@example.com", password=None, user_type="krisshak")
+        self.profile = KrisshakProfile.objects.create(user=krisshak, price=100, state=state, district=district, upi_id="s@upi")
+        Favorite.objects.create(user=self.viewer, krisshak=self.profile)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {Token.objects.create(user=self.viewer).key}"
+
+    def get(self, etag=None, **params):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(reverse("get_favorites"), params, **headers)
+
+    def test_expanded_favorites_change_with_the_profiles(self):
+        etag = self.get(expand="krisshak")["ETag"]
+        self.assertEqual(self.get(etag, expand="krisshak").status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.price = 250
+            self.profile.save()
+        response = self.get(etag, expand="krisshak")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(float(response.json()["favorites"][0]["krisshak"]["price"]), 250)
+
+    def test_plain_favorites_only_follow_the_list(self):
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.price = 250
+            self.profile.save()
+        self.assertEqual(self.get(etag).status_code, 304)
+
+
+class ChangeLogTests(TestCase):
+    def setUp(self):
+        self.state = State.objects.create(name="Logged State")
+
+    def record(self, days_old):
+        record = ChangeRecord.objects.create(model="users.state", object_id=str(self.state.pk), operation="update")
+        ChangeRecord.objects.filter(pk=record.pk).update(created_at=record.created_at - datetime.timedelta(days=days_old))
+        return record
+
+    @override_settings(CDC_DEFER_PROJECTIONS=False)
+    def test_nothing_is_logged_while_projections_run_inline(self):
+        CustomUser.objects.create_user(email="inline@example.com", password=None, user_type="krisshak")
+        self.assertFalse(ChangeRecord.objects.exists())
+
+    def test_prune_without_checkpoints_goes_by_age(self):
+        old, recent = self.record(40), self.record(1)
+        self.assertEqual(prune_changes(30), 1)
+        self.assertEqual(list(ChangeRecord.objects.values_list("pk", flat=True)), [recent.pk])
+
+    def test_prune_keeps_what_a_projection_has_not_consumed(self):
+        consumed, unconsumed = self.record(40), self.record(40)
+        ChangeCheckpoint.objects.create(projection="search_profiles", position=consumed.pk)
+        ChangeCheckpoint.objects.create(projection="pair_history", position=unconsumed.pk)
+        with mock.patch("core.cdc._projections", {"search_profiles": None, "pair_history": None}):
+            self.assertEqual(prune_changes(30), 1)
+        self.assertEqual(list(ChangeRecord.objects.values_list("pk", flat=True)), [unconsumed.pk])
+
+
+class ConsumeGapTests(TestCase):
+    def setUp(self):
+        self.seen = []
+        self.projection = Projection("test_states", ("users.state",), lambda records: self.seen.extend(r.pk for r in records))
+        self.first = self.record()
+        ChangeCheckpoint.objects.create(projection="test_states", position=self.first.pk)
+
+    def record(self, **fields):
+        return ChangeRecord.objects.create(model="users.state", object_id="1", operation="update", **fields)
+
+    def test_record_committed_late_below_the_checkpoint_is_delivered(self):
+        late, after = self.record(), self.record()
+        late_id = late.pk
+        late.delete()  # still inside its transaction, as far as the consumer can tell
+
+        self.assertEqual(consume_batch(self.projection, settle_seconds=0), 1)
+        self.assertEqual(self.seen, [after.pk])
+        self.assertEqual(list(ChangeCheckpoint.objects.get(projection="test_states").gaps), [str(late_id)])
+
+        self.record(id=late_id)  # ... and now it commits
+        self.assertEqual(consume_batch(self.projection, settle_seconds=0), 1)
+        self.assertEqual(self.seen, [after.pk, late_id])
+        self.assertEqual(ChangeCheckpoint.objects.get(projection="test_states").gaps, {})
+
+    def test_gaps_expire(self):
+        ChangeCheckpoint.objects.filter(projection="test_states").update(
+            gaps={"999999": (timezone.now() - datetime.timedelta(hours=1)).isoformat()}
+        )
+        self.assertEqual(consume_batch(self.projection, settle_seconds=0), 0)
+        self.assertEqual(ChangeCheckpoint.objects.get(projection="test_states").gaps, {})
+
+
+class TranslationWarmupTests(SimpleTestCase):
+    def test_catalogs_load(self):
+        warm_translations()
+        with translation.override("hi"):
+            self.assertEqual(translation.gettext("Welcome to E-Krisshak 2.0 !"), "E-Krisshak 2.0 में आपका स्वागत है!")
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    class Raw:
+        def close(self):
+            pass
+
+    def test_ping_runs_outside_the_lock(self):
+        seen = []
+
+        def ping(raw):
+            # Another thread must be able to use the pool while this one pings
+            worker = threading.Thread(target=lambda: seen.append(pool.stats()["checked_out"]))
+            worker.start()
+            worker.join(timeout=1)
+            self.assertFalse(worker.is_alive())
+
+        pool = ConnectionPool(self.Raw, size=1, max_overflow=0, pre_ping_after=0, ping=ping)
+        pool.checkin(pool.checkout())
+        pool.checkout()
+        self.assertEqual(seen, [1])  # the connection being pinged still holds its slot
+
+    def test_failed_ping_replaces_the_connection(self):
+        def ping(raw):
+            raise OSError("gone")
+
+        pool = ConnectionPool(self.Raw, size=1, max_overflow=0, pre_ping_after=0, ping=ping)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIsNot(pool.checkout(), first)
+        stats = pool.stats()
+        self.assertEqual((stats["ping_failures"], stats["created"], stats["checked_out"]), (1, 2, 1))
+
+
+class BatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="batch@example.com", password=None, user_type="krisshak")
+        cls.token = Token.objects.create(user=cls.user)
+        cls.notification = Notification.objects.create(recipient=cls.user, title="Hello", notification_type="notice")
+        CalendarEvent.objects.create(user=cls.user, title="Sowing", date=datetime.date(2026, 6, 1), time=datetime.time(9))
+
+    def batch(self, requests, **extra):
+        extra.setdefault("HTTP_AUTHORIZATION", f"Token {self.token.key}")
+        return self.client.post(reverse("api-batch"), {"requests": requests}, content_type="application/json", **extra)
+
+    def responses(self, requests):
+        response = self.batch(requests)
+        self.assertEqual(response.status_code, 200)
+        return {item["id"]: item for item in response.json()["responses"]}
+
+    def test_read_after_write_sees_the_write(self):
+        unread = {"method": "GET", "path": "/api/notifications/unread-count/"}
+        responses = self.responses([
+            {"id": "before", **unread},
+            {"id": "read", "method": "POST", "path": "/api/notifications/read/bulk/", "body": {"ids": [self.notification.pk]}},
+            {"id": "after", **unread},
+        ])
+        self.assertEqual(responses["before"]["body"]["unread_counts"]["notice"], 1)
+        self.assertEqual(responses["read"]["body"], {"updated": 1})
+        self.assertEqual(responses["after"]["body"]["unread_counts"]["notice"], 0)
+
+    def test_sub_request_can_revalidate(self):
+        etag = self.responses([{"id": "feed", "path": "/api/calender/feed.ics"}])["feed"]["headers"]["ETag"]
+        feed = self.responses([{"id": "feed", "path": "/api/calender/feed.ics", "headers": {"If-None-Match": etag}}])["feed"]
+        self.assertEqual((feed["status"], feed["headers"]["ETag"], feed["body"]), (304, etag, None))
+
+    def test_nested_batches_are_refused(self):
+        nested = self.responses([{"id": "nested", "method": "POST", "path": "/api/core/batch/", "body": {"requests": []}}])
+        self.assertEqual(nested["nested"]["status"], 400)
+
+    def test_only_api_paths_can_be_batched(self):
+        self.assertEqual(self.batch([{"path": "/admin/"}]).status_code, 400)
+
+    def test_batch_needs_authentication(self):
+        self.assertEqual(self.batch([{"path": "/api/notifications/unread-count/"}], HTTP_AUTHORIZATION="").status_code, 401)
+
+
+class ConcurrentBatchTests(TransactionTestCase):
+    """Runs of GETs go to worker threads, which need committed rows."""
+
+    def test_async_sub_views_run_concurrently(self):
+        user = CustomUser.objects.create_user(email="threads@example.com", password=None, user_type="krisshak")
+        token = Token.objects.create(user=user)
+        Notification.objects.create(recipient=user, title="Hello", notification_type="notice")
+        State.objects.create(name="Threaded State")
+
+        with mock.patch("core.batch.executor", wraps=batch_executor) as pool:
+            response = self.client.post(reverse("api-batch"), {"requests": [
+                {"id": "unread", "path": "/api/notifications/unread-count/"},
+                {"id": "inbox", "path": "/api/notifications/"},
+                {"id": "states", "path": "/api/users/states/"},
+            ]}, content_type="application/json", HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        self.assertTrue(pool.called)
+        responses = {item["id"]: item for item in response.json()["responses"]}
+        self.assertEqual(responses["unread"]["body"]["unread_counts"]["notice"], 1)
+        self.assertEqual([n["title"] for n in responses["inbox"]["body"]], ["Hello"])
+        self.assertIn("Threaded State", [s["name"] for s in responses["states"]["body"]])
+
+
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = (
+            CustomUser.objects.create_user(email=f"sync{i}@example.com", password=None, user_type="krisshak") for i in range(2)
+        )
+        cls.auth_token = Token.objects.create(user=cls.user)
+
+    def sync(self, token=None):
+        params = {"token": token} if token else {}
+        return self.client.get(reverse("sync"), params, HTTP_AUTHORIZATION=f"Token {self.auth_token.key}")
+
+    def notifications(self, token):
+        response = self.sync(token)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["changes"]["notifications"]
+
+    def test_tampered_and_foreign_tokens_are_refused(self):
+        token = self.sync().json()["token"]
+        tampered = token[:-1] + ("A" if token[-1] != "A" else "B")
+        self.assertEqual(self.sync(tampered).status_code, 400)
+        self.assertEqual(self.sync(make_token(self.other, timezone.now())).status_code, 400)
+
+    def test_deletes_come_back_as_tombstone_ids(self):
+        notification = Notification.objects.create(recipient=self.user, title="Gone soon")
+        token = self.sync().json()["token"]
+        pk = notification.pk
+        notification.delete()
+        self.assertEqual(self.notifications(token)["deleted"], [pk])
+
+    def test_expired_cursor_resets(self):
+        expired = timezone.now() - datetime.timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+        response = self.sync(make_token(self.user, expired))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["reset"])
+
+    def test_update_that_sets_updated_at_is_picked_up(self):
+        notification = Notification.objects.create(recipient=self.user, title="Old news")
+        Notification.objects.filter(pk=notification.pk).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        token = make_token(self.user, timezone.now())
+        self.assertEqual(self.notifications(token)["updated"], [])
+
+        Notification.objects.filter(pk=notification.pk).update(is_read=True, updated_at=timezone.now())
+        self.assertEqual([n["id"] for n in self.notifications(token)["updated"]], [notification.pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SyncQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The sync budget, with N and 10N partners each leaving a row in every synced source."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(name="Budget State")
+        cls.district = District.objects.create(name="Budget District", state=cls.state)
+        cls.viewer = CustomUser.objects.create_user(email="viewer@example.com", password=None, user_type="bhooswami")
+
+    def setUp(self):
+        self.partners = []
+        token = Token.objects.create(user=self.viewer)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+    def seed(self, count):
+        today = datetime.date.today()
+        for i in range(len(self.partners), count):
+            krisshak = CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak")
+            profile = KrisshakProfile.objects.create(
+                user=krisshak, specialization="wheat", price=100, state=self.state, district=self.district, upi_id=f"k{i}@upi"
+            )
+            # The confirmed appointment brings its calendar events (calender.signals)
+            Appointment.objects.create(krisshak=krisshak, bhooswami=self.viewer, date=today, time=datetime.time(9), status="confirmed")
+            AppointmentRequest.objects.create(sender=krisshak, recipient=self.viewer)
+            Notification.objects.create(recipient=self.viewer, sender=krisshak, notification_type="appointment", title=f"Hi {i}")
+            Favorite.objects.create(user=self.viewer, krisshak=profile)
+            self.partners.append(krisshak)
+
+    def test_sync(self):
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("sync")), self.seed, 6,
+            check=lambda response: self.assertEqual(response.status_code, 200),
+        )
+
+
+class CompactCodecTests(SimpleTestCase):
+    def envelope(self, body):
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+    def assertRoundTrips(self, data):
+        body = compact.pack(data)
+        self.assertEqual(compact.unpack(body), data)
+        return self.envelope(body)
+
+    def test_lists_of_like_objects_become_tables(self):
+        data = {"rows": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}], "mixed": [{"id": 1}, {"name": "B"}]}
+        envelope = self.assertRoundTrips(data)
+        self.assertEqual(envelope["data"]["rows"], [msgpack.ExtType(compact.TABLE, b""), ["id", "name"], [1, "A"], [2, "B"]])
+        self.assertEqual(envelope["data"]["mixed"], [{"id": 1}, {"name": "B"}])
+
+    def test_shared_objects_are_sent_once_and_form_a_table(self):
+        first, second = {"id": 1, "tags": ["x"]}, {"id": 2, "tags": []}
+        envelope = self.assertRoundTrips({"top": [first, second], "nearby": [second, first], "one": first})
+        self.assertEqual(envelope["refs"], [msgpack.ExtType(compact.TABLE, b""), ["id", "tags"], [1, ["x"]], [2, []]])
+        self.assertEqual(envelope["data"]["one"], msgpack.ExtType(compact.REF, b"\x00\x00"))
+
+    def test_ref_indexes_past_two_bytes(self):
+        profiles = [{"id": i} for i in range(0x10001)]
+        envelope = self.assertRoundTrips({"a": profiles, "b": profiles[::-1]})
+        self.assertEqual(envelope["data"]["a"][-1], msgpack.ExtType(compact.REF, (0x10000).to_bytes(4, "big")))
+
+    def test_middleware_reencodes_fast_json_responses(self):
+        data = {"results": [{"id": 1, "when": "2026-06-01"}, {"id": 2, "when": "2026-06-02"}]}
+        middleware = MsgPackMiddleware(lambda request: FastJsonResponse(data))
+        response = middleware(RequestFactory().get("/api/x/", HTTP_ACCEPT=compact.MEDIA_TYPE))
+        self.assertEqual(response["Content-Type"], compact.MEDIA_TYPE)
+        self.assertIn("Accept", response["Vary"])
+        self.assertEqual(compact.unpack(response.content), data)
+
+        # JSON clients keep JSON
+        response = middleware(RequestFactory().get("/api/x/"))
+        self.assertEqual(response["Content-Type"], "application/json")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = fast_json.dumps({"rows": [{"id": i, "name": "Krisshak"} for i in range(200)]})
+
+    def process(self, response, path="/api/x/"):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING="gzip")
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, content, **headers):
+        response = HttpResponse(content, content_type="application/json")
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def test_small_bodies_are_left_alone(self):
+        response = self.process(self.json_response(b'{"ok": true}'))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_compressed_body_gets_a_weak_etag(self):
+        response = self.process(self.json_response(self.body, ETag='"v1"'))
+        self.assertEqual((response["Content-Encoding"], response["ETag"]), ("gzip", 'W/"v1"'))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_streaming_bodies_are_compressed_per_chunk(self):
+        chunks = [self.body[i:i + 500] for i in range(0, len(self.body), 500)]
+        response = self.process(StreamingHttpResponse(iter(chunks), content_type="application/json"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.body)
+
+    def test_not_modified_passes_through(self):
+        not_modified = HttpResponseNotModified()
+        not_modified["Content-Type"] = "application/json"
+        not_modified["ETag"] = '"v1"'
+        response = self.process(not_modified)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["ETag"], '"v1"')
+
+    def test_gzip_output_length_is_padded_at_random(self):
+        bodies = [compression.compress(self.body, "gzip") for _ in range(20)]
+        self.assertGreater(len({len(body) for body in bodies}), 1)
+        self.assertTrue(all(gzip.decompress(body) == self.body for body in bodies))
+
+    def test_auth_responses_are_never_compressed(self):
+        response = self.process(self.json_response(self.body), path="/api/users/login/")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.body)
@@ -0,0 +1,275 @@
+"""Token-bucket rate limits and load shedding for expensive endpoints.
+
+    @method_decorator(throttle("otp"), name="post")
+    class VerifyOTPView(APIView): ...
+
+    @async_api_view(authentication=("token",))
+    @throttle("search")
+    async def search_krisshaks(request): ...
+
+``THROTTLE_RATES[scope]`` gives the refill rate ("5/hour": the bucket holds
+five requests and refills one every twelve minutes) and the principals
+each get their own bucket: ``user`` (falls back to the IP when anonymous),
+``ip``, ``token`` (the Authorization credential) and ``field:<name>`` (a
+request body field, e.g. the email an OTP goes to). A request needs a
+token from every bucket and gets 429 with Retry-After otherwise.
+
+The IP is DRF's: REMOTE_ADDR, or with REST_FRAMEWORK["NUM_PROXIES"] set,
+the X-Forwarded-For entry our own proxies added. Anything further left is
+client-supplied and never used.
+
+Buckets live in the shared cache: a Lua script keeps them atomic on Redis,
+other backends fall back to a read-modify-write that is only exact within
+one process.
+
+Scopes in ``CONCURRENCY_LIMITS`` are also capped at that many requests in
+flight per worker process; the rest are shed with 503 right away instead
+of queueing behind a KNN fit. Counters are kept per process, like the
+cache and compression metrics.
+"""
+import functools
+import hashlib
+import math
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from core.json import FastJsonResponse
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS[1] bucket; ARGV: refill per second, capacity, now, cost -> {allowed, seconds to wait}
+_TAKE_LUA = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate, capacity, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rate(rate):
+    """'5/hour' -> (capacity, refill per second)."""
+    count, _, period = rate.partition("/")
+    return int(count), int(count) / PERIODS[period.strip()[0].lower()]
+
+
+class ThrottleMetrics:
+    """Per-process allowed / throttled / shed counters, per scope."""
+
+    FIELDS = ("allowed", "throttled", "shed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, scope, field):
+        with self._lock:
+            self._counts[scope][field] += 1
+            self._counts["*"][field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = {name: dict(values) for name, values in self._counts.items()}
+        total = counts.pop("*", dict.fromkeys(self.FIELDS, 0))
+        return {
+            "total": total,
+            "scopes": dict(sorted(counts.items())),
+            "in_flight": {scope: limiter.active for scope, limiter in sorted(_limiters.items())},
+        }
+
+
+metrics = ThrottleMetrics()
+
+
+class TokenBucket:
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self._lock = threading.Lock()  # serializes the fallback path within a process
+
+    def take(self, key, capacity, rate, cost=1):
+        """Take ``cost`` tokens from bucket ``key``: (allowed, seconds until it could be)."""
+        cache = caches[self.alias]
+        now = time.time()
+        client = self._redis(cache, key)
+        if client is not None:
+            allowed, wait = client.register_script(_TAKE_LUA)(
+                keys=[cache.make_and_validate_key(key)], args=[rate, capacity, now, cost]
+            )
+            return bool(allowed), float(wait)
+
+        with self._lock:
+            tokens, ts = cache.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            cache.set(key, (tokens, now), math.ceil(capacity / rate) + 1)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    @staticmethod
+    def _redis(cache, key):
+        # Django's RedisCache; anything else takes the fallback path
+        backend = getattr(cache, "_cache", None)
+        get_client = getattr(backend, "get_client", None)
+        return get_client(key, write=True) if get_client else None
+
+
+buckets = TokenBucket()
+
+
+class ConcurrencyLimiter:
+    """Non-blocking cap on requests in flight in this process."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(scope):
+    limit = settings.CONCURRENCY_LIMITS.get(scope)
+    if not limit:
+        return None
+    with _limiters_lock:
+        if scope not in _limiters:
+            _limiters[scope] = ConcurrencyLimiter(limit)
+        return _limiters[scope]
+
+
+def _digest(value):
+    return hashlib.blake2b(str(value).encode(), digest_size=12).hexdigest()
+
+
+def principal_keys(request, principals):
+    """One bucket name per principal that applies to ``request``."""
+    ip = BaseThrottle().get_ident(request)
+    keys = []
+    for principal in principals:
+        if principal == "ip":
+            keys.append(f"ip:{ip}")
+        elif principal == "user":
+            user = getattr(request, "user", None)
+            keys.append(f"user:{user.pk}" if user is not None and user.is_authenticated else f"ip:{ip}")
+        elif principal == "token":
+            credential = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")[2].strip()
+            if credential:
+                keys.append(f"token:{_digest(credential)}")
+        elif principal.startswith("field:"):
+            name = principal[len("field:"):]
+            data = getattr(request, "data", None) or request.POST
+            value = data.get(name) if hasattr(data, "get") else None
+            if value:
+                keys.append(f"{name}:{_digest(str(value).strip().lower())}")
+    return list(dict.fromkeys(keys))
+
+
+def check_rate(scope, request):
+    """Seconds the caller must wait, or None if every bucket had a token."""
+    config = settings.THROTTLE_RATES.get(scope)
+    if not settings.THROTTLE_ENABLED or not config:
+        return None
+    capacity, rate = parse_rate(config["rate"])
+    for key in principal_keys(request, config["by"]):
+        allowed, wait = buckets.take(f"throttle:{scope}:{key}", capacity, rate)
+        if not allowed:
+            # Stop here: a refused client mustn't keep draining its other buckets
+            return wait
+    return None
+
+
+def _throttled(wait):
+    seconds = max(1, math.ceil(wait))
+    response = FastJsonResponse(
+        {"detail": f"Request was throttled. Expected available in {seconds} second{'s' if seconds != 1 else ''}."},
+        status=429,
+    )
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+def _shed():
+    response = FastJsonResponse({"detail": "Server is busy, please try again shortly."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def throttle(scope):
+    """Rate-limit a view (function, async function or APIView method) by ``scope``; shed it under load."""
+    def decorator(view):
+        def split(args):
+            # Function views get (request, ...); APIView methods get (self, request, ...)
+            return args[1] if len(args) > 1 and hasattr(args[1], "method") else args[0]
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                wait = await sync_to_async(check_rate)(scope, split(args))
+                if wait is not None:
+                    metrics.incr(scope, "throttled")
+                    return _throttled(wait)
+                slots = limiter(scope)
+                if slots is not None and not slots.acquire():
+                    metrics.incr(scope, "shed")
+                    return _shed()
+                metrics.incr(scope, "allowed")
+                try:
+                    return await view(*args, **kwargs)
+                finally:
+                    if slots is not None:
+                        slots.release()
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            wait = check_rate(scope, split(args))
+            if wait is not None:
+                metrics.incr(scope, "throttled")
+                return _throttled(wait)
+            slots = limiter(scope)
+            if slots is not None and not slots.acquire():
+                metrics.incr(scope, "shed")
+                return _shed()
+            metrics.incr(scope, "allowed")
+            try:
+                return view(*args, **kwargs)
+            finally:
+                if slots is not None:
+                    slots.release()
+        return wrapper
+    return decorator
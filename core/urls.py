@@ -1,6 +1,12 @@
 from django.urls import path
-from .views import set_language
+from .views import set_language, cache_stats, db_pool_stats, compression_stats, throttle_stats, batch, sync
 
 urlpatterns = [
     path('set-language/<str:lang_code>/', set_language, name='set-language'),
+    path('cache-stats/', cache_stats, name='cache-stats'),
+    path('db-pool-stats/', db_pool_stats, name='db-pool-stats'),
+    path('compression-stats/', compression_stats, name='compression-stats'),
+    path('throttle-stats/', throttle_stats, name='throttle-stats'),
+    path('batch/', batch, name='api-batch'),
+    path('sync/', sync, name='sync'),
 ]
@@ -1,7 +1,7 @@
 from django.utils.translation import get_language
 import logging
 from django.conf import settings
-from django.core.cache import cache
+from core.cache import tiered_cache
 import re
 
 def get_user_language(request):
@@ -28,16 +28,28 @@ def get_default_language():
 
 
 def get_cached_data(key):
-    """Retrieve cached data"""
-    return cache.get(key)
+    """Retrieve cached data (local LRU, then the shared cache)"""
+    return tiered_cache.get(key)
 
-def set_cached_data(key, value, timeout=300):
-    """Store data in cache"""
-    cache.set(key, value, timeout)
+def set_cached_data(key, value, timeout=300, tags=()):
+    """Store data in cache, optionally under invalidation tags"""
+    tiered_cache.set(key, value, timeout, tags)
 
 def delete_cached_data(key):
     """Remove cached data"""
-    cache.delete(key)
+    tiered_cache.delete(key)
+
+def get_or_set_cached_data(key, compute, timeout=300, tags=()):
+    """Return cached data, computing it once on a miss"""
+    return tiered_cache.get_or_set(key, compute, timeout, tags)
+
+async def aget_or_set_cached_data(key, compute, timeout=300, tags=()):
+    """Async get_or_set_cached_data; ``compute`` runs in a thread on a miss"""
+    return await tiered_cache.aget_or_set(key, compute, timeout, tags)
+
+def invalidate_cache_tags(*tags):
+    """Invalidate every cache entry stored under these tags"""
+    tiered_cache.invalidate_tags(*tags)
 
 
 def sanitize_input(user_input):
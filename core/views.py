@@ -1,6 +1,14 @@
 from django.http import JsonResponse
 from django.utils.translation import gettext as _
 from django.utils.translation import activate
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from core import compression, throttling
+from core.batch import parse_batch, run_batch
+from core.sync import sync as sync_changes
+from core.cache import tiered_cache
+from core.db.pool import pool_stats
 
 def homepage(request):
     message = _("Welcome to E-Krisshak 2.0 !")
@@ -16,3 +24,47 @@ def set_language(request, lang_code):
     response = JsonResponse({"message": "Language updated!"})
     response.set_cookie('preferred_language', lang_code)  # Stores preference
     return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Hit / miss counters of this worker's tiered cache, overall and per key namespace"""
+    stats = tiered_cache.metrics.snapshot()
+    stats["local_entries"] = len(tiered_cache.local)
+    return JsonResponse(stats)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    """Size, usage and checkout wait times of this worker's DB connection pools"""
+    return JsonResponse({"pools": pool_stats()})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def compression_stats(request):
+    """Compression ratio and CPU time of this worker's API responses, overall and per route"""
+    return JsonResponse(compression.metrics.snapshot())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def throttle_stats(request):
+    """Allowed / throttled / shed requests per scope in this worker, and searches in flight"""
+    return JsonResponse(throttling.metrics.snapshot())
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """Run several API calls in one round trip (see core/batch.py)"""
+    return Response({"responses": run_batch(request, parse_batch(request.data))})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """Appointments, requests, calendar, notifications and favorites changed since ?token= (see core/sync.py)"""
+    return Response(sync_changes(request.user, request.query_params.get("token"), {"request": request}))
@@ -0,0 +1,113 @@
+"""Warm-up tasks a worker runs before it reports ready.
+
+Apps register tasks from ``AppConfig.ready``:
+
+    register_warmup("users.states", warm_state_list)
+
+The ASGI / WSGI entrypoints call ``start_warmup()``, which runs every task once
+in a background thread. ``health_check`` reports 503 until that has finished.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupTask:
+    name: str
+    func: object
+
+
+_tasks = []
+_lock = threading.Lock()
+_state = {"status": "idle", "started_at": None, "finished_at": None, "tasks": {}}
+
+
+def register_warmup(name, func=None):
+    """Register ``func()`` as a warm-up task; usable as a decorator."""
+    def decorator(func):
+        with _lock:
+            if not any(task.name == name for task in _tasks):
+                _tasks.append(WarmupTask(name, func))
+        return func
+    return decorator(func) if func is not None else decorator
+
+
+def run_warmup():
+    """Run every registered task once, recording timings and failures."""
+    with _lock:
+        tasks = list(_tasks)
+        _state.update(status="running", started_at=time.time(), tasks={})
+
+    for task in tasks:
+        start = time.perf_counter()
+        try:
+            task.func()
+            result = {"status": "ok"}
+        except Exception as e:
+            # A failed task is reported but doesn't keep the worker out of rotation
+            logger.error(f"Warm-up task {task.name} failed: {str(e)}")
+            result = {"status": "failed", "error": str(e)}
+        result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        _state["tasks"][task.name] = result
+
+    # Warm-up runs in its own thread; don't leave its DB connections behind
+    connections.close_all()
+    _state.update(status="ready", finished_at=time.time())
+
+
+def start_warmup(background=True):
+    """Start warm-up once per process. Returns False if it was already started."""
+    with _lock:
+        if _state["status"] != "idle":
+            return False
+        if not getattr(settings, "WARMUP_ON_STARTUP", True):
+            _state["status"] = "disabled"
+            return False
+        _state["status"] = "starting"
+
+    if background:
+        threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+    else:
+        run_warmup()
+    return True
+
+
+def is_ready():
+    return _state["status"] in ("ready", "disabled")
+
+
+def warmup_status():
+    """Snapshot of the warm-up state for the health check."""
+    state = dict(_state, tasks=dict(_state["tasks"]))
+    if state["started_at"] and state["finished_at"]:
+        state["duration_ms"] = round((state["finished_at"] - state["started_at"]) * 1000, 1)
+    return state
+
+
+# Core tasks, registered by CoreConfig.ready
+
+def warm_database():
+    """Open and check every configured DB connection."""
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def warm_cache():
+    """Open the cache backend's connection pool (Redis when configured)."""
+    from django.core.cache import cache
+    cache.get("warmup:ping")
+
+
+def warm_translations():
+    """Load the compiled message catalogs for every supported language."""
+    from django.utils.translation import trans_real
+    for code, _name in settings.LANGUAGES:
+        trans_real.translation(code)
@@ -27,4 +27,6 @@ application = ProtocolTypeRouter({
     )
 })
 
-
+# Preload DB / cache connections, reference data and ML imports before reporting ready
+from core.warmup import start_warmup
+start_warmup()
@@ -69,8 +69,9 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.CompressionMiddleware',  # br / gzip for JSON and msgpack API responses
     'django.middleware.common.CommonMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',  # async-capable wrapper around whitenoise
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',   
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,6 +79,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.LanguageMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
+    'core.middleware.MsgPackMiddleware',  # Accept: application/msgpack for non-DRF views
 ]
 
 # CORS_ALLOW_ALL_ORIGINS = True
@@ -115,6 +118,80 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared tier of core.cache. Tag versions (ETags, the profile cache) and rate-limit buckets live here,
+# so every worker must see the same one: Redis when REDIS_URL is configured, else a database table
+# (`manage.py createcachetable`, run by build.sh). CACHE_BACKEND=locmem keeps it in the process,
+# which is only right for a single-process dev server; the core.W001 check warns about it.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "ekrisshak",
+        }
+    }
+elif os.getenv("CACHE_BACKEND") == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ekrisshak",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "core_cache",
+            "KEY_PREFIX": "ekrisshak",
+        }
+    }
+
+# Per-process tier of core.cache
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+CACHE_LOCAL_TTL = int(os.getenv("CACHE_LOCAL_TTL", "5"))  # max staleness after another worker invalidates
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", "10"))  # single-flight wait on a miss
+CACHE_TAG_TIMEOUT = int(os.getenv("CACHE_TAG_TIMEOUT", str(60 * 60 * 24 * 7)))  # an expired tag just starts a new version
+
+# API response compression (core.middleware.CompressionMiddleware); Brotli needs the Brotli package
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies go out as they are
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CONTENT_TYPES = ("application/json", "application/msgpack")
+# BREACH: gzip headers carry up to this many random padding bytes, like Django's GZipMiddleware;
+# Brotli can't be padded, so responses that hold credentials are never compressed
+COMPRESSION_GZIP_MAX_RANDOM_BYTES = int(os.getenv("COMPRESSION_GZIP_MAX_RANDOM_BYTES", "100"))
+COMPRESSION_EXCLUDED_PATHS = (
+    "/api/users/register/",
+    "/api/users/verify-otp/",
+    "/api/users/forgot-password/",
+    "/api/users/reset-password/",
+    "/api/users/login/",
+    "/api/users/token/",
+)
+
+# Rate limits (core.throttling): token buckets per scope and principal, kept in the shared cache.
+# "5/hour" holds five requests and refills one every twelve minutes.
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "True") == "True"
+THROTTLE_RATES = {
+    "login": {"rate": os.getenv("THROTTLE_LOGIN_RATE", "10/min"), "by": ("ip", "field:username_or_email")},
+    "otp": {"rate": os.getenv("THROTTLE_OTP_RATE", "10/hour"), "by": ("ip", "field:email")},
+    "password_reset": {"rate": os.getenv("THROTTLE_PASSWORD_RESET_RATE", "5/hour"), "by": ("ip", "field:email")},
+    # Checking the reset OTP: keyed by the account too, so guessing its code is capped from any IP
+    "password_reset_verify": {
+        "rate": os.getenv("THROTTLE_PASSWORD_RESET_VERIFY_RATE", "10/hour"), "by": ("ip", "user", "field:email"),
+    },
+    "contact": {"rate": os.getenv("THROTTLE_CONTACT_RATE", "5/hour"), "by": ("ip",)},
+    "search": {"rate": os.getenv("THROTTLE_SEARCH_RATE", "30/min"), "by": ("user", "token")},
+}
+# Load shedding: requests of a scope in flight per worker process before the rest get 503
+CONCURRENCY_LIMITS = {
+    "search": int(os.getenv("SEARCH_MAX_CONCURRENCY", "4")),
+}
+
+# Request batching (core.batch): sub-requests per batch, and threads running their GETs concurrently
+API_BATCH_MAX_REQUESTS = int(os.getenv("API_BATCH_MAX_REQUESTS", "20"))
+API_BATCH_MAX_WORKERS = int(os.getenv("API_BATCH_MAX_WORKERS", "4"))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -138,15 +215,52 @@ import dj_database_url
 DATABASES = {
     'default': dj_database_url.parse(
         os.getenv("DATABASE_URL"),
-        engine="django.db.backends.mysql",
+        # django.db.backends.mysql + core.db.pool; other URL schemes (e.g. sqlite:// locally) keep their engine
+        engine="core.db.backends.mysql" if os.getenv("DATABASE_URL", "").startswith("mysql") else None,
+        # Keep 0 with the pool: Django hands the connection back after each request
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "0")),
+        conn_health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     )
 }
 
-DATABASES["default"]["OPTIONS"] = {
-    "charset": "utf8mb4",
-    "init_command": "SET NAMES 'utf8mb4'"
+# Per-process connection pool (see core/db/pool.py); DB_POOL_SIZE=0 disables it
+DATABASES["default"]["POOL"] = {
+    "SIZE": int(os.getenv("DB_POOL_SIZE", "10")),
+    "MAX_OVERFLOW": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+    "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "PRE_PING_AFTER": int(os.getenv("DB_POOL_PRE_PING_AFTER", "30")),
 }
 
+if DATABASES["default"]["ENGINE"] == "core.db.backends.mysql":
+    DATABASES["default"]["OPTIONS"] = {
+        "charset": "utf8mb4",
+        "init_command": "SET NAMES 'utf8mb4'"
+    }
+
+# Read replicas (comma separated URLs), used by core.db.routers for views that opt in
+REPLICA_DATABASES = []
+for index, url in enumerate(filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), start=1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        **dj_database_url.parse(
+            url.strip(),
+            engine="core.db.backends.mysql" if url.strip().startswith("mysql") else None,
+            conn_max_age=DATABASES["default"]["CONN_MAX_AGE"],
+            conn_health_checks=DATABASES["default"]["CONN_HEALTH_CHECKS"],
+        ),
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = int(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = int(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+# Read-your-writes window; keep it above REPLICA_MAX_LAG_SECONDS
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+REPLICA_PIN_COOKIE = "db_pin"
+REPLICA_PIN_HEADER = "X-DB-Pin"
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -155,6 +269,20 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed JSON (core/json.py); the browsable API stays for development
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MsgPackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxies in front of the app (Render's load balancer): client IPs for throttling come from
+    # the X-Forwarded-For entry they appended, never from what the client sent itself
+    'NUM_PROXIES': int(os.getenv("NUM_PROXIES", "1")),
 }
 
 
@@ -251,6 +379,27 @@ USE_TZ = True
 DEFAULT_CURRENCY = 'INR'
 
 
+# Read notifications older than this are moved out by `archive_notifications`
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+
+# Cold start budget (ms) for django.setup() + URLconf, checked by core.tests
+STARTUP_TIME_BUDGET_MS = int(os.getenv("STARTUP_TIME_BUDGET_MS", "3000"))
+
+# Run core.warmup tasks in the background when a worker starts; "/" answers 503 until done
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "True") == "True"
+
+# Change-data-capture (core.cdc): when True, derived data (search projection, pair history)
+# is left to `manage.py consume_changes` instead of being updated inside the request
+CDC_DEFER_PROJECTIONS = os.getenv("CDC_DEFER_PROJECTIONS", "False") == "True"
+CDC_SETTLE_SECONDS = int(os.getenv("CDC_SETTLE_SECONDS", "5"))
+CDC_GAP_TIMEOUT_SECONDS = int(os.getenv("CDC_GAP_TIMEOUT_SECONDS", "600"))  # longest transaction that writes tracked models
+
+# Delta sync (core.sync): rows changed this long before a token's cursor are sent again,
+# covering writes that committed after the last sync read; tokens expire with the tombstones
+SYNC_OVERLAP_SECONDS = int(os.getenv("SYNC_OVERLAP_SECONDS", "10"))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+
 MEDIA_URL = '/media/'  # URL path for media files
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Physical storage location
 
@@ -263,4 +412,9 @@ CORS_ALLOWED_ORIGINS=[
     'https://e-krisshak-2-0.onrender.com',  
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Read-your-writes pin (core.middleware.ReplicaPinMiddleware) for token-auth clients
+from corsheaders.defaults import default_headers
+CORS_ALLOW_HEADERS = (*default_headers, REPLICA_PIN_HEADER.lower())
+CORS_EXPOSE_HEADERS = [REPLICA_PIN_HEADER]
\ No newline at end of file
@@ -20,9 +20,13 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.static import serve
+from core.warmup import is_ready, start_warmup, warmup_status
 
 def health_check(request):
-    return JsonResponse({"ok": True})
+    # Ready only once this worker's warm-up has finished
+    start_warmup()
+    ready = is_ready()
+    return JsonResponse({"ok": ready, "ready": ready, "warmup": warmup_status()}, status=200 if ready else 503)
 
 urlpatterns = [
     path("", health_check),   
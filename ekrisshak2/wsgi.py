@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ekrisshak2.settings')
 
 application = get_wsgi_application()
+
+# Preload DB / cache connections, reference data and ML imports before reporting ready
+from core.warmup import start_warmup
+start_warmup()
@@ -1,10 +1,18 @@
 from django.contrib import admin
-from .models import Notification
+from core.db.routers import ReplicaReadsAdminMixin
+from .models import Notification, ArchivedNotification
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'recipient', 'notification_type', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('title', 'message', 'recipient__email')
     ordering = ('-created_at',)
 
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'recipient', 'notification_type', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'archived_at')
+    search_fields = ('title', 'recipient__email')
+    ordering = ('-created_at',)
@@ -7,4 +7,14 @@ class NotificationsConfig(AppConfig):
 
     def ready(self):
         import notifications.signals
+        from core.warmup import register_warmup
+        from notifications.utils import warm_push
+        register_warmup("notifications.push", warm_push)
 
+        from core.cdc import track_model
+        from notifications.models import Notification
+        track_model(Notification, fields=("recipient_id", "notification_type", "is_read"))
+
+        from core.sync import register_sync
+        from notifications.serializers import NotificationSerializer
+        register_sync("notifications", Notification, owners=("recipient",), serializer=NotificationSerializer)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification, ArchivedNotification
+
+ARCHIVE_FIELDS = ('id', 'recipient_id', 'sender_id', 'notification_type', 'title', 'message', 'is_read', 'created_at')
+
+class Command(BaseCommand):
+    help = 'Move old read notifications to the archive table in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help='Archive read notifications older than this many days')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        chunk_size = options['chunk_size']
+
+        expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"Would archive {expired.count()} notifications older than {cutoff:%Y-%m-%d}")
+            return
+
+        archived = 0
+        while True:
+            # Short transactions keep row locks brief on the live table
+            with transaction.atomic():
+                rows = list(expired.order_by('id').values(*ARCHIVE_FIELDS)[:chunk_size])
+                if not rows:
+                    break
+
+                ArchivedNotification.objects.bulk_create(
+                    [
+                        ArchivedNotification(
+                            original_id=row['id'],
+                            recipient_id=row['recipient_id'],
+                            sender_id=row['sender_id'],
+                            notification_type=row['notification_type'],
+                            title=row['title'],
+                            message=row['message'],
+                            is_read=row['is_read'],
+                            created_at=row['created_at'],
+                        )
+                        for row in rows
+                    ],
+                    ignore_conflicts=True,
+                )
+                Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+            archived += len(rows)
+            self.stdout.write(f"Archived {archived} notifications so far")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Archived {archived} notifications older than {cutoff:%Y-%m-%d}"))
@@ -22,9 +22,37 @@ class Notification(models.Model):
 
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Inbox pages seek on (recipient, created_at, id)
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_inbox_idx'),
+            # Retention job scans old read rows
+            models.Index(fields=['is_read', 'created_at'], name='notif_retention_idx'),
+            # Delta sync (core.sync) scans a recipient's rows changed since a cursor
+            models.Index(fields=['recipient', 'updated_at'], name='notif_sync_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.notification_type}] To: {self.recipient.email}"
+
+
+class ArchivedNotification(models.Model):
+    """Old read notifications moved out of the hot table by archive_notifications."""
+    original_id = models.BigIntegerField(unique=True)
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_notifications', null=True, blank=True)
+    sender_id = models.BigIntegerField(null=True, blank=True)
+
+    notification_type = models.CharField(max_length=20)
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True, null=True)
+
+    is_read = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Archived Notification"
@@ -0,0 +1,193 @@
+"""Per-transaction notification outbox.
+
+Signal handlers queue notifications here instead of writing them one by one.
+Everything queued inside a transaction (per savepoint) is written with a single
+``bulk_create`` once it commits, and the socket / push / email fan-out runs in
+one pass after that. Items queued in a savepoint that rolls back are dropped.
+Outside of ``transaction.atomic()`` each item is flushed straight away.
+"""
+import logging
+import threading
+from collections import defaultdict
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.mail import EmailMessage, get_connection
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from redis.exceptions import ConnectionError
+
+from core.cdc import record_changes
+from notifications.models import Notification
+from notifications.utils import send_push_notification
+
+logger = logging.getLogger(__name__)
+
+channel_layer = get_channel_layer()
+
+_local = threading.local()
+
+
+class NotificationBatch:
+    """Notifications and emails collected for one savepoint of a transaction.
+
+    Every queued item registers its own ``on_commit`` callback, so Django drops
+    the ones queued in a savepoint that rolls back. The callbacks run in queueing
+    order and the last one flushes whatever was confirmed.
+    """
+
+    def __init__(self, using, key=None):
+        self.using = using
+        self.key = key
+        self.notifications = []  # (Notification, ws group, push message)
+        self.emails = []
+        self.queued = 0
+
+    def queue(self, add):
+        self.queued += 1
+        transaction.on_commit(partial(self.confirm, add, self.queued), using=self.using)
+
+    def confirm(self, add, number):
+        # Runs as the on_commit callback of the number-th queued item
+        add(self)
+        if number != self.queued:
+            return
+        batches = getattr(_local, "batches", {})
+        if batches.get(self.key) is self:
+            del batches[self.key]
+        flush_batch(self)
+
+
+def _enqueue(using, add):
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        NotificationBatch(using).queue(add)  # runs straight away
+        return
+
+    # One batch per savepoint: everything in it commits or rolls back together.
+    # A batch left behind by a rolled-back transaction only adds to the count,
+    # its items were dropped with their callbacks.
+    savepoints = tuple(connection.savepoint_ids)
+    key = (using, savepoints)
+    batches = getattr(_local, "batches", None)
+    if batches is None:
+        batches = _local.batches = {}
+
+    # Savepoints that were left (released or rolled back) take no new items;
+    # released batches still flush through their pending callbacks
+    for other in [k for k in batches if k[0] == using and k[1] != savepoints[:len(k[1])]]:
+        del batches[other]
+
+    batch = batches.get(key)
+    if batch is None:
+        batch = batches[key] = NotificationBatch(using, key)
+    batch.queue(add)
+
+
+def queue_notification(recipient, title, message="", notification_type="system",
+                       sender=None, group=None, push_message=None, using=DEFAULT_DB_ALIAS):
+    """Queue a Notification row and its live delivery for the current transaction.
+
+    ``group`` defaults to the recipient's socket group; pass ``False`` to skip the
+    socket send. ``push_message`` also sends a web push when the recipient has a
+    subscription.
+    """
+    notif = Notification(
+        recipient=recipient,
+        sender=sender,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+    )
+    if group is None and recipient is not None:
+        group = f"user_{recipient.id}"
+
+    _enqueue(using, lambda batch: batch.notifications.append((notif, group, push_message)))
+    return notif
+
+
+def queue_email(subject, message, recipient_list, from_email=None, using=DEFAULT_DB_ALIAS):
+    """Queue a plain-text email to be sent after the current transaction commits."""
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[r for r in recipient_list if r],
+    )
+    if email.to:
+        _enqueue(using, lambda batch: batch.emails.append(email))
+    return email
+
+
+# 📡 Helper function to safely send WebSocket notifications
+def send_ws_notification(group: str, data: dict):
+    send_ws_notifications([(group, data)])
+
+
+def send_ws_notifications(messages):
+    """Send several group messages with a single sync -> async hop."""
+    if not messages or channel_layer is None:
+        return
+
+    async def _send_all():
+        for group, data in messages:
+            try:
+                await channel_layer.group_send(group, {"type": "send.notification", "data": data})
+            except ConnectionError as e:
+                logger.error(f"Redis group_send failed for group '{group}': {str(e)}")
+
+    async_to_sync(_send_all)()
+
+
+def _bulk_insert(rows, using):
+    """``bulk_create`` that leaves every row with its primary key, also on backends that don't return them (MySQL)."""
+    manager = Notification.objects.using(using)
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        manager.bulk_create(rows)
+        return
+
+    # Run inside the caller's transaction: our rows are the new ones past the current maximum,
+    # told apart by recipient, title and creation time (set per row, to the microsecond)
+    floor = manager.aggregate(top=Max("id"))["top"] or 0
+    manager.bulk_create(rows)
+    pending = defaultdict(list)
+    for notif in rows:
+        pending[(notif.recipient_id, notif.title, notif.created_at)].append(notif)
+    inserted = manager.filter(id__gt=floor, created_at__gte=min(n.created_at for n in rows)).order_by("id")
+    for pk, recipient_id, title, created_at in inserted.values_list("id", "recipient_id", "title", "created_at"):
+        matches = pending.get((recipient_id, title, created_at))
+        if matches:
+            matches.pop(0).pk = pk
+
+
+def flush_batch(batch):
+    """Write the queued rows in one INSERT, then fan out socket / push / email."""
+    rows = [notif for notif, _, _ in batch.notifications]
+    if rows:
+        with transaction.atomic(using=batch.using):
+            _bulk_insert(rows, batch.using)
+            # bulk_create sends no post_save, so capture the change records here
+            record_changes(Notification, rows, "create", using=batch.using)
+
+    ws_messages = []
+    for notif, group, push_message in batch.notifications:
+        if group:
+            ws_messages.append((group, {
+                "title": notif.title,
+                "message": notif.message,
+                "timestamp": notif.created_at.isoformat(),
+            }))
+
+        recipient = notif.recipient
+        if push_message and recipient is not None and recipient.push_subscription:
+            send_push_notification(recipient.push_subscription, push_message)
+
+    send_ws_notifications(ws_messages)
+
+    if batch.emails:
+        try:
+            get_connection().send_messages(batch.emails)
+        except Exception as e:
+            logger.error(f"Outbox email delivery failed: {str(e)}")
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.serializers import SparseModelSerializer
 from .models import Notification
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
@@ -1,3 +1,146 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authtoken.models import Token
+
+from core.models import ChangeRecord
+from core.testing import LOCMEM_CACHES, QueryBudgetMixin
+from users.models import CustomUser
+from .models import Notification
+from .outbox import queue_notification
+
+
+@override_settings(CDC_DEFER_PROJECTIONS=True)
+class OutboxChangeRecordTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            CustomUser.objects.create_user(email=f"n{i}@example.com", password=None, user_type="krisshak") for i in range(2)
+        ]
+
+    def flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in self.users:
+                queue_notification(user, "Same title", group=False)
+            queue_notification(self.users[0], "Other title", group=False)
+
+    def assertRecordsPointAtRows(self):
+        recorded = sorted(
+            ChangeRecord.objects.filter(model="notifications.notification").values_list("object_id", flat=True)
+        )
+        self.assertEqual(recorded, sorted(str(pk) for pk in Notification.objects.values_list("id", flat=True)))
+
+    def test_records_carry_the_inserted_ids(self):
+        self.flush()
+        self.assertRecordsPointAtRows()
+
+    def test_ids_are_recovered_where_bulk_insert_returns_none(self):
+        # As on MySQL
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", new_callable=mock.PropertyMock, return_value=False
+        ):
+            self.flush()
+        self.assertRecordsPointAtRows()
+
+
+@override_settings(CDC_DEFER_PROJECTIONS=True)
+class BulkReadChangeRecordTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="br@example.com", password=None, user_type="krisshak")
+        cls.other = CustomUser.objects.create_user(email="br2@example.com", password=None, user_type="krisshak")
+        cls.mine = [
+            Notification.objects.create(recipient=cls.user, notification_type="general", title=f"n{i}") for i in range(3)
+        ]
+        cls.theirs = Notification.objects.create(recipient=cls.other, notification_type="general", title="x")
+
+    def setUp(self):
+        ChangeRecord.objects.all().delete()
+        token, _ = Token.objects.get_or_create(user=self.user)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+    def test_bulk_read_records_each_updated_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/notifications/read/bulk/",
+                {"ids": [self.mine[0].pk, self.theirs.pk], "ranges": [[self.mine[1].pk, self.mine[2].pk]]},
+                content_type="application/json",
+            )
+        self.assertEqual(response.json(), {"updated": 3})
+
+        records = ChangeRecord.objects.filter(model="notifications.notification")
+        self.assertEqual(sorted(r.object_id for r in records), sorted(str(n.pk) for n in self.mine))
+        for record in records:
+            self.assertEqual(record.operation, "update")
+            self.assertIs(record.data["is_read"], True)
+
+    def test_nothing_is_recorded_when_no_row_changes(self):
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+        response = self.client.post(
+            "/api/notifications/read/bulk/", {"ids": [self.mine[0].pk]}, content_type="application/json"
+        )
+        self.assertEqual(response.json(), {"updated": 0})
+        self.assertFalse(ChangeRecord.objects.exists())
+
+
+class OutboxSavepointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="sp@example.com", password=None, user_type="krisshak")
+
+    def test_rolled_back_savepoint_drops_its_notifications(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_notification(self.user, "Kept", group=False)
+            try:
+                with transaction.atomic():
+                    queue_notification(self.user, "Rolled back", group=False)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                queue_notification(self.user, "Released", group=False)
+            queue_notification(self.user, "Kept too", group=False)
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list("title", flat=True)), ["Kept", "Kept too", "Released"]
+        )
+
+    def test_one_insert_per_savepoint(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i in range(3):
+                queue_notification(self.user, f"N{i}", group=False)
+        with CaptureQueriesContext(connection) as captured:
+            for callback in callbacks:
+                callback()
+
+        inserts = [q["sql"] for q in captured.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NotificationQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = CustomUser.objects.create_user(email="viewer@example.com", password=None, user_type="bhooswami")
+
+    def setUp(self):
+        self.senders = []
+        token = Token.objects.create(user=self.viewer)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+    def seed(self, count):
+        for i in range(len(self.senders), count):
+            sender = CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak")
+            Notification.objects.create(recipient=self.viewer, sender=sender, notification_type="appointment", title=f"Hi {i}")
+            self.senders.append(sender)
+
+    def test_notification_list(self):
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("notification-list")), self.seed, 2,
+            check=lambda response: self.assertEqual(response.status_code, 200),
+        )
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import NotificationListView, MarkNotificationReadView, save_subscription
+from .views import NotificationListView, MarkNotificationReadView, BulkMarkNotificationsReadView, save_subscription, get_unread_count
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
     path('read/<int:pk>/', MarkNotificationReadView.as_view(), name='notification-mark-read'),
+    path('read/bulk/', BulkMarkNotificationsReadView.as_view(), name='notification-bulk-read'),
+    path('unread-count/', get_unread_count, name='notification-unread-count'),
     path("save-subscription/", save_subscription),
 ]
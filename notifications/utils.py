@@ -1,14 +1,21 @@
 import os
-from pywebpush import webpush, WebPushException
+from core.lazy import lazy_import
+
+pywebpush = lazy_import("pywebpush")
 
 def send_push_notification(subscription_info, message):
     try:
-        webpush(
+        pywebpush.webpush(
             subscription_info=subscription_info,
             data=message,
             vapid_private_key=os.getenv("VAPID_PRIVATE_KEY"),
             vapid_public_key=os.getenv("VAPID_PUBLIC_KEY"),
             vapid_claims={"sub": os.getenv("VAPID_SUBJECT")}
         )
-    except WebPushException as ex:
+    except pywebpush.WebPushException as ex:
         print(f"Push failed: {ex}")
+
+
+def warm_push():
+    """Import pywebpush ahead of the first push notification."""
+    pywebpush.webpush
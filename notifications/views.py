@@ -1,18 +1,48 @@
-from rest_framework import generics, permissions, status
+from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import Notification
 from .serializers import NotificationSerializer
-from django.http import JsonResponse
+from core.json import FastJsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.async_views import AsyncAPIView, async_api_view
+from core.cdc import update_tracked
+from core.pagination import KeysetPagination
 
-class NotificationListView(generics.ListAPIView):
-    serializer_class = NotificationSerializer
-    permission_classes = [permissions.IsAuthenticated]
+MAX_READ_RANGES = 50
+
+class NotificationListView(AsyncAPIView):
+    """Inbox, newest first. ?limit=/?cursor= page it, ?since= returns only newer rows."""
+    pagination_class = KeysetPagination
+
+    def get_queryset(self, request):
+        queryset = Notification.objects.filter(recipient=request.user).order_by('-created_at', '-id')
+
+        since = request.GET.get('since')
+        if since:
+            since_dt = parse_datetime(since)
+            if since_dt is None:
+                raise ValidationError({"since": "Use an ISO 8601 timestamp."})
+            queryset = queryset.filter(created_at__gt=since_dt)
 
-    def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return queryset
+
+    async def get(self, request):
+        queryset = self.get_queryset(request)
+        paginator = self.pagination_class()
+
+        page = await paginator.apaginate_queryset(queryset, request)
+        if page is not None:
+            data = NotificationSerializer(page, many=True).data
+            return FastJsonResponse(paginator.get_paginated_data(data))
+
+        rows = [notif async for notif in queryset]
+        return FastJsonResponse(NotificationSerializer(rows, many=True).data, safe=False)
 
 
 class MarkNotificationReadView(APIView):
@@ -27,26 +57,66 @@ class MarkNotificationReadView(APIView):
         except Notification.DoesNotExist:
             return Response({"error": "Notification not found."}, status=status.HTTP_404_NOT_FOUND)
 
-def get_unread_count(request):
+class BulkMarkNotificationsReadView(APIView):
+    """Mark many notifications read in one UPDATE.
+
+    Body: {"ids": [4, 9], "ranges": [[10, 25], [40, 41]]} (ranges are inclusive).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        ids = request.data.get("ids") or []
+        ranges = request.data.get("ranges") or []
+
+        if not isinstance(ids, list) or not isinstance(ranges, list) or len(ranges) > MAX_READ_RANGES:
+            return Response({"error": f"Send 'ids' as a list and at most {MAX_READ_RANGES} 'ranges'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        condition = Q()
+        try:
+            if ids:
+                condition |= Q(id__in=[int(i) for i in ids])
+            for start, end in ranges:
+                condition |= Q(id__range=(int(start), int(end)))
+        except (TypeError, ValueError):
+            return Response({"error": "ids and ranges must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not condition:
+            return Response({"error": "Nothing to mark."}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = update_tracked(
+            Notification.objects.filter(condition, recipient=request.user, is_read=False),
+            is_read=True, updated_at=timezone.now(),
+        )
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+@async_api_view(authentication=("jwt", "token", "session"), permission=None)
+async def get_unread_count(request):
     """Fetch count of unread notifications for each category."""
     user = request.user
     if not user.is_authenticated:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
+    # One grouped COUNT instead of a query per category
     categories = ["notice", "requests", "calender", "contact"]
-    unread_counts = {category: Notification.objects.filter(recipient=user, notification_type=category, is_read=False).count() for category in categories}
+    unread_counts = await Notification.objects.filter(recipient=user, is_read=False).aaggregate(
+        **{category: Count("id", filter=Q(notification_type=category)) for category in categories}
+    )
 
-    return JsonResponse({"unread_counts": unread_counts}, safe=False)
+    return FastJsonResponse({"unread_counts": unread_counts}, safe=False)
 
 def mark_as_read(request, category):
     """Mark all notifications in a category as read."""
     user = request.user
     if not user.is_authenticated:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
-    Notification.objects.filter(recipient=user, notification_type=category).update(is_read=True)
+    # .update() skips auto_now; delta sync needs the change time
+    update_tracked(
+        Notification.objects.filter(recipient=user, notification_type=category),
+        is_read=True, updated_at=timezone.now(),
+    )
 
-    return JsonResponse({"message": f"Marked {category} notifications as read."}, status=200)
+    return FastJsonResponse({"message": f"Marked {category} notifications as read."}, status=200)
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -1,8 +1,9 @@
 from django.contrib import admin
+from core.db.routers import ReplicaReadsAdminMixin
 from .models import Payment
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'sender', 'recipient', 'amount', 'type', 'status', 'created_at')
     list_filter = ('status', 'type', 'created_at')
     search_fields = ('sender__email', 'recipient__email', 'purpose', 'external_payment_id')
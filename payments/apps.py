@@ -7,4 +7,7 @@ class PaymentsConfig(AppConfig):
 
     def ready(self):
         import payments.signals
+        from core.cdc import track_model
+        from payments.models import Payment
+        track_model(Payment, fields=("sender_id", "recipient_id", "status", "type", "amount"))
 
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.serializers import SparseModelSerializer
 from .models import Payment
 
-class PaymentCreateSerializer(serializers.ModelSerializer):
+class PaymentCreateSerializer(SparseModelSerializer):
     is_custom_amount = serializers.BooleanField(default=False)
 
     class Meta:
@@ -9,7 +10,7 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
         fields = ['recipient', 'amount', 'purpose', 'type', 'is_custom_amount']
 
 
-class PaymentListSerializer(serializers.ModelSerializer):
+class PaymentListSerializer(SparseModelSerializer):
     sender_name = serializers.CharField(source='sender.email', read_only=True)
     recipient_name = serializers.CharField(source='recipient.email', read_only=True)
 
@@ -1,12 +1,38 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from .models import Payment
-from notifications.models import Notification
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from django.core.mail import send_mail
+from appointments.history import refresh_pairs
+from core.cdc import deferred
+from notifications.outbox import queue_notification, queue_email
 
-channel_layer = get_channel_layer()
+def total_snapshot(payment):
+    return tuple(payment.__dict__.get(field) for field in ('recipient_id', 'sender_id', 'status', 'amount'))
+
+@receiver(post_init, sender=Payment)
+def remember_total_fields(sender, instance, **kwargs):
+    instance._total_snapshot = total_snapshot(instance)
+
+@receiver(post_save, sender=Payment)
+def refresh_pair_total_paid(sender, instance, created, using=None, **kwargs):
+    previous = getattr(instance, "_total_snapshot", None)
+    current = total_snapshot(instance)
+    instance._total_snapshot = current
+    if deferred() or (not created and previous == current):
+        return
+
+    # Only completed payments count towards a pair's total_paid, so a payment
+    # leaving completed (e.g. refunded to failed) has to lower it again
+    pairs = set()
+    for snapshot in (previous, current):
+        if snapshot and snapshot[2] == 'completed':
+            pairs.add(snapshot[:2])
+    if pairs:
+        refresh_pairs(pairs, using=using)
+
+@receiver(post_delete, sender=Payment)
+def refresh_pair_total_paid_on_delete(sender, instance, using=None, **kwargs):
+    if instance.status == 'completed' and not deferred():
+        refresh_pairs({(instance.recipient_id, instance.sender_id)}, using=using)
 
 @receiver(post_save, sender=Payment)
 def notify_payment(sender, instance, created, **kwargs):
@@ -17,35 +43,22 @@ def notify_payment(sender, instance, created, **kwargs):
     if created or not instance.external_payment_id:
         return
 
-    # Send notification to both sender and recipient
+    # Send notification to both sender and recipient (delivered after commit)
     for user in [instance.sender, instance.recipient]:
         title = "💸 Payment Received" if user == instance.recipient else "✅ Payment Sent"
         message = f"{instance.amount} INR for: {instance.purpose or 'payment'}"
-        notif = Notification.objects.create(
+        queue_notification(
             recipient=user,
             notification_type='payment',
             title=title,
             message=message
         )
 
-        async_to_sync(channel_layer.group_send)(
-            f"user_{user.id}",
-            {
-                "type": "send.notification",
-                "data": {
-                    "title": notif.title,
-                    "message": notif.message,
-                    "timestamp": notif.created_at.isoformat()
-                }
-            }
-        )
-
         # ✉️ Email both users
         if user.email:
-            send_mail(
+            queue_email(
                 subject=title,
                 message=f"Hi {user.email},\n\n{message}\n\nThank you for using our platform.",
                 from_email='payments@ekrisshak2.0emails.and.help@gmail.com',
                 recipient_list=[user.email],
-                fail_silently=True,
             )
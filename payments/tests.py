@@ -1,3 +1,33 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from appointments.models import PairHistory
+from users.models import CustomUser
+from .models import Payment
+
+
+class PairTotalPaidTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.krisshak = CustomUser.objects.create_user(email="k@example.com", password=None, user_type="krisshak")
+        cls.bhooswami = CustomUser.objects.create_user(email="b@example.com", password=None, user_type="bhooswami")
+
+    def pay(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Payment.objects.create(
+                sender=self.bhooswami, recipient=self.krisshak, amount=amount, is_custom_amount=True, status="completed",
+            )
+
+    def total_paid(self):
+        return PairHistory.objects.get(krisshak=self.krisshak, bhooswami=self.bhooswami).total_paid
+
+    def test_payment_leaving_completed_lowers_the_total(self):
+        self.pay(100)
+        payment = Payment.objects.get(pk=self.pay(50).pk)
+        self.assertEqual(self.total_paid(), Decimal("150"))
+
+        payment.status = "failed"
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.save()
+        self.assertEqual(self.total_paid(), Decimal("100"))
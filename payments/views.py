@@ -7,9 +7,12 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
 from django.db.models import Q
-import razorpay
+from core.lazy import lazy_import
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
+from notifications.outbox import queue_email
+
+razorpay = lazy_import("razorpay")
 
 User = get_user_model()
 
@@ -157,12 +160,13 @@ def razorpay_webhook(request):
 
            # ✅ Ensure Razorpay confirms payout before updating DB and Marking payment as completed
             if payout_response_krisshak["status"] == "processed":
-                payment.status = "completed"
-                payment.transaction_id = razorpay_payment_id
-                payment.save()
+                with transaction.atomic():
+                    payment.status = "completed"
+                    payment.transaction_id = razorpay_payment_id
+                    payment.save()
 
-                # Send invoice
-                send_invoice(payment)
+                    # Send invoice
+                    send_invoice(payment)
 
                 return Response({"status": "success", "payouts": {
                     "krisshak": payout_response_krisshak["id"],
@@ -187,14 +191,14 @@ Hello {payment.sender.email},
 Your payment of ₹{payment.amount} to {payment.recipient.email} was successful.
 
 Transaction ID: {payment.transaction_id}
-Date: {payment.timestamp}
+Date: {payment.created_at}
 
 Thank you!
 """
 
-    send_mail(
+    queue_email(
         subject,
         message,
-        "payments@ekrisshak2.0emails.and.help@gmail.com",
-        [payment.sender.email, payment.recipient.email]
+        [payment.sender.email, payment.recipient.email],
+        from_email="payments@ekrisshak2.0emails.and.help@gmail.com",
     )
@@ -1,3 +1,19 @@
 from django.contrib import admin
+from .models import SearchProfile
 
 # Register your models here.
+
+class SearchProfileAdmin(admin.ModelAdmin):
+    list_display = ('email', 'profile_type', 'state_name', 'district_name', 'availability', 'ratings', 'updated_at')
+    list_filter = ('profile_type', 'availability')
+    search_fields = ('email', 'name', 'crop_tags')
+    ordering = ('-updated_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        # Rows are written by search.signals; repair with check_search_profiles --fix
+        return False
+
+admin.site.register(SearchProfile, SearchProfileAdmin)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search'
+
+    def ready(self):
+        import search.signals
+        from core.warmup import register_warmup
+        from search.ml_recommendation import warm_recommender
+        register_warmup("search.recommender", warm_recommender)
+
+        from core.cdc import register_projection
+        from search.projection import apply_profile_changes
+        register_projection("search_profiles", ["users.krisshakprofile", "users.bhooswamiprofile"], apply_profile_changes)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from search.models import SearchProfile
+from search.projection import PROFILE_MODELS, build_search_profile, differs, sync_search_profiles
+
+class Command(BaseCommand):
+    help = 'Compare the search projection with the profile tables and optionally repair it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite missing / stale rows and delete orphans')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Profiles compared per query')
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        chunk_size = options['chunk_size']
+        missing = stale = orphaned = 0
+
+        for profile_type, model in PROFILE_MODELS.items():
+            base_qs = model.objects.select_related('user', 'state', 'district').order_by('pk')
+            last_pk = None
+
+            # Keyset over the profile pk so each chunk is one indexed range scan
+            while True:
+                qs = base_qs if last_pk is None else base_qs.filter(pk__gt=last_pk)
+                chunk = list(qs[:chunk_size])
+                if not chunk:
+                    break
+                last_pk = chunk[-1].pk
+
+                stored = SearchProfile.objects.in_bulk([p.user_id for p in chunk])
+                broken = []
+                for profile in chunk:
+                    row = stored.get(profile.user_id)
+                    if row is None:
+                        missing += 1
+                        broken.append(profile)
+                        continue
+                    fields = differs(row, build_search_profile(profile))
+                    if fields:
+                        stale += 1
+                        broken.append(profile)
+                        self.stdout.write(f"Stale {profile_type} {profile.user_id}: {', '.join(fields)}")
+
+                if fix and broken:
+                    with transaction.atomic():
+                        sync_search_profiles(broken)
+
+            orphans = SearchProfile.objects.filter(profile_type=profile_type).exclude(
+                user_id__in=model.objects.values('user_id')
+            )
+            orphaned += orphans.count()
+            if fix:
+                orphans.delete()
+
+        summary = f"{missing} missing, {stale} stale, {orphaned} orphaned search profiles"
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f"✅ Repaired {summary}"))
+        elif missing or stale or orphaned:
+            self.stdout.write(self.style.WARNING(f"⚠️ Found {summary} (run with --fix to repair)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Search projection is consistent"))
@@ -0,0 +1,88 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:10
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _tags(text):
+    tags = (tag.strip().lower() for tag in re.split(r'[,;/|\n]+', text or ''))
+    return ','.join(dict.fromkeys(tag for tag in tags if tag))
+
+
+def backfill_search_profiles(apps, schema_editor):
+    SearchProfile = apps.get_model('search', 'SearchProfile')
+    rows = []
+
+    for profile_type in ('krisshak', 'bhooswami'):
+        model = apps.get_model('users', 'KrisshakProfile' if profile_type == 'krisshak' else 'BhooswamiProfile')
+        for profile in model.objects.select_related('user', 'state', 'district').iterator():
+            user = profile.user
+            row = SearchProfile(
+                user_id=user.id, profile_type=profile_type, profile_id=profile.id,
+                name=user.name, email=user.email, age=user.age, gender=user.gender,
+                profile_picture=user.profile_picture.name or '',
+                state_id=profile.state_id, state_name=profile.state.name if profile.state else None,
+                district_id=profile.district_id, district_name=profile.district.name if profile.district else None,
+                ratings=profile.ratings,
+            )
+            if profile_type == 'krisshak':
+                row.specialization = profile.specialization or ''
+                row.experience = profile.experience or ''
+                row.price = profile.price
+                row.availability = profile.availability
+                row.crop_tags = _tags(profile.specialization)
+            else:
+                row.requirements = profile.requirements or ''
+                row.land_area = profile.land_area
+                row.land_location = profile.land_location
+                row.crop_tags = _tags(profile.requirements)
+            rows.append(row)
+
+    SearchProfile.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0006_customuser_push_subscription_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('profile_type', models.CharField(choices=[('krisshak', 'Krisshak'), ('bhooswami', 'Bhooswami')], max_length=10)),
+                ('profile_id', models.PositiveBigIntegerField()),
+                ('name', models.CharField(blank=True, max_length=100, null=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('age', models.IntegerField(blank=True, null=True)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('profile_picture', models.CharField(blank=True, max_length=255)),
+                ('state_id', models.BigIntegerField(blank=True, null=True)),
+                ('state_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('district_id', models.BigIntegerField(blank=True, null=True)),
+                ('district_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('crop_tags', models.TextField(blank=True)),
+                ('specialization', models.CharField(blank=True, max_length=255)),
+                ('experience', models.CharField(blank=True, max_length=255)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('availability', models.BooleanField(default=True)),
+                ('requirements', models.TextField(blank=True)),
+                ('land_area', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('land_location', models.CharField(blank=True, max_length=255, null=True)),
+                ('ratings', models.DecimalField(decimal_places=1, default=0, max_digits=2)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Profile',
+                'indexes': [models.Index(fields=['profile_type', 'district_id', '-availability', '-ratings'], name='search_district_idx'), models.Index(fields=['profile_type', 'state_id'], name='search_state_idx'), models.Index(fields=['profile_type', 'profile_id'], name='search_profile_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_profiles, migrations.RunPython.noop),
+    ]
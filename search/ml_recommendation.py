@@ -1,31 +1,36 @@
-import pandas as pd
-from sklearn.neighbors import KNeighborsClassifier
-from appointments.models import Appointment
+from core.lazy import lazy_import
+from core.db.routers import use_replica
+from appointments.models import PairHistory
 from users.models import KrisshakProfile, BhooswamiProfile
 import sys 
 
+pd = lazy_import("pandas")
+neighbors = lazy_import("sklearn.neighbors")
+
 def get_krisshak_recommendations(bhooswami):
     """Suggests Krisshaks based on past appointments, expertise, and district."""
     
-    # Fetch previous appointments for Bhooswami
-    previous_krisshaks = Appointment.objects.filter(
-        bhooswami=bhooswami.user, status="confirmed"
-    ).values_list("krisshak_id", flat=True)
-
-    # Get all Krisshaks from the same district
-    district_krisshaks = KrisshakProfile.objects.filter(district=bhooswami.district)
-
-    # Create DataFrame for ML processing
-    data = [
-        {
-            "krisshak_id": krisshak.id,
-            "ratings": krisshak.ratings,
-            "specialization": krisshak.specialization,
-            "previously_appointed": 1 if krisshak.id in previous_krisshaks else 0,
-            "matches_required_crops": 1 if bhooswami.requirements and bhooswami.requirements in (krisshak.specialization or "") else 0,
-        }
-        for krisshak in district_krisshaks
-    ]
+    # Training data is a read-only scan: a replica can serve it
+    with use_replica():
+        # Fetch previous appointments for Bhooswami
+        previous_krisshaks = set(PairHistory.objects.filter(
+            bhooswami=bhooswami.user, confirmed_count__gt=0
+        ).values_list("krisshak_id", flat=True))
+
+        # Get all Krisshaks from the same district
+        district_krisshaks = KrisshakProfile.objects.filter(district=bhooswami.district)
+
+        # Create DataFrame for ML processing
+        data = [
+            {
+                "krisshak_id": krisshak.id,
+                "ratings": krisshak.ratings,
+                "specialization": krisshak.specialization,
+                "previously_appointed": 1 if krisshak.user_id in previous_krisshaks else 0,
+                "matches_required_crops": 1 if bhooswami.requirements and bhooswami.requirements in (krisshak.specialization or "") else 0,
+            }
+            for krisshak in district_krisshaks
+        ]
 
     df = pd.DataFrame(data)
 
@@ -33,7 +38,7 @@ def get_krisshak_recommendations(bhooswami):
         return KrisshakProfile.objects.filter(id__in=df["krisshak_id"]).order_by("-ratings")
 
     # Train K-Nearest Neighbors model
-    model = KNeighborsClassifier(n_neighbors=min(3, df.shape[0]))
+    model = neighbors.KNeighborsClassifier(n_neighbors=min(3, df.shape[0]))
     X = df[["ratings", "previously_appointed", "matches_required_crops"]]
     X = X.fillna(0)
     y = df["krisshak_id"]
@@ -51,29 +56,31 @@ def get_krisshak_recommendations(bhooswami):
 def get_bhooswami_recommendations(krisshak):
     """Suggests Bhooswamis based on previous appointments, expertise, and specialization."""
     
-    previous_bhooswamis = Appointment.objects.filter(
-        krisshak=krisshak.user, status="confirmed"
-    ).values_list("bhooswami_id", flat=True)
-
-    district_bhooswamis = BhooswamiProfile.objects.filter(district=krisshak.district)
-
-    data = [
-        {
-            "bhooswami_id": bhooswami.id,
-            "ratings": bhooswami.ratings,
-            "requirements": bhooswami.requirements,
-            "previously_appointed": 1 if bhooswami.id in previous_bhooswamis else 0,
-            "matches_specialization": 1 if krisshak.specialization in (bhooswami.requirements or "") else 0,
-        }
-        for bhooswami in district_bhooswamis
-    ]
+    # Training data is a read-only scan: a replica can serve it
+    with use_replica():
+        previous_bhooswamis = set(PairHistory.objects.filter(
+            krisshak=krisshak.user, confirmed_count__gt=0
+        ).values_list("bhooswami_id", flat=True))
+
+        district_bhooswamis = BhooswamiProfile.objects.filter(district=krisshak.district)
+
+        data = [
+            {
+                "bhooswami_id": bhooswami.id,
+                "ratings": bhooswami.ratings,
+                "requirements": bhooswami.requirements,
+                "previously_appointed": 1 if bhooswami.user_id in previous_bhooswamis else 0,
+                "matches_specialization": 1 if krisshak.specialization in (bhooswami.requirements or "") else 0,
+            }
+            for bhooswami in district_bhooswamis
+        ]
 
     df = pd.DataFrame(data)
 
     if df.shape[0] < 3:
         return BhooswamiProfile.objects.filter(id__in=df["bhooswami_id"]).order_by("-ratings")
 
-    model = KNeighborsClassifier(n_neighbors=min(3, df.shape[0]))
+    model = neighbors.KNeighborsClassifier(n_neighbors=min(3, df.shape[0]))
     X = df[["ratings", "previously_appointed", "matches_specialization"]]
     y = df["bhooswami_id"]
     model.fit(X, y)
@@ -86,3 +93,12 @@ def get_bhooswami_recommendations(krisshak):
     except Exception as e:
         print("🔴 Recommendation prediction failed:", e, file=sys.stderr, flush=True)
         return BhooswamiProfile.objects.filter(id__in=df["bhooswami_id"]).order_by("-ratings")
+
+
+def warm_recommender():
+    """Import pandas / scikit-learn and run one tiny fit so the first search doesn't pay for it."""
+    df = pd.DataFrame([{"ratings": 0, "previously_appointed": 0, "matches": 0, "id": i} for i in range(3)])
+    X = df[["ratings", "previously_appointed", "matches"]]
+    model = neighbors.KNeighborsClassifier(n_neighbors=1)
+    model.fit(X, df["id"])
+    model.predict(X.iloc[:1])
@@ -1,3 +1,101 @@
+from django.conf import settings
 from django.db import models
+from users.models import CustomUser, enrich_with_appointment_metadata
 
 # Create your models here.
+
+class SearchProfile(models.Model):
+    """Flat copy of a Krisshak / Bhooswami profile for search and listings, kept by search.signals."""
+    PROFILE_TYPE_CHOICES = [
+        ('krisshak', 'Krisshak'),
+        ('bhooswami', 'Bhooswami'),
+    ]
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='search_profile')
+    profile_type = models.CharField(max_length=10, choices=PROFILE_TYPE_CHOICES)
+    profile_id = models.PositiveBigIntegerField()
+
+    # From the user
+    name = models.CharField(max_length=100, null=True, blank=True)
+    email = models.EmailField()
+    age = models.IntegerField(null=True, blank=True)
+    gender = models.CharField(max_length=10, null=True, blank=True)
+    profile_picture = models.CharField(max_length=255, blank=True)
+
+    # Location, ids kept for filtering and names for rendering
+    state_id = models.BigIntegerField(null=True, blank=True)
+    state_name = models.CharField(max_length=100, null=True, blank=True)
+    district_id = models.BigIntegerField(null=True, blank=True)
+    district_name = models.CharField(max_length=100, null=True, blank=True)
+
+    # Normalized crops: krisshak specialization or bhooswami requirements
+    crop_tags = models.TextField(blank=True)
+
+    # Krisshak columns
+    specialization = models.CharField(max_length=255, blank=True)
+    experience = models.CharField(max_length=255, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    availability = models.BooleanField(default=True)
+
+    # Bhooswami columns
+    requirements = models.TextField(blank=True)
+    land_area = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    land_location = models.CharField(max_length=255, null=True, blank=True)
+
+    ratings = models.DecimalField(max_digits=2, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Search Profile"
+        indexes = [
+            models.Index(fields=['profile_type', 'district_id', '-availability', '-ratings'], name='search_district_idx'),
+            models.Index(fields=['profile_type', 'state_id'], name='search_state_idx'),
+            models.Index(fields=['profile_type', 'profile_id'], name='search_profile_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_type}: {self.email}"
+
+    def get_profile_picture(self, request=None):
+        if self.profile_picture:
+            url = CustomUser._meta.get_field('profile_picture').storage.url(self.profile_picture)
+        elif self.gender == 'female':
+            url = '/media/default_female.png'
+        else:
+            url = '/media/default_user.png'
+
+        return request.build_absolute_uri(url) if request else url
+
+    def to_dict(self, request=None, metadata=None):
+        """Same payload as KrisshakProfile.to_dict / BhooswamiProfile.to_dict, from this row alone."""
+        base = {
+            "user_id": self.user_id,
+            "name": self.name,
+            "username": self.email,
+            "age": self.age,
+            "gender": self.gender,
+            "profile_picture": self.get_profile_picture(request),
+            "ratings": float(self.ratings),
+            "state": self.state_name,
+            "district": self.district_name,
+        }
+        if self.profile_type == 'krisshak':
+            base.update({
+                "availability": self.availability,
+                "specialization": self.specialization,
+                "price": str(self.price),
+                "experience": self.experience,
+            })
+        else:
+            base.update({
+                "land_area": str(self.land_area),
+                "land_location": self.land_location,
+                "requirements": self.requirements,
+            })
+
+        if metadata is not None:
+            base.update(metadata)
+        elif request and hasattr(request, "user") and request.user.is_authenticated:
+            base.update(enrich_with_appointment_metadata(request.user, self.user_id))
+
+        return base
@@ -0,0 +1,121 @@
+"""Builds SearchProfile rows from KrisshakProfile / BhooswamiProfile and their user."""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from users.models import BhooswamiProfile, KrisshakProfile
+from .models import SearchProfile
+
+# Columns a rendered search card needs; pass to .only() on SearchProfile querysets
+CARD_FIELDS = (
+    'user_id', 'profile_type', 'name', 'email', 'age', 'gender', 'profile_picture',
+    'state_name', 'district_name', 'specialization', 'experience', 'price', 'availability',
+    'requirements', 'land_area', 'land_location', 'ratings',
+)
+
+# Everything the builder writes (all columns except the key and updated_at)
+PROJECTED_FIELDS = [
+    f.name for f in SearchProfile._meta.concrete_fields
+    if f.name not in ('user', 'updated_at')
+]
+
+# User fields copied into the projection
+USER_FIELD_NAMES = {'name', 'email', 'age', 'gender', 'profile_picture'}
+
+PROFILE_MODELS = {
+    'krisshak': KrisshakProfile,
+    'bhooswami': BhooswamiProfile,
+}
+
+_TAG_SPLIT = re.compile(r'[,;/|\n]+')
+
+
+def crop_tags(text):
+    """'Wheat, rice / Barley' -> 'wheat,rice,barley'."""
+    tags = (tag.strip().lower() for tag in _TAG_SPLIT.split(text or ''))
+    return ','.join(dict.fromkeys(tag for tag in tags if tag))
+
+
+def build_search_profile(profile):
+    """Unsaved SearchProfile for a profile (user, state and district should be select_related)."""
+    user = profile.user
+    row = SearchProfile(
+        user_id=user.id,
+        profile_id=profile.id,
+        name=user.name,
+        email=user.email,
+        age=user.age,
+        gender=user.gender,
+        profile_picture=user.profile_picture.name or '',
+        state_id=profile.state_id,
+        state_name=profile.state.name if profile.state else None,
+        district_id=profile.district_id,
+        district_name=profile.district.name if profile.district else None,
+        ratings=profile.ratings,
+    )
+
+    if isinstance(profile, KrisshakProfile):
+        row.profile_type = 'krisshak'
+        row.specialization = profile.specialization or ''
+        row.experience = profile.experience or ''
+        row.price = profile.price
+        row.availability = profile.availability
+        row.crop_tags = crop_tags(profile.specialization)
+    else:
+        row.profile_type = 'bhooswami'
+        row.requirements = profile.requirements or ''
+        row.land_area = profile.land_area
+        row.land_location = profile.land_location
+        row.availability = True
+        row.crop_tags = crop_tags(profile.requirements)
+
+    return row
+
+
+def sync_search_profiles(profiles, using=DEFAULT_DB_ALIAS):
+    """Insert or refresh the projection rows of many profiles in one statement."""
+    rows = [build_search_profile(profile) for profile in profiles]
+    if not rows:
+        return 0
+
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    unique_fields = None
+    if connections[using].features.supports_update_conflicts_with_target:
+        unique_fields = ['user']
+
+    SearchProfile.objects.using(using).bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=PROJECTED_FIELDS + ['updated_at'],
+    )
+    return len(rows)
+
+
+def sync_user_profiles(user_ids, using=DEFAULT_DB_ALIAS):
+    """Refresh the projection of whichever profile each of these users has."""
+    user_ids = list(user_ids)
+    synced = 0
+    for model in PROFILE_MODELS.values():
+        profiles = model.objects.using(using).filter(user_id__in=user_ids).select_related('user', 'state', 'district')
+        synced += sync_search_profiles(profiles, using=using)
+    return synced
+
+
+def differs(row, expected):
+    """Names of projected fields where a stored row disagrees with a fresh build."""
+    return [name for name in PROJECTED_FIELDS if getattr(row, name) != getattr(expected, name)]
+
+
+def apply_profile_changes(records):
+    """core.cdc projection: refresh the rows of every user whose profile changed."""
+    user_ids = {record.data.get("user_id") for record in records} - {None}
+    sync_user_profiles(user_ids)
+
+    # Deleted profiles: drop rows whose user no longer has either profile
+    deleted = {record.data.get("user_id") for record in records if record.operation == "delete"} - {None}
+    if deleted:
+        remaining = set()
+        for model in PROFILE_MODELS.values():
+            remaining.update(model.objects.filter(user_id__in=deleted).values_list("user_id", flat=True))
+        SearchProfile.objects.filter(user_id__in=deleted - remaining).delete()
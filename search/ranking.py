@@ -0,0 +1,149 @@
+"""Candidate generation and ranking for smart suggestions.
+
+Each registered generator returns the candidate profile ids for one section.
+The union of all candidates is fetched in a single query, scored with one
+weighted sum over a feature matrix, and the best ``top_k`` are kept with a
+heap. Everything reads the flat SearchProfile table, so ids are user ids and
+callers serialize every profile once and let sections refer to them.
+"""
+import heapq
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+
+from search.models import SearchProfile
+from search.projection import CARD_FIELDS
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Max ids a single generator contributes, and the size of the final list
+CANDIDATE_LIMIT = 200
+TOP_K = 50
+
+# Weights for the non-section features
+AVAILABILITY_WEIGHT = 1.0
+RATINGS_WEIGHT = 0.5
+
+
+@dataclass
+class SuggestionContext:
+    user: object
+    seasonal_crops: list = field(default_factory=list)
+    ai_crops: list = field(default_factory=list)
+    required_crops: str = ""
+
+
+@dataclass
+class CandidateGenerator:
+    section: str
+    weight: float
+    func: object
+
+
+@dataclass
+class Ranking:
+    profiles: dict  # user id -> SearchProfile
+    sections: dict  # section name -> [user id], best first
+    final: list     # top-k user ids, best first
+
+
+_generators = []
+
+
+def register_generator(section, weight):
+    """Register ``func(context) -> [user ids]`` as the source of one section."""
+    def decorator(func):
+        _generators.append(CandidateGenerator(section, weight, func))
+        return func
+    return decorator
+
+
+def _crop_filter(crops):
+    condition = Q()
+    for crop in crops:
+        if crop:
+            condition |= Q(crop_tags__icontains=crop)
+    return condition
+
+
+def _krisshaks():
+    return SearchProfile.objects.filter(profile_type="krisshak")
+
+
+def _candidate_ids(queryset):
+    return list(
+        queryset.order_by("-availability", "-ratings").values_list("user_id", flat=True)[:CANDIDATE_LIMIT]
+    )
+
+
+@register_generator("previous_appointments", weight=3.0)
+def previous_appointment_candidates(context):
+    # Krisshaks this user has confirmed work with, via the pair history table
+    return list(
+        _krisshaks().filter(user__krisshak_pairs__bhooswami=context.user, user__krisshak_pairs__confirmed_count__gt=0)
+        .order_by("-user__krisshak_pairs__confirmed_count")
+        .values_list("user_id", flat=True)[:CANDIDATE_LIMIT]
+    )
+
+
+@register_generator("seasonal_suggestions", weight=1.0)
+def seasonal_candidates(context):
+    crops = context.seasonal_crops[:2]
+    if not crops:
+        return []
+    return _candidate_ids(_krisshaks().filter(_crop_filter(crops)))
+
+
+@register_generator("ai_suggestions", weight=1.5)
+def ai_candidates(context):
+    if not context.ai_crops:
+        return []
+    return _candidate_ids(_krisshaks().filter(_crop_filter(context.ai_crops[:2])))
+
+
+@register_generator("required_crops_suggestions", weight=2.0)
+def required_crop_candidates(context):
+    if not context.required_crops:
+        return []
+    return _candidate_ids(_krisshaks().filter(_crop_filter([context.required_crops])))
+
+
+def rank_krisshaks(context, top_k=TOP_K):
+    """Gather candidates from every generator and rank their union."""
+    generators = list(_generators)
+    sections = {g.section: g.func(context) for g in generators}
+
+    candidate_ids = set()
+    for ids in sections.values():
+        candidate_ids.update(ids)
+
+    # One single-table query for the whole union
+    profiles = {
+        p.user_id: p
+        for p in SearchProfile.objects.filter(user_id__in=candidate_ids).only(*CARD_FIELDS)
+    }
+    ids = list(profiles)
+    if not ids:
+        return Ranking(profiles={}, sections={name: [] for name in sections}, final=[])
+
+    position = {pid: i for i, pid in enumerate(ids)}
+
+    # Feature matrix: one column per section membership, then availability and ratings
+    features = np.zeros((len(ids), len(generators) + 2))
+    for col, generator in enumerate(generators):
+        rows = [position[pid] for pid in sections[generator.section] if pid in position]
+        features[rows, col] = 1.0
+    features[:, -2] = np.fromiter((profiles[pid].availability for pid in ids), dtype=float, count=len(ids))
+    features[:, -1] = np.fromiter((float(profiles[pid].ratings or 0) for pid in ids), dtype=float, count=len(ids)) / 5.0
+
+    weights = np.array([g.weight for g in generators] + [AVAILABILITY_WEIGHT, RATINGS_WEIGHT])
+    scores = features @ weights
+
+    final = [ids[i] for i in heapq.nlargest(top_k, range(len(ids)), key=scores.__getitem__)]
+    ranked_sections = {
+        name: sorted((pid for pid in section_ids if pid in position), key=lambda pid: -scores[position[pid]])
+        for name, section_ids in sections.items()
+    }
+
+    return Ranking(profiles=profiles, sections=ranked_sections, final=final)
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import BhooswamiProfile, CustomUser, District, KrisshakProfile, State
+from core.cdc import deferred
+from .models import SearchProfile
+from .projection import USER_FIELD_NAMES, sync_search_profiles
+import logging
+
+logger = logging.getLogger(__name__)
+
+@receiver(post_save, sender=KrisshakProfile)
+@receiver(post_save, sender=BhooswamiProfile)
+def sync_search_profile(sender, instance, using=None, **kwargs):
+    if deferred():
+        return  # consume_changes applies it
+    try:
+        sync_search_profiles([instance], using=using)
+    except Exception as e:
+        logger.error(f"Search profile sync failed for user {instance.user_id}: {str(e)}")
+
+@receiver(post_delete, sender=KrisshakProfile)
+@receiver(post_delete, sender=BhooswamiProfile)
+def delete_search_profile(sender, instance, using=None, **kwargs):
+    if deferred():
+        return
+    SearchProfile.objects.using(using).filter(user_id=instance.user_id).delete()
+
+@receiver(post_save, sender=CustomUser)
+def sync_search_profile_user_fields(sender, instance, created, update_fields=None, using=None, **kwargs):
+    # Login (last_login), OTP and token saves don't touch the projection
+    if created or (update_fields is not None and not USER_FIELD_NAMES & set(update_fields)):
+        return
+
+    SearchProfile.objects.using(using).filter(user_id=instance.id).update(
+        name=instance.name,
+        email=instance.email,
+        age=instance.age,
+        gender=instance.gender,
+        profile_picture=instance.profile_picture.name or '',
+    )
+
+@receiver(post_save, sender=State)
+def sync_search_profile_state_name(sender, instance, created, using=None, **kwargs):
+    if not created:
+        SearchProfile.objects.using(using).filter(state_id=instance.id).update(state_name=instance.name)
+
+@receiver(post_save, sender=District)
+def sync_search_profile_district_name(sender, instance, created, using=None, **kwargs):
+    if not created:
+        SearchProfile.objects.using(using).filter(district_id=instance.id).update(district_name=instance.name)
+
+@receiver(post_delete, sender=State)
+def clear_search_profile_state(sender, instance, using=None, **kwargs):
+    SearchProfile.objects.using(using).filter(state_id=instance.id).update(state_id=None, state_name=None)
+
+@receiver(post_delete, sender=District)
+def clear_search_profile_district(sender, instance, using=None, **kwargs):
+    SearchProfile.objects.using(using).filter(district_id=instance.id).update(district_id=None, district_name=None)
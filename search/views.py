@@ -1,15 +1,20 @@
-from django.http import JsonResponse
-from django.db.models import Case, When, Value, IntegerField, OuterRef, Exists
+from core.json import FastJsonResponse
 from django.db.models import Q
-from users.models import KrisshakProfile, BhooswamiProfile, CustomUser, StateAdminProfile, DistrictAdminProfile
-from users.serializers import KrisshakProfileSerializer, BhooswamiProfileSerializer
-from appointments.models import Appointment
+from users.models import KrisshakProfile, BhooswamiProfile, CustomUser, StateAdminProfile, DistrictAdminProfile, bulk_appointment_metadata
+from users.serializers import KrisshakProfileSerializer, BhooswamiProfileSerializer, viewer_relations
+from appointments.history import annotate_pair_history
 from .utils import get_current_season, get_favorable_crops, get_ai_crop_recommendations
 from search.ml_recommendation import get_krisshak_recommendations, get_bhooswami_recommendations
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from search.ranking import SuggestionContext, rank_krisshaks
+from search.models import SearchProfile
+from search.projection import CARD_FIELDS
+from core.serializers import project_queryset
+from core.db.routers import replica_reads
+from core.async_views import async_api_view
+from core.throttling import throttle
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
-from django.contrib.auth import get_user_model
 from itertools import chain
 
 # 🔍 Seasonal Crop Suggestions
@@ -18,9 +23,10 @@ def seasonal_crop_suggestions(request):
     season = get_current_season()
     seasonal_crops = get_favorable_crops(season)
     
-    return JsonResponse({"season": season, "seasonal_crops": seasonal_crops}, safe=False)
+    return FastJsonResponse({"season": season, "seasonal_crops": seasonal_crops}, safe=False)
 
 # 🔍 AI-Based Crop Suggestions
+@throttle("search")
 def ai_crop_suggestions(request):
     """Returns AI-powered crop suggestions based on soil nutrients."""
     soil_ph = request.GET.get("soil_ph")
@@ -32,11 +38,13 @@ def ai_crop_suggestions(request):
     if soil_ph and nitrogen and phosphorus and potassium:
         ai_crops = get_ai_crop_recommendations(float(soil_ph), float(nitrogen), float(phosphorus), float(potassium))
 
-    return JsonResponse({"ai_crops": ai_crops}, safe=False)
+    return FastJsonResponse({"ai_crops": ai_crops}, safe=False)
 
 # 🔍 Smart Suggestions (ML + Seasonal + AI-Based)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle("search")
+@replica_reads
 def get_smart_suggestions(request):
     """Suggests Krisshaks & Bhooswamis based on previous appointments, seasonal crops, and AI recommendations."""
     user = request.user
@@ -48,40 +56,11 @@ def get_smart_suggestions(request):
     phosphorus = request.GET.get("phosphorus")
     potassium = request.GET.get("potassium")
 
-    confirmed_qs = Appointment.objects.filter(
-        status="confirmed",
-        krisshak=OuterRef("user")
-    )
-
-    previous_appointments = KrisshakProfile.objects.filter(
-        user__in=confirmed_qs.values_list("krisshak_id", flat=True)
-    ).annotate(
-        has_confirmed=Value(1, output_field=IntegerField())
-    )
-
-    # Annotated suggestions
-    suggestions_base = KrisshakProfile.objects.annotate(
-        has_confirmed=Case(
-            When(Exists(confirmed_qs), then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        )
-    )
-    # Suggest Krisshaks specializing in seasonal crops
-    seasonal_suggestions = suggestions_base.filter(
-        Q(specialization__icontains=seasonal_crops[0]) |
-        Q(specialization__icontains=seasonal_crops[1])
-    ).order_by("has_confirmed", "-availability", "-ratings")
-
     # Suggest Krisshaks based on AI-suggested crops (if provided)
-    ai_suggestions = []
+    ai_crops = []
     if soil_ph and nitrogen and phosphorus and potassium:
         try:
             ai_crops = get_ai_crop_recommendations(float(soil_ph), float(nitrogen), float(phosphorus), float(potassium))
-            ai_suggestions = suggestions_base.filter(
-                Q(specialization__icontains=ai_crops[0]) |
-                Q(specialization__icontains=ai_crops[1])
-            ).order_by("has_confirmed", "-availability", "-ratings")
         except Exception as e:
             print("🔴 AI crop recommendation error:", e)
 
@@ -91,183 +70,132 @@ def get_smart_suggestions(request):
     except AttributeError:
         required_crops = ""
 
-    required_crops_suggestions = suggestions_base.filter(
-        Q(specialization__icontains=required_crops)
-    ).order_by("has_confirmed", "-availability", "-ratings")
+    ranking = rank_krisshaks(SuggestionContext(
+        user=user,
+        seasonal_crops=seasonal_crops,
+        ai_crops=ai_crops,
+        required_crops=required_crops,
+    ))
 
-    # Merge lists in priority order
-    final_suggestions = list(previous_appointments) + list(seasonal_suggestions) + list(ai_suggestions) + list(required_crops_suggestions)
+    # Every profile is serialized once; sections refer to it by user id
+    metadata = bulk_appointment_metadata(user, ranking.profiles)
 
-    return JsonResponse({
-        "previous_appointments": [k.to_dict(request) for k in previous_appointments] if previous_appointments else [],
-        "seasonal_suggestions": [k.to_dict(request) for k in seasonal_suggestions] if seasonal_suggestions else [],
-        "ai_suggestions": [k.to_dict(request) for k in ai_suggestions] if ai_suggestions else [],
-        "required_crops_suggestions": [k.to_dict(request) for k in required_crops_suggestions] if required_crops_suggestions else [],
-        "final_suggestions": [k.to_dict(request) for k in final_suggestions] if final_suggestions else [],
-    }, safe=False)
+    response = {
+        "profiles": {uid: k.to_dict(request, metadata=metadata[uid]) for uid, k in ranking.profiles.items()},
+        "final_suggestions": ranking.final,
+    }
+    response.update(ranking.sections)
 
-# ✅ Krisshak Search (with ML Recommendations)
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
-def search_krisshaks(request):
-    """Suggest Krisshaks for Bhooswamis based on previous hiring & crop requirements."""
+    return FastJsonResponse(response, safe=False)
 
-    if not request.user or not request.user.is_authenticated:
-        return JsonResponse({"error": "Authentication required"}, status=401)
+def _render_search(request, serializer_class, profile_model, sections, ml_profiles):
+    """Run the ML recommender and serialize every listed profile once.
 
-    user = request.user
+    pandas / scikit-learn and the serializers are sync (and query the DB), so
+    the async search views run this whole step in a single thread hop.
+    """
+    try:
+        sections["ml_suggestions"] = [p.user_id for p in ml_profiles()]
+    except Exception as e:
+        print("🔴 Error in ML recommendations:", e)
+        sections["ml_suggestions"] = []
 
-   
-    CustomUser = get_user_model()
-    if isinstance(user, str):
-        try:
-            user = CustomUser.objects.get(email=user)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({"error": "Invalid user reference."}, status=400)
+    sections["final_suggestions"] = list(dict.fromkeys(chain(*sections.values())))
 
-    try:
-        print("🧠 user =", user, "| type:", type(user))
-        bhooswami_profile = BhooswamiProfile.objects.get(user=user)
-    except BhooswamiProfile.DoesNotExist:
-        return JsonResponse({"error": "Bhooswami profile not found"}, status=404)
+    # Search results are cards unless the client asks for another view
+    context = {"request": request, "view": request.GET.get("view") or "card"}
 
-    required_crops = bhooswami_profile.requirements or ""
+    def safe_to_dict(profile):
+        try:
+            return serializer_class(profile, context=dict(context)).data
+        except Exception as e:
+            print(f"⚠️ Error serializing {profile_model.__name__} {profile.user_id}: {e}")
+            return {}
 
-    # Fetch previously hired Krisshaks
-    confirmed_qs = Appointment.objects.filter(
-        status="confirmed",
-        krisshak=OuterRef("user")
+    # Each profile is serialized on its own (one bad row mustn't sink the rest); share the viewer lookups
+    context["viewer_relations"] = viewer_relations(request.user, serializer_class.profile_kind, sections["final_suggestions"])
+    profiles = project_queryset(
+        profile_model.objects.filter(user_id__in=sections["final_suggestions"]),
+        serializer_class, dict(context),
     )
+    rendered = {p.user_id: safe_to_dict(p) for p in profiles}
 
-    suggestions_base = KrisshakProfile.objects.annotate(
-        has_confirmed=Case(
-            When(Exists(confirmed_qs), then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        )
-    )
+    return {name: [rendered[i] for i in ids if i in rendered] for name, ids in sections.items()}
 
-    previous_krisshaks = suggestions_base.filter(
-        user__in=confirmed_qs.values_list("krisshak__id", flat=True),
-        district=bhooswami_profile.district
-    )
 
-    matching_krisshaks = suggestions_base.filter(
-        Q(specialization__icontains=required_crops)
-    ).order_by("has_confirmed", "-availability", "-ratings")
+# ✅ Krisshak Search (with ML Recommendations)
+@async_api_view(authentication=("token",))
+@throttle("search")
+@replica_reads
+async def search_krisshaks(request):
+    """Suggest Krisshaks for Bhooswamis based on previous hiring & crop requirements."""
+    user = request.user
 
     try:
-        ml_suggestions = get_krisshak_recommendations(bhooswami_profile)
-    except Exception as e:
-        print("🔴 Error in ML recommendations:", e)
-        ml_suggestions = []
+        bhooswami_profile = await BhooswamiProfile.objects.select_related("user", "district").aget(user=user)
+    except BhooswamiProfile.DoesNotExist:
+        return FastJsonResponse({"error": "Bhooswami profile not found"}, status=404)
 
+    required_crops = bhooswami_profile.requirements or ""
 
-    seen = set()
-    final_suggestions = []
-    for k in chain(previous_krisshaks, matching_krisshaks, ml_suggestions):
-        if k.user.id not in seen:
-            seen.add(k.user.id)
-            final_suggestions.append(k)
+    # Fetch previously hired Krisshaks (joined through the pair history table).
+    # Candidates come from the flat search table; profiles are loaded once for rendering.
+    candidates = annotate_pair_history(SearchProfile.objects.filter(profile_type="krisshak"), "krisshak", user)
 
-    def safe_to_dict(k, request):
-        try:
-            return KrisshakProfileSerializer(k, context={"request": request}).data
-        except Exception as e:
-            print(f"⚠️ Error serializing Krisshak {getattr(k, 'user', None)}:", e)
-            return {}
+    previous_ids = [uid async for uid in candidates.filter(
+        pair__confirmed_count__gt=0,
+        district_id=bhooswami_profile.district_id
+    ).order_by("-pair_confirmed_count").values_list("user_id", flat=True)]
 
-    return JsonResponse({
-        "previous_krisshaks": [safe_to_dict(k, request) for k in previous_krisshaks],
-        "matching_krisshaks": [safe_to_dict(k, request) for k in matching_krisshaks],
-        "ml_suggestions": [safe_to_dict(k, request) for k in ml_suggestions],
-        "final_suggestions": [safe_to_dict(k, request) for k in final_suggestions],
-    }, safe=False)
+    matching_ids = [uid async for uid in candidates.filter(
+        Q(specialization__icontains=required_crops)
+    ).order_by("has_confirmed", "-availability", "-ratings").values_list("user_id", flat=True)]
+
+    response = await sync_to_async(_render_search)(
+        request, KrisshakProfileSerializer, KrisshakProfile,
+        {"previous_krisshaks": previous_ids, "matching_krisshaks": matching_ids},
+        lambda: get_krisshak_recommendations(bhooswami_profile),
+    )
+    return FastJsonResponse(response, safe=False)
 
 
 # ✅ Bhooswami Search (with ML Recommendations)
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
-def search_bhooswamis(request):
+@async_api_view(authentication=("token",))
+@throttle("search")
+@replica_reads
+async def search_bhooswamis(request):
     """Suggest Bhooswamis for Krisshaks based on previous hiring & specialization."""
-
-    if not request.user or not request.user.is_authenticated:
-        return JsonResponse({"error": "Authentication required"}, status=401)
-
     user = request.user
 
-    # Align with your krisshak view: fallback if user is a string
-    CustomUser = get_user_model()
-    if isinstance(user, str):
-        try:
-            user = CustomUser.objects.get(email=user)
-        except CustomUser.DoesNotExist:
-            return JsonResponse({"error": "Invalid user reference."}, status=400)
-
     # Ensure krisshak profile exists
     try:
-        krisshak_profile = KrisshakProfile.objects.get(user=user)
+        krisshak_profile = await KrisshakProfile.objects.select_related("user", "district").aget(user=user)
     except Exception as e:
         print("🔴 Error fetching krisshak_profile:", e)
-        return JsonResponse({"error": "Krisshak profile not found"}, status=404)
+        return FastJsonResponse({"error": "Krisshak profile not found"}, status=404)
 
     specialization = krisshak_profile.specialization or request.GET.get("specialization") or ""
 
-    # Fetch Bhooswamis who previously appointed this Krisshak
-    confirmed_qs = Appointment.objects.filter(
-        status="confirmed",
-        bhooswami=OuterRef("user")
-    )
+    # Fetch Bhooswamis who previously appointed this Krisshak (pair history join).
+    # Candidates come from the flat search table; profiles are loaded once for rendering.
+    candidates = annotate_pair_history(SearchProfile.objects.filter(profile_type="bhooswami"), "bhooswami", user)
 
-    suggestions_base = BhooswamiProfile.objects.annotate(
-        has_confirmed=Case(
-            When(Exists(confirmed_qs), then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        )
-    )
+    previous_ids = [uid async for uid in candidates.filter(
+        pair__confirmed_count__gt=0,
+        district_id=krisshak_profile.district_id
+    ).order_by("-pair_confirmed_count").values_list("user_id", flat=True)]
 
-    previous_bhooswamis = suggestions_base.filter(
-        user__in=confirmed_qs.values_list("bhooswami_id", flat=True),
-        district=krisshak_profile.district
-    )
-
-    matching_bhooswamis = suggestions_base.filter(
+    matching_ids = [uid async for uid in candidates.filter(
         Q(requirements__icontains=specialization),
-        district=krisshak_profile.district
-    ).order_by("has_confirmed", "-ratings")
-
-    try:
-        ml_suggestions = get_bhooswami_recommendations(krisshak_profile)
-    except Exception as e:
-        print("🔴 Error in ML recommendations:", e)
-        ml_suggestions = []
-
-
-    seen = set()
-    final_suggestions = []
-    for b in chain(previous_bhooswamis, matching_bhooswamis, ml_suggestions):
-        if b.user.id not in seen:
-            seen.add(b.user.id)
-            final_suggestions.append(b)
+        district_id=krisshak_profile.district_id
+    ).order_by("has_confirmed", "-ratings").values_list("user_id", flat=True)]
 
-    print("✅ search_bhooswamis executed successfully")
-
-    def safe_to_dict(b, request):
-        try:
-            return BhooswamiProfileSerializer(b, context={"request": request}).data
-        except Exception as e:
-            print(f"⚠️ Error serializing Bhooswami {b.user.id}: {e}")
-            return {}
-
-    return JsonResponse({
-        "previous_bhooswamis": [safe_to_dict(b, request) for b in previous_bhooswamis],
-        "matching_bhooswamis": [safe_to_dict(b, request) for b in matching_bhooswamis],
-        "ml_suggestions": [safe_to_dict(b, request) for b in ml_suggestions],
-        "final_suggestions": [safe_to_dict(b, request) for b in final_suggestions],
-    }, safe=False)
+    response = await sync_to_async(_render_search)(
+        request, BhooswamiProfileSerializer, BhooswamiProfile,
+        {"previous_bhooswamis": previous_ids, "matching_bhooswamis": matching_ids},
+        lambda: get_bhooswami_recommendations(krisshak_profile),
+    )
+    return FastJsonResponse(response, safe=False)
 
 
 
@@ -278,12 +206,14 @@ def model_has_field(model, field_name):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@throttle("search")
+@replica_reads
 def get_filtered_users(request):
     """Allows admins & users to filter Krisshaks/Bhooswamis based on district & other properties."""
 
     user = request.user
     if not user or not user.is_authenticated:
-        return JsonResponse({"error": "Authentication required"}, status=401)
+        return FastJsonResponse({"error": "Authentication required"}, status=401)
 
     # Text filters (partial match)
     specialization = request.GET.get("specialization")
@@ -305,56 +235,52 @@ def get_filtered_users(request):
     district_id = request.GET.get("district_id")
     user_type = request.GET.get("user_type")
 
-    # Base queryset
-    CustomUser = get_user_model()
+    # Base queryset: the flat search table, one row per Krisshak / Bhooswami
+    profiles = SearchProfile.objects.all()
 
     try:
         if user.user_type == "krisshak":
-            queryset = BhooswamiProfile.objects.filter(district=user.krisshakprofile.district)
+            queryset = profiles.filter(profile_type="bhooswami", district_id=user.krisshakprofile.district_id)
 
         elif user.user_type == "bhooswami":
-            queryset = KrisshakProfile.objects.filter(district=user.bhooswamiprofile.district)
+            queryset = profiles.filter(profile_type="krisshak", district_id=user.bhooswamiprofile.district_id)
 
         elif user.user_type == "district_admin":
-            queryset = CustomUser.objects.filter(district=user.districtadminprofile.district)
+            queryset = profiles.filter(district_id=user.districtadminprofile.district_id)
             if user_type:
-                queryset = queryset.filter(user_type=user_type)
+                queryset = queryset.filter(profile_type=user_type)
 
         elif user.user_type == "state_admin":
-            queryset = CustomUser.objects.filter(district__state=user.stateadminprofile.state)
+            queryset = profiles.filter(state_id=user.stateadminprofile.state_id)
             if user_type:
-                queryset = queryset.filter(user_type=user_type)
+                queryset = queryset.filter(profile_type=user_type)
 
         else:
-            return JsonResponse({"error": "Unauthorized"}, status=403)
+            return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
     except AttributeError:
-        return JsonResponse({"error": "User profile not found"}, status=404)
+        return FastJsonResponse({"error": "User profile not found"}, status=404)
     except DistrictAdminProfile.DoesNotExist:
-        return JsonResponse({"error": "District not found"}, status=404)
+        return FastJsonResponse({"error": "District not found"}, status=404)
     except StateAdminProfile.DoesNotExist:
-        return JsonResponse({"error": "State not found"}, status=404)
+        return FastJsonResponse({"error": "State not found"}, status=404)
+
+    # Type-specific filters only apply when a single profile type is listed
+    profile_type = {"krisshak": "bhooswami", "bhooswami": "krisshak"}.get(user.user_type, user_type)
+    model = {"krisshak": KrisshakProfile, "bhooswami": BhooswamiProfile}.get(profile_type)
 
-    model = queryset.model
-    
     def model_has_field(model, field_name):
-        return field_name in [f.name for f in model._meta.get_fields()]
-    
+        return model is not None and field_name in [f.name for f in model._meta.get_fields()]
+
     # Apply filters
 
     if district_id:
         queryset = queryset.filter(district_id=district_id)
 
     if age_min:
-        if model == CustomUser:
-            queryset = queryset.filter(age__gte=int(age_min))
-        else:
-            queryset = queryset.filter(user__age__gte=int(age_min))
+        queryset = queryset.filter(age__gte=int(age_min))
     if age_max:
-        if model == CustomUser:
-            queryset = queryset.filter(age__lte=int(age_max))
-        else:
-            queryset = queryset.filter(user__age__lte=int(age_max))
+        queryset = queryset.filter(age__lte=int(age_max))
 
     if specialization and model_has_field(model, "specialization"):
         queryset = queryset.filter(specialization__icontains=specialization)
@@ -384,29 +310,21 @@ def get_filtered_users(request):
         queryset = queryset.filter(availability=True)
 
      # ✅ Annotate with has_confirmed_appointment
-    if model in [KrisshakProfile, BhooswamiProfile]:
-        confirmed_qs = Appointment.objects.filter(
-            status="confirmed",
-            krisshak=OuterRef("user") if model == BhooswamiProfile else None,
-            bhooswami=OuterRef("user") if model == KrisshakProfile else None,
-        )
-        queryset = queryset.annotate(
-            has_confirmed_appointment=Case(
-                When(Exists(confirmed_qs), then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField()
-            )
-        )
+    ordering_fields = []
+    if user.user_type in ["krisshak", "bhooswami"]:
+        queryset = annotate_pair_history(queryset, profile_type, user, name="has_confirmed_appointment")
+        ordering_fields.append("has_confirmed_appointment")
 
     # ✅ Order by appointment freshness, availability, ratings
-    ordering_fields = ["has_confirmed_appointment"]
-    if model_has_field(model, "availability"):
+    if model is None or model_has_field(model, "availability"):
         ordering_fields.append("-availability")
-    if model_has_field(model, "ratings"):
-        ordering_fields.append("-ratings")
+    ordering_fields.append("-ratings")
 
-    queryset = queryset.order_by(*ordering_fields)
+    queryset = queryset.order_by(*ordering_fields).only(*CARD_FIELDS)
 
-    return JsonResponse({
-        "filtered_users": [user.to_dict(request) for user in queryset]
-    }, safe=False)
\ No newline at end of file
+    results = list(queryset)
+    metadata = bulk_appointment_metadata(user, [p.user_id for p in results])
+
+    return FastJsonResponse({
+        "filtered_users": [p.to_dict(request, metadata=metadata[p.user_id]) for p in results]
+    }, safe=False)
@@ -1,13 +1,14 @@
 from django.contrib import admin
+from core.db.routers import ReplicaReadsAdminMixin
 from appointments.models import Appointment
 from contact.models import ContactMessage
 from collections import Counter
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Prefetch
 from django.utils.html import format_html, format_html_join
 from .models import CustomUser, KrisshakProfile, BhooswamiProfile, StateAdminProfile, DistrictAdminProfile, State, District, Rating, Favorite
 
 
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('name','user_type', 'email','unique_id', 'appointment_summary')
     
     inlines = []
@@ -23,12 +24,11 @@ class CustomUserAdmin(admin.ModelAdmin):
         return inline_instances
     
     def appointment_summary(self, obj):
+        # ✅ Confirmed appointments only, prefetched for the whole page in get_queryset
         if obj.user_type == 'bhooswami':
-            related_appointments = Appointment.objects.filter(bhooswami=obj, status='confirmed')  # ✅ Filter only confirmed appointments
-            counter = Counter(a.krisshak.email for a in related_appointments)
+            counter = Counter(a.krisshak.email for a in obj.confirmed_bhooswami_appointments)
         elif obj.user_type == 'krisshak':
-            related_appointments = Appointment.objects.filter(krisshak=obj, status='confirmed')  # ✅ Filter only confirmed appointments
-            counter = Counter(a.bhooswami.email for a in related_appointments)
+            counter = Counter(a.bhooswami.email for a in obj.confirmed_krisshak_appointments)
         else:
             return "N/A"
 
@@ -53,7 +53,11 @@ class CustomUserAdmin(admin.ModelAdmin):
     readonly_fields=['unique_id','appointment_detail_view']
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related()
+        confirmed = Appointment.objects.filter(status='confirmed')
+        return super().get_queryset(request).select_related().prefetch_related(
+            Prefetch('krisshak_appointments', queryset=confirmed.select_related('bhooswami'), to_attr='confirmed_krisshak_appointments'),
+            Prefetch('bhooswami_appointments', queryset=confirmed.select_related('krisshak'), to_attr='confirmed_bhooswami_appointments'),
+        )
     
 class DistrictFilter(admin.SimpleListFilter):
     title = 'District'
@@ -115,7 +119,7 @@ class SentContactMessageInline(admin.TabularInline):
 
 
 @admin.register(KrisshakProfile)
-class KrisshakProfileAdmin(admin.ModelAdmin):
+class KrisshakProfileAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'get_name', 'state', 'district')
     list_filter = [StateFilter, DistrictFilter]
     search_fields = ['user__email', 'get_name']
@@ -149,7 +153,7 @@ class KrisshakProfileAdmin(admin.ModelAdmin):
     readonly_fields = ("ratings",)
 
 @admin.register(BhooswamiProfile)
-class BhooswamiProfileAdmin(admin.ModelAdmin):
+class BhooswamiProfileAdmin(ReplicaReadsAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'get_name', 'state', 'district')
     list_filter = [StateFilter, DistrictFilter]
     search_fields = ['user__email', 'get_name']
@@ -3,3 +3,20 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        import users.signals
+        from core.warmup import register_warmup
+        from users.reference import warm_reference_data
+        register_warmup("users.reference_data", warm_reference_data)
+
+        from core.cdc import track_model
+        from users.models import BhooswamiProfile, KrisshakProfile, Rating
+        track_model(KrisshakProfile, fields=("user_id", "state_id", "district_id"))
+        track_model(BhooswamiProfile, fields=("user_id", "state_id", "district_id"))
+        track_model(Rating, fields=("rater_id", "rated_user_id", "rating_value"))
+
+        from core.sync import register_sync
+        from users.models import Favorite
+        from users.serializers import FavoriteSerializer
+        register_sync("favorites", Favorite, owners=("user",), serializer=FavoriteSerializer)
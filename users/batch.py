@@ -0,0 +1,104 @@
+"""Multi-get for Krisshak / Bhooswami profiles (``krisshaks/batch/?ids=1,2,3``).
+
+Screens that list appointments, favorites or notifications need a profile
+per row; this resolves all of them at once. Each profile's viewer-independent
+data is cached per user id (and per sparse fieldset, see core/serializers.py)
+under its ``profile`` tag, so a request costs one cache round trip for the
+lot, one query for whatever missed, and two queries for the viewer's
+appointments / requests with those users, however many ids it names.
+"""
+import hashlib
+
+from rest_framework.exceptions import ValidationError
+
+from core.cache import tiered_cache
+from core.serializers import project_queryset, sparse_spec
+from .etags import profile_tag
+from .models import BhooswamiProfile, KrisshakProfile
+from .serializers import VIEWER_FIELDS, BhooswamiProfileSerializer, KrisshakProfileSerializer, viewer_relations
+
+MAX_IDS = 300
+PROFILE_CACHE_TIMEOUT = 60 * 10
+
+PROFILES = {
+    "krisshak": (KrisshakProfile, KrisshakProfileSerializer),
+    "bhooswami": (BhooswamiProfile, BhooswamiProfileSerializer),
+}
+
+
+def parse_ids(raw):
+    """Distinct user ids from ``"1,2,3"``, in order. Raises ValidationError."""
+    ids = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            user_id = int(part)
+        except ValueError:
+            raise ValidationError({"ids": f"'{part}' is not a valid user id."})
+        if user_id not in ids:
+            ids.append(user_id)
+    if not ids:
+        raise ValidationError({"ids": "Pass one or more comma-separated user ids."})
+    if len(ids) > MAX_IDS:
+        raise ValidationError({"ids": f"At most {MAX_IDS} ids per request."})
+    return ids
+
+
+def _cache_key(kind, user_id, variant):
+    return f"profiles:{kind}:{user_id}:{variant}"
+
+
+def _variant(request, context):
+    """Hash of everything besides the profile that shapes its serialized form."""
+    spec = sparse_spec(context)
+    raw = "|".join([
+        spec["view"], ",".join(spec["fields"]), ",".join(sorted(spec["expand"])),
+        # Image URLs are absolute
+        request.get_host(),
+    ])
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def load_profiles(kind, request, user_ids):
+    """``(results, missing)``: serialized profiles by user id, and the ids without a profile of ``kind``."""
+    model, serializer_class = PROFILES[kind]
+    context = {"request": request}
+    variant = _variant(request, context)
+    # Unbound: only used for its field set and the viewer lookups
+    serializer = serializer_class(context=context)
+    viewer_fields = [name for name in VIEWER_FIELDS if name in serializer.fields]
+    if viewer_fields:
+        context["viewer_relations"] = viewer_relations(request.user, kind, user_ids)
+
+    keys = {user_id: _cache_key(kind, user_id, variant) for user_id in user_ids}
+    cached = tiered_cache.get_many(keys.values())
+    key_ids = {key: user_id for user_id, key in keys.items()}
+    results = {key_ids[key]: dict(value) for key, value in cached.items()}
+
+    misses = [user_id for user_id in user_ids if user_id not in results]
+    if misses:
+        queryset = project_queryset(
+            model.objects.filter(user_id__in=misses), serializer_class, context, extra=["user"]
+        )
+        fresh, tags = {}, {}
+        for profile in queryset:
+            row = serializer_class(profile, context=context).data
+            results[profile.user_id] = row
+            key = keys[profile.user_id]
+            # Viewer fields depend on who is asking, so they are never cached
+            fresh[key] = {name: value for name, value in row.items() if name not in VIEWER_FIELDS}
+            tags[key] = [profile_tag(profile.user_id)]
+        if fresh:
+            tiered_cache.set_many(fresh, PROFILE_CACHE_TIMEOUT, tags=tags)
+
+    # Cached entries get the viewer's fields from the prefetched relations
+    if viewer_fields:
+        for key in cached:
+            user_id = key_ids[key]
+            viewer_data = serializer.viewer_data(user_id)
+            results[user_id].update({name: viewer_data[name] for name in viewer_fields})
+
+    ordered = {user_id: results[user_id] for user_id in user_ids if user_id in results}
+    return ordered, [user_id for user_id in user_ids if user_id not in results]
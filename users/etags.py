@@ -0,0 +1,45 @@
+"""Cache tags behind the ETags of the profile, listing and favorites endpoints (see core/conditional.py)."""
+from users.models import DistrictAdminProfile, StateAdminProfile
+
+LIST_TAGS = {"krisshak": "krisshaks", "bhooswami": "bhooswamis"}
+
+
+def profile_tag(user_id):
+    """A user's account and profile."""
+    return f"profile:{user_id}"
+
+
+def relations_tag(user_id):
+    """Appointments and appointment requests involving a user (viewer-specific profile fields)."""
+    return f"relations:{user_id}"
+
+
+def favorites_tag(user_id):
+    return f"favorites:{user_id}"
+
+
+def scope_tags(kind, state_id=None, district_id=None):
+    """Every list a profile of ``kind`` in this state / district appears in."""
+    base = LIST_TAGS[kind]
+    tags = [base]
+    if state_id:
+        tags.append(f"{base}:state:{state_id}")
+    if district_id:
+        tags.append(f"{base}:district:{district_id}")
+    return tags
+
+
+def list_tags(kind, user):
+    """Tags of the profile list ``user`` sees (mirrors the Filtered*ListView querysets)."""
+    base = LIST_TAGS[kind]
+    # The viewer's own profile decides their scope (and is the whole list for farmers)
+    tags = [relations_tag(user.pk), profile_tag(user.pk)]
+    if user.is_superuser:
+        return tags + [base]
+    if user.user_type == "state_admin":
+        state_id = StateAdminProfile.objects.filter(user=user).values_list("state_id", flat=True).first()
+        return tags + [f"{base}:state:{state_id}"]
+    if user.user_type == "district_admin":
+        district_id = DistrictAdminProfile.objects.filter(user=user).values_list("district_id", flat=True).first()
+        return tags + [f"{base}:district:{district_id}"]
+    return tags
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 17:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows have no change time yet; their creation time is the best we have
+    apps.get_model('users', 'Favorite').objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_customuser_push_subscription_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'updated_at'], name='favorite_sync_idx'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
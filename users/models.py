@@ -49,6 +49,39 @@ def enrich_with_appointment_metadata(current_user, other_user):
 
     return metadata
 
+def bulk_appointment_metadata(current_user, other_user_ids):
+    """enrich_with_appointment_metadata for many users at once, in two queries."""
+    other_user_ids = list(other_user_ids)
+    metadata = {user_id: {} for user_id in other_user_ids}
+    if not other_user_ids:
+        return metadata
+
+    requests = AppointmentRequest.objects.filter(
+        sender=current_user,
+        recipient_id__in=other_user_ids
+    ).order_by('-request_time').values('recipient_id', 'status', 'request_time')
+
+    for req in requests:
+        meta = metadata[req['recipient_id']]
+        if 'recent_request_status' not in meta:
+            meta['recent_request_status'] = req['status']
+            meta['recent_request_time'] = req['request_time']
+
+    appointments = Appointment.objects.filter(
+        Q(krisshak=current_user, bhooswami_id__in=other_user_ids) |
+        Q(krisshak_id__in=other_user_ids, bhooswami=current_user)
+    ).order_by('-created_at').values('krisshak_id', 'bhooswami_id', 'status', 'created_at', 'payment_status')
+
+    for appt in appointments:
+        other_id = appt['bhooswami_id'] if appt['krisshak_id'] == current_user.id else appt['krisshak_id']
+        meta = metadata.get(other_id)
+        if meta is not None and 'appointment_status' not in meta:
+            meta['appointment_status'] = appt['status']
+            meta['appointment_created_at'] = appt['created_at']
+            meta['appointment_payment_status'] = appt['payment_status']
+
+    return metadata
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -227,7 +260,7 @@ class KrisshakProfile(models.Model):
     class Meta:
         verbose_name = "Krisshak"
     
-    def to_dict(self, request=None):
+    def to_dict(self, request=None, metadata=None):
         base = {
             "user_id": self.user.id,
             "name": self.user.name,
@@ -244,7 +277,9 @@ class KrisshakProfile(models.Model):
             "district": self.district.name if self.district else None
         }
 
-        if request and hasattr(request, "user") and request.user.is_authenticated:
+        if metadata is not None:
+            base.update(metadata)
+        elif request and hasattr(request, "user") and request.user.is_authenticated:
             meta = enrich_with_appointment_metadata(request.user, self.user)
             base.update(meta)
 
@@ -280,7 +315,7 @@ class BhooswamiProfile(models.Model):
     class Meta:
         verbose_name = "Bhooswami"
 
-    def to_dict(self, request=None):
+    def to_dict(self, request=None, metadata=None):
         base = {
             "user_id": self.user.id,
             "name": self.user.name,
@@ -296,7 +331,9 @@ class BhooswamiProfile(models.Model):
             "district": self.district.name if self.district else None
         }
 
-        if request and hasattr(request, "user") and request.user.is_authenticated:
+        if metadata is not None:
+            base.update(metadata)
+        elif request and hasattr(request, "user") and request.user.is_authenticated:
             meta = enrich_with_appointment_metadata(request.user, self.user)
             base.update(meta)
 
@@ -321,6 +358,10 @@ class Favorite(models.Model):
     krisshak = models.ForeignKey(KrisshakProfile, on_delete=models.CASCADE, null=True, blank=True, related_name="favorited_by")
     bhooswami = models.ForeignKey(BhooswamiProfile, on_delete=models.CASCADE, null=True, blank=True, related_name="favorited_by")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("user", "krisshak", "bhooswami")  # Prevent duplicate favorites
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='favorite_sync_idx'),
+        ]
@@ -0,0 +1,59 @@
+"""States and districts, cached for the public pickers and preloaded at warm-up."""
+from core.utils import aget_or_set_cached_data, get_or_set_cached_data, invalidate_cache_tags
+from .models import District, State
+from .serializers import DistrictSerializer, StateSerializer
+
+STATES_CACHE_KEY = "reference:states"
+DISTRICTS_CACHE_KEY = "reference:districts:{state_id}"
+
+# Reference data only changes through the admin, which invalidates it
+REFERENCE_TIMEOUT = 60 * 60 * 24
+
+
+def _build_state_list():
+    return [dict(row) for row in StateSerializer(State.objects.order_by("name"), many=True).data]
+
+
+def _build_district_list(state_id):
+    return [
+        dict(row) for row in DistrictSerializer(District.objects.filter(state_id=state_id).order_by("name"), many=True).data
+    ]
+
+
+def get_state_list():
+    return get_or_set_cached_data(STATES_CACHE_KEY, _build_state_list, REFERENCE_TIMEOUT, tags=["reference:states"])
+
+
+def get_district_list(state_id):
+    return get_or_set_cached_data(
+        DISTRICTS_CACHE_KEY.format(state_id=state_id),
+        lambda: _build_district_list(state_id),
+        REFERENCE_TIMEOUT,
+        tags=[f"state:{state_id}"],
+    )
+
+
+async def aget_state_list():
+    return await aget_or_set_cached_data(STATES_CACHE_KEY, _build_state_list, REFERENCE_TIMEOUT, tags=["reference:states"])
+
+
+async def aget_district_list(state_id):
+    return await aget_or_set_cached_data(
+        DISTRICTS_CACHE_KEY.format(state_id=state_id),
+        lambda: _build_district_list(state_id),
+        REFERENCE_TIMEOUT,
+        tags=[f"state:{state_id}"],
+    )
+
+
+def invalidate_reference_data(state_id=None):
+    tags = ["reference:states"]
+    if state_id is not None:
+        tags.append(f"state:{state_id}")
+    invalidate_cache_tags(*tags)
+
+
+def warm_reference_data():
+    """Fill the state list and every state's district list."""
+    for state in get_state_list():
+        get_district_list(state["id"])
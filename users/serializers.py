@@ -3,32 +3,43 @@ from .models import CustomUser, KrisshakProfile, BhooswamiProfile, StateAdminPro
 from appointments.serializers import AppointmentSerializer
 from appointments.models import Appointment,AppointmentRequest
 from django.core.validators import validate_email
+from core.serializers import SparseModelSerializer
 from django.core.exceptions import ValidationError
 import re
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseModelSerializer):
     profile_picture = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
-        fields = "__all__" 
+        # Never "__all__": that ships the password hash, OTP and push subscription
+        fields = [
+            "id", "email", "user_type", "name", "age", "gender", "phone_number", "profile_picture",
+            "preferred_language", "unique_id", "is_email_verified",
+            "is_active", "is_staff", "is_superuser", "last_login",
+        ]
+        admin_fields = ["is_active", "is_staff", "is_superuser", "last_login"]
+        projections = {
+            "card": ["id", "user_type", "name", "email", "age", "gender", "profile_picture"],
+        }
+        field_sources = {"profile_picture": ["profile_picture", "gender"]}
 
     def get_profile_picture(self, obj): 
         request = self.context.get("request") 
         return obj.get_profile_picture(request=request)
         
-class StateSerializer(serializers.ModelSerializer):
+class StateSerializer(SparseModelSerializer):
     class Meta:
         model = State
         fields = ['id', 'name']
 
-class DistrictSerializer(serializers.ModelSerializer):
+class DistrictSerializer(SparseModelSerializer):
     class Meta:
         model = District
         fields = ['id', 'name']
 
         
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(SparseModelSerializer):
     profile_picture = serializers.ImageField(required=False)
 
     # Accept IDs on write
@@ -130,123 +141,168 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class KrisshakProfileSerializer(serializers.ModelSerializer):
+# Profile cards (search, listings) leave out payout details
+KRISSHAK_CARD_FIELDS = [
+    "id", "user", "availability", "specialization", "price", "experience", "ratings", "state", "district",
+    "appointment", "recent_request_status", "recent_request_time",
+]
+BHOOSWAMI_CARD_FIELDS = [
+    "id", "user", "land_area", "land_location", "requirements", "ratings", "state", "district",
+    "appointment", "recent_request_status", "recent_request_time",
+]
+# Depend on who is asking (ViewerRelationsMixin); they look up appointments by obj.user_id
+VIEWER_FIELDS = ("appointment", "recent_request_status", "recent_request_time")
+PROFILE_METHOD_SOURCES = {name: ["user"] for name in VIEWER_FIELDS}
+
+def viewer_relations(viewer, profile_kind, user_ids):
+    """The viewer's latest confirmed appointment and latest request with each of ``user_ids``, in two queries.
+
+    Pass the result as the ``viewer_relations`` context key of the profile
+    serializers so their appointment / request fields don't query per row.
+    """
+    user_ids = list(user_ids)
+    relations = {"appointments": dict.fromkeys(user_ids), "requests": dict.fromkeys(user_ids)}
+    if viewer is None or not viewer.is_authenticated or not user_ids:
+        return relations
+
+    profile_side, viewer_side = ViewerRelationsMixin.SIDES[profile_kind]
+    appointments = Appointment.objects.filter(
+        status="confirmed", **{f"{profile_side}_id__in": user_ids, viewer_side: viewer}
+    ).select_related("krisshak", "bhooswami").order_by("-created_at")
+    for appointment in appointments:
+        user_id = getattr(appointment, f"{profile_side}_id")
+        if relations["appointments"][user_id] is None:
+            relations["appointments"][user_id] = appointment
+
+    requests = AppointmentRequest.objects.filter(sender=viewer, recipient_id__in=user_ids).order_by("-request_time")
+    for req in requests:
+        if relations["requests"][req.recipient_id] is None:
+            relations["requests"][req.recipient_id] = req
+    return relations
+
+
+class ViewerRelationsListSerializer(serializers.ListSerializer):
+    """Looks up the viewer's appointments / requests for the whole list at once (see viewer_relations)."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        context = self.context
+        request = context.get("request")
+        if "viewer_relations" not in context and request is not None and any(
+            name in self.child.fields for name in VIEWER_FIELDS
+        ):
+            context["viewer_relations"] = viewer_relations(
+                request.user, self.child.profile_kind, [item.user_id for item in items]
+            )
+        return super().to_representation(items)
+
+
+class ViewerRelationsMixin:
+    """``appointment`` / ``recent_request_*``: the viewer's latest confirmed appointment and request with the profile's user."""
+    # Profile kind -> (the profile user's side, the viewer's side) of an Appointment
+    SIDES = {"krisshak": ("krisshak", "bhooswami"), "bhooswami": ("bhooswami", "krisshak")}
+    profile_kind = None
+
+    def _prefetched(self, name, user_id):
+        relations = self.context.get("viewer_relations")
+        if relations is not None and user_id in relations[name]:
+            return True, relations[name][user_id]
+        return False, None
+
+    def appointment_for(self, user_id):
+        found, appointment = self._prefetched("appointments", user_id)
+        if not found:
+            profile_side, viewer_side = self.SIDES[self.profile_kind]
+            appointment = Appointment.objects.filter(
+                status="confirmed", **{profile_side: user_id, viewer_side: self.context.get("request").user}
+            ).order_by("-created_at").first()
+        return AppointmentSerializer(appointment).data if appointment else None
+
+    def recent_request_for(self, user_id):
+        found, req = self._prefetched("requests", user_id)
+        if found:
+            return req
+        # Both recent_request_* fields ask; query once per profile (shared through the root's context)
+        requests = self.context.setdefault("_recent_requests", {})
+        if user_id not in requests:
+            try:
+                requests[user_id] = AppointmentRequest.objects.filter(
+                    sender=self.context.get("request").user,
+                    recipient=user_id
+                ).order_by("-request_time").first()
+            except Exception:
+                requests[user_id] = None
+        return requests[user_id]
+
+    def viewer_data(self, user_id):
+        """This mixin's fields for the profile of ``user_id``."""
+        req = self.recent_request_for(user_id)
+        return {
+            "appointment": self.appointment_for(user_id),
+            "recent_request_status": req.status if req else None,
+            "recent_request_time": req.request_time.isoformat() if req else None,
+        }
+
+    def get_appointment(self, obj):
+        return self.appointment_for(obj.user_id)
+
+    def get_recent_request_status(self, obj):
+        req = self.recent_request_for(obj.user_id)
+        return req.status if req else None
+
+    def get_recent_request_time(self, obj):
+        req = self.recent_request_for(obj.user_id)
+        return req.request_time.isoformat() if req else None
+
+
+class KrisshakProfileSerializer(ViewerRelationsMixin, SparseModelSerializer):
     user = UserSerializer(read_only=True)
     appointment = serializers.SerializerMethodField()
     recent_request_status = serializers.SerializerMethodField()
     recent_request_time = serializers.SerializerMethodField()
+    profile_kind = "krisshak"
 
     class Meta:
         model = KrisshakProfile
         fields = "__all__"
+        projections = {"card": KRISSHAK_CARD_FIELDS}
+        expandable = {"state": StateSerializer, "district": DistrictSerializer}
+        field_sources = PROFILE_METHOD_SOURCES
+        list_serializer_class = ViewerRelationsListSerializer
 
     def validate(self, attrs):
         if not attrs.get("account_number") and not attrs.get("upi_id"):
             raise serializers.ValidationError("Krisshaks must provide either a bank account number or UPI ID for payouts.")
         return attrs
 
-    def get_appointment(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            appointment = Appointment.objects.filter(
-                status="confirmed",
-                krisshak=obj.user,
-                bhooswami=logged_in_user
-            ).latest("created_at")
-            return AppointmentSerializer(appointment).data
-        except Appointment.DoesNotExist:
-            return None
-
-    def get_recent_request_status(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            req = AppointmentRequest.objects.filter(
-                sender=logged_in_user,
-                recipient=obj.user
-            ).order_by("-request_time").first()
-            return req.status if req else None
-        except Exception:
-            return None
-
-    def get_recent_request_time(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            req = AppointmentRequest.objects.filter(
-                sender=logged_in_user,
-                recipient=obj.user
-            ).order_by("-request_time").first()
-            return req.request_time.isoformat() if req else None
-        except Exception:
-            return None
-
-class BhooswamiProfileSerializer(serializers.ModelSerializer):
+class BhooswamiProfileSerializer(ViewerRelationsMixin, SparseModelSerializer):
     user = UserSerializer(read_only=True)
     appointment = serializers.SerializerMethodField()
     recent_request_status = serializers.SerializerMethodField()
     recent_request_time = serializers.SerializerMethodField()
+    profile_kind = "bhooswami"
 
     class Meta:
         model = BhooswamiProfile
         fields = "__all__"
+        projections = {"card": BHOOSWAMI_CARD_FIELDS}
+        expandable = {"state": StateSerializer, "district": DistrictSerializer}
+        field_sources = PROFILE_METHOD_SOURCES
+        list_serializer_class = ViewerRelationsListSerializer
 
-    def get_appointment(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            appointment = Appointment.objects.filter(
-                status="confirmed",
-                bhooswami=obj.user,
-                krisshak=logged_in_user
-            ).latest("created_at")
-            return AppointmentSerializer(appointment).data
-        except Appointment.DoesNotExist:
-            return None
-
-    def get_recent_request_status(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            req = AppointmentRequest.objects.filter(
-                sender=logged_in_user,
-                recipient=obj.user
-            ).order_by("-request_time").first()
-            return req.status if req else None
-        except Exception:
-            return None
-
-    def get_recent_request_time(self, obj):
-        request = self.context.get("request")
-        logged_in_user = request.user
-
-        try:
-            req = AppointmentRequest.objects.filter(
-                sender=logged_in_user,
-                recipient=obj.user
-            ).order_by("-request_time").first()
-            return req.request_time.isoformat() if req else None
-        except Exception:
-            return None
-
-class StateAdminProfileSerializer(serializers.ModelSerializer):
+class StateAdminProfileSerializer(SparseModelSerializer):
     class Meta:
         model = StateAdminProfile
         exclude = ['user', 'state_code']  # state_code not editable
 
-class DistrictAdminProfileSerializer(serializers.ModelSerializer):
+class DistrictAdminProfileSerializer(SparseModelSerializer):
     class Meta:
         model = DistrictAdminProfile
         exclude = ['user', 'district_code']
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(SparseModelSerializer):
     class Meta:
         model = Favorite
-        fields = ["krisshak", "bhooswami", "created_at"]
+        fields = ["id", "krisshak", "bhooswami", "created_at", "updated_at"]
+        expandable = {"krisshak": KrisshakProfileSerializer, "bhooswami": BhooswamiProfileSerializer}
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from core.conditional import bump_tags
+from .etags import favorites_tag, profile_tag, scope_tags
+from .models import (
+    BhooswamiProfile, CustomUser, District, DistrictAdminProfile, Favorite,
+    KrisshakProfile, State, StateAdminProfile,
+)
+from .reference import invalidate_reference_data
+
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+def invalidate_state_list(sender, instance, **kwargs):
+    invalidate_reference_data(state_id=instance.id)
+
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+def invalidate_district_list(sender, instance, **kwargs):
+    invalidate_reference_data(state_id=instance.state_id)
+
+
+# ETag versions (users/etags.py): bumped after commit so a 304 never outlives a write
+
+def profile_scope(profile):
+    return (profile.__dict__.get("state_id"), profile.__dict__.get("district_id"))
+
+@receiver(post_init, sender=KrisshakProfile)
+@receiver(post_init, sender=BhooswamiProfile)
+def remember_profile_scope(sender, instance, **kwargs):
+    instance._loaded_scope = profile_scope(instance)
+
+@receiver(post_save, sender=KrisshakProfile)
+@receiver(post_save, sender=BhooswamiProfile)
+@receiver(post_delete, sender=KrisshakProfile)
+@receiver(post_delete, sender=BhooswamiProfile)
+def bump_profile_versions(sender, instance, **kwargs):
+    kind = "krisshak" if sender is KrisshakProfile else "bhooswami"
+    tags = {profile_tag(instance.user_id)}
+    # Both the scope it was loaded in and the one it's in now, in case it moved
+    for state_id, district_id in {getattr(instance, "_loaded_scope", (None, None)), profile_scope(instance)}:
+        tags.update(scope_tags(kind, state_id, district_id))
+    instance._loaded_scope = profile_scope(instance)
+    bump_tags(*tags)
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def bump_user_versions(sender, instance, **kwargs):
+    # Profiles embed the user, so every list showing this user's profile changes too
+    tags = {profile_tag(instance.pk)}
+    for kind, model in (("krisshak", KrisshakProfile), ("bhooswami", BhooswamiProfile)):
+        if instance.user_type != kind:
+            continue
+        for state_id, district_id in model.objects.filter(user_id=instance.pk).values_list("state_id", "district_id"):
+            tags.update(scope_tags(kind, state_id, district_id))
+    bump_tags(*tags)
+
+@receiver(post_save, sender=StateAdminProfile)
+@receiver(post_save, sender=DistrictAdminProfile)
+@receiver(post_delete, sender=StateAdminProfile)
+@receiver(post_delete, sender=DistrictAdminProfile)
+def bump_admin_versions(sender, instance, **kwargs):
+    # An admin's profile decides which lists and notices they see
+    bump_tags(profile_tag(instance.user_id))
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def bump_favorite_versions(sender, instance, **kwargs):
+    bump_tags(favorites_tag(instance.user_id))
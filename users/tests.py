@@ -1,3 +1,84 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from appointments.models import Appointment
+from core.testing import LOCMEM_CACHES, QueryBudgetMixin
+from .models import BhooswamiProfile, CustomUser, District, Favorite, KrisshakProfile, State
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets of the profile lists, favorites and the user admin, with N and 10N partners.
+
+    Each partner is a Krisshak the viewer has favorited and a confirmed
+    appointment with, plus a Bhooswami of their own. The budgets are what
+    each view costs today; raise one only with a reason.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(name="Budget State")
+        cls.district = District.objects.create(name="Budget District", state=cls.state)
+        # A superuser Bhooswami: sees every profile in the lists, and has partners of their own
+        cls.viewer = CustomUser.objects.create_superuser(email="viewer@example.com", password="pw", user_type="bhooswami")
+        BhooswamiProfile.objects.create(user=cls.viewer, requirements="wheat", state=cls.state, district=cls.district)
+
+    def setUp(self):
+        self.partners = []
+        token = Token.objects.create(user=self.viewer)
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+    def seed(self, count):
+        today = datetime.date.today()
+        for i in range(len(self.partners), count):
+            krisshak = CustomUser.objects.create_user(email=f"k{i}@example.com", password=None, user_type="krisshak", name=f"K{i}")
+            profile = KrisshakProfile.objects.create(
+                user=krisshak, specialization="wheat", price=100, state=self.state, district=self.district, upi_id=f"k{i}@upi"
+            )
+            bhooswami = CustomUser.objects.create_user(email=f"b{i}@example.com", password=None, user_type="bhooswami")
+            BhooswamiProfile.objects.create(user=bhooswami, requirements="wheat", state=self.state, district=self.district)
+
+            # For the admin's appointment summary
+            Appointment.objects.create(krisshak=krisshak, bhooswami=self.viewer, date=today, time=datetime.time(9), status="confirmed")
+            Appointment.objects.create(krisshak=krisshak, bhooswami=bhooswami, date=today, time=datetime.time(9), status="confirmed")
+            Favorite.objects.create(user=self.viewer, krisshak=profile)
+            self.partners.append(krisshak)
+
+    def assertViewBudget(self, path, budget, **params):
+        def check(response):
+            self.assertEqual(response.status_code, 200, getattr(response, "content", b"")[:500])
+
+        self.assertQueryBudget(lambda: self.client.get(path, params), self.seed, budget, check=check)
+
+    def test_krisshak_list(self):
+        self.assertViewBudget(reverse("krisshak-list"), 4)
+
+    def test_krisshak_list_cards(self):
+        self.assertViewBudget(reverse("krisshak-list"), 4, view="card")
+
+    def test_bhooswami_list(self):
+        self.assertViewBudget(reverse("bhooswami-list"), 4)
+
+    def test_profile_batch(self):
+        def call():
+            ids = ",".join(str(user.pk) for user in self.partners)
+            return self.client.get(reverse("krisshak-batch"), {"ids": ids})
+
+        self.assertQueryBudget(call, self.seed, 4, check=lambda response: self.assertEqual(response.status_code, 200))
+
+    def test_favorites(self):
+        self.assertViewBudget(reverse("get_favorites"), 2)
+
+    def test_favorites_expanded(self):
+        self.assertViewBudget(reverse("get_favorites"), 5, expand="krisshak")
+
+    def test_filtered_users(self):
+        self.assertViewBudget(reverse("get-filtered-users"), 5, profile_type="krisshak")
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_admin_user_changelist(self):
+        self.client.force_login(self.viewer)
+        self.assertViewBudget(reverse("admin:users_customuser_changelist"), 7)
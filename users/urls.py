@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RegisterView, VerifyOTPView, ForgotPasswordView, ResetPasswordView, FilteredKrisshakListView,KrisshakProfileUpdateView,KrisshakPublicDetailView,BhooswamiProfileUpdateView,FilteredBhooswamiListView,BhooswamiDetailView,RoleBasedLoginView, LogoutView , UpdateProfileView, rate_user, toggle_favorite, get_favorites, DistrictsByStateView, StateListView, rated_users_view
+from .views import RegisterView, VerifyOTPView, ForgotPasswordView, ResetPasswordView, FilteredKrisshakListView,KrisshakProfileUpdateView,KrisshakPublicDetailView,BhooswamiProfileUpdateView,FilteredBhooswamiListView,BhooswamiDetailView,RoleBasedLoginView, LogoutView , UpdateProfileView, rate_user, toggle_favorite, get_favorites, DistrictsByStateView, StateListView, rated_users_view, ProfileBatchView
 from rest_framework_simplejwt.views import TokenRefreshView ,TokenObtainPairView
 
 urlpatterns = [
@@ -31,11 +31,13 @@ urlpatterns = [
 
     # Krisshak Views
     path('krisshaks/', FilteredKrisshakListView.as_view(), name='krisshak-list'),
+    path("krisshaks/batch/", ProfileBatchView.as_view(kind="krisshak"), name="krisshak-batch"),
     path("krisshaks/<int:pk>/", KrisshakPublicDetailView.as_view(), name="krisshak-detail"),
     path("krisshak/profile/", KrisshakProfileUpdateView.as_view(), name="krisshak-profile-update"),
 
     # Bhooswami URLs
     path('bhooswamis/', FilteredBhooswamiListView.as_view(), name='bhooswami-list'),
+    path("bhooswamis/batch/", ProfileBatchView.as_view(kind="bhooswami"), name="bhooswami-batch"),
     path("bhooswamis/<int:pk>/", BhooswamiDetailView.as_view(), name="bhooswami-detail"),
     path("bhooswami/profile/", BhooswamiProfileUpdateView.as_view(), name="bhooswami-profile-update"),
 
@@ -6,39 +6,48 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status,generics,permissions,serializers
 from .models import CustomUser,KrisshakProfile,BhooswamiProfile,StateAdminProfile,DistrictAdminProfile,Rating, Favorite, District, State
-from .serializers import RegisterSerializer, KrisshakProfileSerializer,BhooswamiProfileSerializer, FavoriteSerializer, DistrictSerializer, StateSerializer
+from .serializers import RegisterSerializer, KrisshakProfileSerializer,BhooswamiProfileSerializer, FavoriteSerializer, DistrictSerializer, StateSerializer, viewer_relations
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required
 from rest_framework.authtoken.models import Token
+from django.utils.decorators import method_decorator
+from core.db.routers import replica_reads
+from core.conditional import conditional_view
+from core.serializers import project_queryset, sparse_spec
+from .etags import favorites_tag, list_tags, profile_tag, relations_tag
 from rest_framework.permissions import IsAuthenticated, AllowAny
 import json 
 from rest_framework.decorators import api_view, permission_classes
-from django.http import JsonResponse
+from core.json import FastJsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError as DRFValidationError
 import traceback
 from django.conf import settings
+from .reference import aget_state_list, aget_district_list
+from .batch import load_profiles, parse_ids
+from core.async_views import AsyncAPIView
+from core.throttling import throttle
 
-class StateListView(APIView):
-    permission_classes = [AllowAny]
+class StateListView(AsyncAPIView):
+    # Public reference data: no need to look the caller up
+    authentication = ()
+    permission = None
 
-    def get(self, request):
-        states = State.objects.all().order_by("name")
-        serializer = StateSerializer(states, many=True)
-        return Response(serializer.data)
+    async def get(self, request):
+        return FastJsonResponse(await aget_state_list(), safe=False)
 
-@permission_classes([AllowAny])
-class DistrictsByStateView(APIView):
-    def get(self, request):
+class DistrictsByStateView(AsyncAPIView):
+    authentication = ()
+    permission = None
+
+    async def get(self, request):
         state_id = request.GET.get("state_id")
         if not state_id:
-            return Response({"error": "state_id is required"}, status=400)
+            return FastJsonResponse({"error": "state_id is required"}, status=400)
 
-        districts = District.objects.filter(state_id=state_id).order_by('name')
-        serializer = DistrictSerializer(districts, many=True)
-        return Response(serializer.data)
+        return FastJsonResponse(await aget_district_list(state_id), safe=False)
     
     
 class UserRoleAccessPermission(permissions.BasePermission):
@@ -72,6 +81,7 @@ class UserRoleAccessPermission(permissions.BasePermission):
 
         return False
 
+@method_decorator(throttle("login"), name='post')
 class RoleBasedLoginView(APIView):
     permission_classes = [AllowAny]
     
@@ -106,10 +116,16 @@ class RoleBasedLoginView(APIView):
             "user_id": user.id
         })
 
+@method_decorator(replica_reads, name='get')
+@method_decorator(conditional_view(lambda request: list_tags("krisshak", request.user)), name='get')
 class FilteredKrisshakListView(generics.ListAPIView):
     serializer_class = KrisshakProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def filter_queryset(self, queryset):
+        # Fetch only the columns the requested fields / projection render
+        return project_queryset(super().filter_queryset(queryset), self.get_serializer_class(), self.get_serializer_context())
+
     def get_serializer_context(self):
         return {"request": self.request}
     
@@ -117,27 +133,33 @@ class FilteredKrisshakListView(generics.ListAPIView):
         user = self.request.user
 
         if user.is_superuser:
-            return KrisshakProfile.objects.all()
+            return KrisshakProfile.objects.select_related('user', 'state', 'district').all()
 
         if user.user_type == 'state_admin':
             try:
                 state = user.stateadminprofile.state
-                return KrisshakProfile.objects.filter(state=state).order_by('-availability')
+                return KrisshakProfile.objects.select_related('user', 'state', 'district').filter(state=state).order_by('-availability')
             except:
                 return KrisshakProfile.objects.none()
 
         if user.user_type == 'district_admin':
             try:
                 district = user.districtadminprofile.district
-                return KrisshakProfile.objects.filter(district=district).order_by('-availability')
+                return KrisshakProfile.objects.select_related('user', 'state', 'district').filter(district=district).order_by('-availability')
             except:
                 return KrisshakProfile.objects.none()
 
-        return KrisshakProfile.objects.filter(user=user).order_by('-availability')
+        return KrisshakProfile.objects.select_related('user', 'state', 'district').filter(user=user).order_by('-availability')
 
+@method_decorator(replica_reads, name='get')
+@method_decorator(conditional_view(lambda request: list_tags("bhooswami", request.user)), name='get')
 class FilteredBhooswamiListView(generics.ListAPIView):
     serializer_class = BhooswamiProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    def filter_queryset(self, queryset):
+        # Fetch only the columns the requested fields / projection render
+        return project_queryset(super().filter_queryset(queryset), self.get_serializer_class(), self.get_serializer_context())
     def get_serializer_context(self):
         return {"request": self.request}
     
@@ -145,31 +167,36 @@ class FilteredBhooswamiListView(generics.ListAPIView):
         user = self.request.user
 
         if user.is_superuser:
-            return BhooswamiProfile.objects.all()
+            return BhooswamiProfile.objects.select_related('user', 'state', 'district').all()
 
         if user.user_type == 'state_admin':
             try:
                 state = user.stateadminprofile.state
-                return BhooswamiProfile.objects.filter(state=state)
+                return BhooswamiProfile.objects.select_related('user', 'state', 'district').filter(state=state)
             except:
                 return BhooswamiProfile.objects.none()
 
         if user.user_type == 'district_admin':
             try:
                 district = user.districtadminprofile.district
-                return BhooswamiProfile.objects.filter(district=district)
+                return BhooswamiProfile.objects.select_related('user', 'state', 'district').filter(district=district)
             except:
                 return BhooswamiProfile.objects.none()
 
-        return BhooswamiProfile.objects.filter(user=user)
+        return BhooswamiProfile.objects.select_related('user', 'state', 'district').filter(user=user)
+
+def profile_detail_tags(request, pk):
+    return [profile_tag(pk), relations_tag(request.user.pk)]
 
 # ✅ View any Krisshak profile by ID (for Appointments, Search, etc.)
+@method_decorator(conditional_view(profile_detail_tags), name='get')
 class KrisshakPublicDetailView(generics.RetrieveAPIView):
     serializer_class = KrisshakProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return get_object_or_404(KrisshakProfile, user__id=self.kwargs["pk"])
+        queryset = project_queryset(KrisshakProfile.objects.all(), self.get_serializer_class(), self.get_serializer_context())
+        return get_object_or_404(queryset, user__id=self.kwargs["pk"])
     
     def get_serializer_context(self):
         return {"request": self.request}
@@ -193,17 +220,33 @@ class KrisshakProfileUpdateView(generics.RetrieveUpdateAPIView):
         serializer.save()
 
 # ✅ View any Bhooswami profile by ID
+@method_decorator(conditional_view(profile_detail_tags), name='get')
 class BhooswamiDetailView(generics.RetrieveAPIView):
     
     serializer_class = BhooswamiProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return get_object_or_404(BhooswamiProfile, user__id=self.kwargs["pk"])
+        queryset = project_queryset(BhooswamiProfile.objects.all(), self.get_serializer_class(), self.get_serializer_context())
+        return get_object_or_404(queryset, user__id=self.kwargs["pk"])
     
     def get_serializer_context(self):
         return {"request": self.request}
     
+def profile_batch_tags(request):
+    user_ids = parse_ids(request.query_params.get("ids"))
+    return [profile_tag(user_id) for user_id in user_ids] + [relations_tag(request.user.pk)]
+
+# ✅ Several profiles at once: ?ids=1,2,3 (appointment lists, favorites, notifications)
+@method_decorator(conditional_view(profile_batch_tags), name='get')
+class ProfileBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    kind = None  # "krisshak" or "bhooswami", set in urls.py
+
+    def get(self, request):
+        results, missing = load_profiles(self.kind, request, parse_ids(request.query_params.get("ids")))
+        return Response({"results": results, "missing": missing})
+
 # ✅ Update your own Bhooswami profile
 class BhooswamiProfileUpdateView(generics.RetrieveUpdateAPIView):
     serializer_class = BhooswamiProfileSerializer
@@ -213,6 +256,7 @@ class BhooswamiProfileUpdateView(generics.RetrieveUpdateAPIView):
         return BhooswamiProfile.objects.get(user=self.request.user)
 
 
+@method_decorator(throttle("otp"), name='post')
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
@@ -241,6 +285,7 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=400)
 
 
+@method_decorator(throttle("otp"), name='post')
 class VerifyOTPView(APIView):
     permission_classes = [AllowAny]
 
@@ -285,6 +330,7 @@ class VerifyOTPView(APIView):
             return Response({"error": "User not found."}, status=404)
                
 
+@method_decorator(throttle("password_reset"), name='post')
 class ForgotPasswordView(APIView):
     permission_classes = [AllowAny]
 
@@ -306,6 +352,7 @@ class ForgotPasswordView(APIView):
         except CustomUser.DoesNotExist:
             return Response({"error": "Email not found."}, status=404)
 
+@method_decorator(throttle("password_reset_verify"), name='post')
 class ResetPasswordView(APIView):
     """
     Handles:
@@ -410,7 +457,7 @@ def rate_user(request):
         rating_value = float(data.get("rating"))
 
         if not (1.0 <= rating_value <= 5.0):
-            return JsonResponse({"error": "Invalid rating value"}, status=400)
+            return FastJsonResponse({"error": "Invalid rating value"}, status=400)
 
         rated_user = CustomUser.objects.get(id=rated_user_id)
 
@@ -427,18 +474,18 @@ def rate_user(request):
             bhooswami = BhooswamiProfile.objects.get(user=rated_user)
             bhooswami.calculate_average_rating()
 
-        return JsonResponse({"message": "Rating updated successfully", "new_rating": rating_value})
+        return FastJsonResponse({"message": "Rating updated successfully", "new_rating": rating_value})
     
     except CustomUser.DoesNotExist:
-        return JsonResponse({"error": "User not found"}, status=404)
+        return FastJsonResponse({"error": "User not found"}, status=404)
     except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+        return FastJsonResponse({"error": str(e)}, status=500)
 
 @login_required
 def rated_users_view(request):
     user = request.user
     rated_ids = Rating.objects.filter(rater=user).values_list("rated_user_id", flat=True)
-    return JsonResponse({"rated_user_ids": list(rated_ids)})
+    return FastJsonResponse({"rated_user_ids": list(rated_ids)})
 
 
 @api_view(["POST"])
@@ -446,7 +493,7 @@ def toggle_favorite(request):
     """Toggle favorite status for a Krisshak or Bhooswami."""
     user = request.user
     if not user.is_authenticated:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
     krisshak_id = request.data.get("krisshak_id")
     bhooswami_id = request.data.get("bhooswami_id")
@@ -456,27 +503,49 @@ def toggle_favorite(request):
         favorite, created = Favorite.objects.get_or_create(user=user, bhooswami=bhooswami)
         if not created:  # If already favorited, remove it
             favorite.delete()
-            return JsonResponse({"message": "Favorite removed"}, status=200)
-        return JsonResponse({"message": "Favorite added"}, status=201)
+            return FastJsonResponse({"message": "Favorite removed"}, status=200)
+        return FastJsonResponse({"message": "Favorite added"}, status=201)
 
     if user.user_type == "bhooswami" and krisshak_id:  # ✅ Bhooswamis can only favorite Krisshaks
         krisshak = KrisshakProfile.objects.get(id=krisshak_id, district=user.bhooswamiprofile.district)
         favorite, created = Favorite.objects.get_or_create(user=user, krisshak=krisshak)
         if not created:  # If already favorited, remove it
             favorite.delete()
-            return JsonResponse({"message": "Favorite removed"}, status=200)
-        return JsonResponse({"message": "Favorite added"}, status=201)
+            return FastJsonResponse({"message": "Favorite removed"}, status=200)
+        return FastJsonResponse({"message": "Favorite added"}, status=201)
 
-    return JsonResponse({"error": "Invalid request"}, status=400)
+    return FastJsonResponse({"error": "Invalid request"}, status=400)
+
+def favorites_tags(request):
+    tags = [favorites_tag(request.user.pk)]
+    expanded = sparse_spec({"request": request})["expand"] & {"krisshak", "bhooswami"}
+    if not expanded or not request.user.is_authenticated:
+        return tags
+    # Expanded favorites embed the profiles and the viewer's relations with them
+    rows = Favorite.objects.filter(user=request.user).values_list("krisshak__user_id", "bhooswami__user_id")
+    user_ids = {user_id for row in rows for user_id in row if user_id is not None}
+    return tags + [profile_tag(user_id) for user_id in sorted(user_ids)] + [relations_tag(request.user.pk)]
 
 @api_view(["GET"])
+@conditional_view(favorites_tags)
 def get_favorites(request):
     """Retrieve user's favorite Krisshaks & Bhooswamis."""
     user = request.user
     if not user.is_authenticated:
-        return JsonResponse({"error": "Unauthorized"}, status=403)
-
-    favorites = Favorite.objects.filter(user=user)
-    serialized_favorites = FavoriteSerializer(favorites, many=True).data
-
-    return JsonResponse({"favorites": serialized_favorites}, safe=False)
+        return FastJsonResponse({"error": "Unauthorized"}, status=403)
+
+    context = {"request": request}
+    # ?expand=krisshak,bhooswami joins the profiles (and their users) instead of loading them per row
+    favorites = list(project_queryset(Favorite.objects.filter(user=user), FavoriteSerializer, context))
+
+    # Expanded profiles share the viewer's appointment / request lookups
+    expanded = sparse_spec(context)["expand"] & {"krisshak", "bhooswami"}
+    if expanded:
+        context["viewer_relations"] = {"appointments": {}, "requests": {}}
+        for kind in sorted(expanded):
+            user_ids = [getattr(f, kind).user_id for f in favorites if getattr(f, f"{kind}_id")]
+            for name, found in viewer_relations(user, kind, user_ids).items():
+                context["viewer_relations"][name].update(found)
+    serialized_favorites = FavoriteSerializer(favorites, many=True, context=context).data
+
+    return FastJsonResponse({"favorites": serialized_favorites}, safe=False)